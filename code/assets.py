@@ -0,0 +1,384 @@
+import pygame
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from settings import ASSET_CACHE_BYTES, ROTATION_PRERENDER_RANGE, BG_THREADED_DECODE, BG_RESIDENT_FRAMES
+
+_decoder = None  # see _frame_decoder()
+
+
+class AssetCache:
+    def __init__(self, max_bytes=ASSET_CACHE_BYTES):
+        """
+        Process-wide store of decoded, converted and scaled surfaces.
+
+        Entries are keyed by (kind, path, scale, flip, ...) and evicted in
+        least-recently-used order once their estimated size exceeds max_bytes.
+        Surfaces handed out are shared, so callers must never draw onto them.
+
+        Args:
+            max_bytes (int): Budget for all cached entries, in bytes.
+        """
+        self.max_bytes = max_bytes
+        self.used_bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.bundles = []  # AssetBundles consulted before building an entry
+        self._items = OrderedDict()
+
+    def fetch(self, key, factory):
+        """Return the entry for key, building it with factory() on a miss."""
+        entry = self._items.get(key)
+        if entry is not None:
+            self.hits += 1
+            self._items.move_to_end(key)
+            return entry[0]
+
+        self.misses += 1
+        value = self.bundled(key)
+        if value is None:
+            value = factory()
+        size = self.sizeof(value)
+        self._items[key] = (value, size)
+        self.used_bytes += size
+        if isinstance(value, RotationAtlas):
+            # Frames rendered on first lookup count towards the budget too
+            value.on_grow = lambda nbytes: self._grow(key, value, nbytes)
+        self._evict()
+        return value
+
+    def image(self, path, scale=1, flip=False, alpha=True):
+        """Load, convert, scale and optionally flip an image exactly once."""
+        key = ('image', path, scale, flip, alpha)
+        return self.fetch(key, lambda: _transform(self.source(path, alpha), scale, flip))
+
+    def source(self, path, alpha=True, decoded=None):
+        """
+        Converted but unscaled image that the scaled variants are made from.
+
+        Args:
+            decoded (Surface or None): Already decoded image to convert instead
+                of reading path, e.g. from a preload worker (see preload.py).
+        """
+        key = ('source', path, alpha)
+        return self.fetch(key, lambda: _convert(decoded or pygame.image.load(path), alpha))
+
+    def faded(self, path, scale=1, alphas=(255,)):
+        """
+        Faded copies of the cached image, one per value in alphas, for effects
+        that draw ghosts of a sprite. They look exactly like the image blitted
+        with set_alpha(alpha), but the fade is baked into the per-pixel alpha,
+        which pygame blits well over twice as fast as the two combined.
+        """
+        key = ('faded', path, scale, tuple(alphas))
+        return self.fetch(key, lambda: tuple(_with_alpha(self.image(path, scale), alpha) for alpha in alphas))
+
+    def sound(self, path, loaded=None):
+        """Return a shared mixer Sound; loaded is an already built one to keep."""
+        key = ('sound', path)
+        return self.fetch(key, lambda: loaded or pygame.mixer.Sound(path))
+
+    def mask(self, path, scale=1, flip=False):
+        """Return the collision mask for the matching cached image."""
+        key = ('mask', path, scale, flip)
+        return self.fetch(key, lambda: pygame.mask.from_surface(self.image(path, scale, flip)))
+
+    def opaque_rows(self, path, scale=1, flip=False):
+        """(top, bottom) rows between which the matching cached mask has set bits."""
+        key = ('rows', path, scale, flip)
+        return self.fetch(key, lambda: _opaque_rows(self.mask(path, scale, flip)))
+
+    def rotations(self, path, scale=1, step=1, flip=False, built=None):
+        """
+        Return a RotationAtlas for the cached image, built once per step size.
+
+        Args:
+            built (RotationAtlas or None): Already rendered atlas to keep, e.g.
+                one filled in over several menu frames (see preload.py).
+        """
+        key = ('rotations', path, scale, flip, step)
+        return self.fetch(key, lambda: built or RotationAtlas(self.image(path, scale, flip), step))
+
+    def frames(self, paths, scale=1, resident=BG_RESIDENT_FRAMES, threaded=BG_THREADED_DECODE):
+        """Return a FrameSequence for an animation, shared by every sprite that plays it."""
+        def load(path):
+            # Runs on the decode worker, so the frame is left unconverted (see
+            # FrameSequence); frames are bundled as plain opaque images
+            bundled = self.bundled(('image', path, scale, False, False), convert=False)
+            return bundled or _decode_image(path, scale, False)
+
+        key = ('frames', tuple(paths), scale, resident)
+        return self.fetch(key, lambda: FrameSequence(paths, scale, resident, threaded, load))
+
+    def image_size(self, path):
+        """Unscaled (width, height) of an image file."""
+        key = ('size', path)
+        return self.fetch(key, lambda: pygame.image.load(path).get_size())
+
+    def sizeof(self, value):
+        """Estimated bytes of an entry, counted against max_bytes."""
+        return _sizeof(value)
+
+    def attach(self, bundle):
+        """Serve entries found in an AssetBundle (see bundle.py) instead of building them."""
+        if bundle not in self.bundles:
+            self.bundles.append(bundle)
+
+    def bundled(self, key, convert=True):
+        for bundle in self.bundles:
+            value = bundle.get(key, convert)
+            if value is not None:
+                return value
+        return None
+
+    def stats(self):
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'evictions': self.evictions,
+            'entries': len(self._items),
+            'bytes': self.used_bytes,
+        }
+
+    def reset_stats(self):
+        self.hits = self.misses = self.evictions = 0
+
+    def clear(self):
+        self._items.clear()
+        self.used_bytes = 0
+
+    def _grow(self, key, value, nbytes):
+        # value, cached under key, has taken nbytes more since it was added
+        entry = self._items.get(key)
+        if entry is None or entry[0] is not value:
+            return  # evicted since; whoever still holds it keeps it alive
+        self._items[key] = (value, entry[1] + nbytes)
+        self._items.move_to_end(key)
+        self.used_bytes += nbytes
+        self._evict()
+
+    def _evict(self):
+        # Never evict the entry that was just added, even if it is over budget
+        while self.used_bytes > self.max_bytes and len(self._items) > 1:
+            _, (_, size) = self._items.popitem(last=False)
+            self.used_bytes -= size
+            self.evictions += 1
+
+
+class RotationAtlas:
+    def __init__(self, surface, step=1, prerender_range=ROTATION_PRERENDER_RANGE, frames=None):
+        """
+        Pre-rendered rotations of a surface and their masks.
+
+        Angles within +/- prerender_range degrees are rendered up front; the
+        rarely reached rest of the circle is filled in on first lookup.
+
+        Args:
+            surface (Surface): Unrotated source image.
+            step (float): Angle quantization in degrees; 360 should be a multiple of it.
+            prerender_range (float): Largest angle, either way, rendered at load time.
+            frames (list or None): Already rendered (surface, mask) pairs, one
+                per step or None, e.g. from an asset bundle; skips the prerender.
+        """
+        self.surface = surface
+        self.step = step
+        self.count = round(360 / step)
+        self.on_grow = None  # called with the bytes of each frame rendered on lookup
+        if frames is not None:
+            self.frames = frames
+            return
+        self.frames = [None] * self.count
+        for i in range(-round(prerender_range / step), round(prerender_range / step) + 1):
+            self._render(i % self.count)
+
+    def lookup(self, angle):
+        """Return (surface, mask) for the nearest pre-rendered angle."""
+        index = round(angle / self.step) % self.count
+        return self.frames[index] or self._render(index)
+
+    def _render(self, index):
+        rotated = pygame.transform.rotozoom(self.surface, index * self.step, 1)
+        self.frames[index] = (rotated, pygame.mask.from_surface(rotated))
+        if self.on_grow is not None:
+            self.on_grow(_sizeof(self.frames[index]))
+        return self.frames[index]
+
+
+class FrameSequence:
+    def __init__(self, paths, scale=1, resident=None, threaded=True, load=None):
+        """
+        Opaque animation frames, converted to the display format and scaled once.
+
+        Frame 0 is decoded right away; the rest are decoded on the worker
+        thread shared by all sequences (image loading and scaling release the
+        GIL) or on first use. The worker only decodes: get() converts a frame
+        to the display format when it collects it, on the main thread, as SDL
+        conversion against the display is not thread-safe. With a resident
+        limit, only the frames from the current one onwards are kept, and the
+        ones behind it are dropped as the animation moves on.
+
+        Args:
+            paths (list of str): Image file of every frame, in order.
+            scale (float): Scale factor applied to each frame.
+            resident (int or None): Most frames kept decoded; None keeps all.
+            threaded (bool): Decode ahead on a worker thread.
+            load (callable or None): Returns the frame of a path decoded and
+                scaled but not converted; it may run on the worker thread, so
+                it must not touch the display. Defaults to decoding and
+                scaling the image file.
+        """
+        self.paths = list(paths)
+        self.scale = scale
+        self.load = load or (lambda path: _decode_image(path, scale, False))
+        self.resident = min(resident or len(self.paths), len(self.paths))
+        self.frames = [None] * len(self.paths)
+        self.pending = {}  # index -> Future of a frame being decoded
+        self.executor = _frame_decoder() if threaded else None
+        self.current = None
+
+        self.frames[0] = self._decode(0).convert()
+        self.size = self.frames[0].get_size()
+        self.prefetch(0)
+
+    def __len__(self):
+        return len(self.paths)
+
+    def get(self, index):
+        """Return frame index, waiting for it if it is still being decoded."""
+        if index != self.current:
+            self.prefetch(index)
+        frame = self.frames[index]
+        if frame is None:
+            future = self.pending.pop(index, None)
+            decoded = future.result() if future else self._decode(index)
+            frame = self.frames[index] = decoded.convert()
+        return frame
+
+    def prefetch(self, index):
+        """Make frames index .. index + resident - 1 resident and drop the others."""
+        self.current = index
+        count = len(self.paths)
+        window = {(index + offset) % count for offset in range(self.resident)}
+        for i in range(count):
+            if i in window:
+                if self.frames[i] is None and i not in self.pending:
+                    if self.executor:
+                        self.pending[i] = self.executor.submit(self._decode, i)
+            else:
+                self.frames[i] = None
+                future = self.pending.pop(i, None)
+                if future:
+                    future.cancel()
+
+    def nbytes(self):
+        # Estimated from frame 0, for the cache budget
+        return _sizeof(self.frames[0]) * self.resident
+
+    def _decode(self, index):
+        return self.load(self.paths[index])
+
+
+def _load_image(path, scale, flip, alpha):
+    return _transform(_convert(pygame.image.load(path), alpha), scale, flip)
+
+
+def _decode_image(path, scale, flip):
+    # Unconverted, so it can run off the main thread; convert() it there
+    return _transform(pygame.image.load(path), scale, flip)
+
+
+def _convert(surf, alpha):
+    return surf.convert_alpha() if alpha else surf.convert()
+
+
+def _transform(surf, scale, flip):
+    if scale != 1:
+        surf = pygame.transform.scale(surf, pygame.math.Vector2(surf.get_size()) * scale)
+    if flip:
+        surf = pygame.transform.flip(surf, False, True)
+    return surf
+
+
+def _with_alpha(surf, alpha):
+    # Scale every alpha byte the way a surface alpha would (a * alpha // 255)
+    table = bytes(a * alpha // 255 for a in range(256))
+    pixels = bytearray(pygame.image.tobytes(surf, 'RGBA'))
+    pixels[3::4] = pixels[3::4].translate(table)
+    return pygame.image.frombytes(bytes(pixels), surf.get_size(), 'RGBA').convert_alpha()
+
+
+def _opaque_rows(mask):
+    bounds = mask.get_bounding_rects()
+    if not bounds:
+        return 0, 0
+    return min(bound.top for bound in bounds), max(bound.bottom for bound in bounds)
+
+
+def _frame_decoder():
+    # One worker thread for every FrameSequence, started on first use, so
+    # sequences dropped by the cache leave no idle threads behind
+    global _decoder
+    if _decoder is None:
+        _decoder = ThreadPoolExecutor(1, thread_name_prefix='frame-decode')
+    return _decoder
+
+
+def _sizeof(value):
+    if isinstance(value, pygame.Surface):
+        return value.get_pitch() * value.get_height()
+    if isinstance(value, pygame.mask.Mask):
+        width, height = value.get_size()
+        return (width * height) // 8
+    if isinstance(value, RotationAtlas):
+        return _sizeof(value.frames)
+    if isinstance(value, FrameSequence):
+        return value.nbytes()
+    if isinstance(value, pygame.mixer.Sound):
+        return _sound_bytes(value)
+    if isinstance(value, (list, tuple)):
+        return sum(_sizeof(item) for item in value if item is not None)
+    if isinstance(value, dict):
+        return sum(_sizeof(item) for item in value.values())
+    return 0
+
+
+def _sound_bytes(sound):
+    # Decoded PCM: seconds * rate * channels * bytes per sample
+    frequency, size, channels = pygame.mixer.get_init() or (44100, -16, 2)
+    return int(sound.get_length() * frequency * channels * abs(size) // 8)
+
+
+# Shared by every level so a surface is decoded once per process
+cache = AssetCache()
+
+
+def load_image(path, scale=1, flip=False, alpha=True):
+    return cache.image(path, scale, flip, alpha)
+
+
+def load_mask(path, scale=1, flip=False):
+    return cache.mask(path, scale, flip)
+
+
+def load_opaque_rows(path, scale=1, flip=False):
+    return cache.opaque_rows(path, scale, flip)
+
+
+def load_rotations(path, scale=1, step=1, flip=False):
+    return cache.rotations(path, scale, step, flip)
+
+
+def load_faded(path, scale=1, alphas=(255,)):
+    return cache.faded(path, scale, alphas)
+
+
+def load_frames(paths, scale=1):
+    return cache.frames(paths, scale)
+
+
+def image_size(path):
+    return cache.image_size(path)
+
+
+def load_sound(path):
+    return cache.sound(path)
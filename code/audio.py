@@ -0,0 +1,110 @@
+import pygame
+import settings
+from assets import load_sound
+from settings import SFX_CHANNELS
+
+
+class AudioManager:
+    def __init__(self, sfx_channels=SFX_CHANNELS):
+        """
+        Background music and sound effects for every screen.
+
+        Music is streamed from disk through pygame.mixer.music, so a track is
+        never decoded into memory as a whole. Sound effects are loaded once
+        through the asset cache and played on mixer channels reserved for
+        them. Volumes are applied when they change (set_volume(), called by
+        the options sliders), not on every frame.
+
+        Without a mixer (headless runs, no audio device) every call is a
+        no-op, and a missing file is reported once and then played as silence.
+        """
+        self.sfx_channel_count = sfx_channels
+        self.channels = []  # reserved for sound effects, set up on first use
+        self.next_channel = 0
+        self.music_path = None
+        self.missing = set()  # paths already reported
+
+    @property
+    def enabled(self):
+        return pygame.mixer.get_init() is not None
+
+    def play_music(self, path, loops=-1):
+        """Stream path (looping by default); a track already playing carries on."""
+        if not self.enabled or path in self.missing:
+            return
+        if path == self.music_path and pygame.mixer.music.get_busy():
+            return
+        try:
+            pygame.mixer.music.load(path)
+        except (pygame.error, FileNotFoundError) as error:
+            self.stop_music()
+            self._report(path, error)
+            return
+        pygame.mixer.music.set_volume(settings.BGM_VOLUME)
+        pygame.mixer.music.play(loops)
+        self.music_path = path
+
+    def stop_music(self):
+        if self.enabled:
+            pygame.mixer.music.stop()
+        self.music_path = None
+
+    def play_sfx(self, path):
+        """Play a sound effect on the first idle reserved channel, or the least recently used one."""
+        if not self.enabled or path in self.missing:
+            return
+        try:
+            sound = load_sound(path)
+        except (pygame.error, FileNotFoundError) as error:
+            self._report(path, error)
+            return
+        channels = self._sfx_channels()
+        channel = next((channel for channel in channels if not channel.get_busy()), None)
+        if channel is None:
+            channel = channels[self.next_channel]
+            self.next_channel = (self.next_channel + 1) % len(channels)
+        channel.play(sound)
+
+    def set_volume(self, bgm=None, sfx=None):
+        """Store new volumes (0..1) in settings and apply them to what is playing."""
+        if bgm is not None:
+            settings.BGM_VOLUME = bgm
+            if self.enabled:
+                pygame.mixer.music.set_volume(bgm)
+        if sfx is not None:
+            settings.SFX_VOLUME = sfx
+            for channel in self.channels:
+                channel.set_volume(sfx)
+
+    def _sfx_channels(self):
+        if not self.channels:
+            # Reserved channels are skipped when pygame picks one for Sound.play()
+            pygame.mixer.set_reserved(self.sfx_channel_count)
+            self.channels = [pygame.mixer.Channel(i) for i in range(self.sfx_channel_count)]
+            for channel in self.channels:
+                channel.set_volume(settings.SFX_VOLUME)
+        return self.channels
+
+    def _report(self, path, error):
+        self.missing.add(path)
+        print(f'Audio: cannot load {path} ({error}), continuing without it')
+
+
+# Shared by every screen, like the asset cache
+audio = AudioManager()
+
+
+def play_music(path, loops=-1):
+    audio.play_music(path, loops)
+
+
+def stop_music():
+    audio.stop_music()
+
+
+def play_sfx(path):
+    audio.play_sfx(path)
+
+
+def set_volume(bgm=None, sfx=None):
+    audio.set_volume(bgm, sfx)
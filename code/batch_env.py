@@ -0,0 +1,243 @@
+import sys
+import time
+import numpy as np
+import pygame
+from assets import image_size
+from settings import (
+    WINDOW_WIDTH, WINDOW_HEIGHT,
+    GROUND_SCROLL_SPEED, OBSTACLE_SCROLL_SPEED, JUMP_FORCE, GRAVITY,
+    SIMULATION_STEP, PLANE_IMG_PATH, BG_IMG_PATH, GROUND_IMG_PATH, OBSTACLE_IMG_PATH
+)
+
+OBSTACLE_INTERVAL = 1.4  # seconds, Simulation.obstacle_spacing at OBSTACLE_SCROLL_SPEED
+OBSTACLE_KILL_X = -100   # Obstacle.update kills sprites whose right edge passes this
+
+
+def _alpha_mask(path, scale, flip=False):
+    """Boolean [x, y] array of opaque pixels, matching pygame.mask.from_surface."""
+    surf = pygame.image.load(path)
+    surf = pygame.transform.scale(surf, pygame.math.Vector2(surf.get_size()) * scale)
+    if flip:
+        surf = pygame.transform.flip(surf, False, True)
+    return pygame.surfarray.array_alpha(surf) > 127
+
+
+class BatchEnv:
+    def __init__(self, num_envs, seed=None, use_masks=False, max_obstacles=4,
+                 lookahead=2, dt=SIMULATION_STEP):
+        """
+        Many independent runs of the sprites.py game stepped together with NumPy.
+
+        Follows the Plane/Obstacle/Ground rules of levels 2 and 3 (no crows and
+        no gravity flips). Collisions are axis-aligned boxes; with use_masks the
+        boxes that overlap are confirmed against precomputed pixel masks of the
+        unrotated plane, obstacles and the ground's height profile.
+
+        Args:
+            num_envs (int): Number of parallel runs.
+            seed (int or None): Seed for spawn randomness.
+            use_masks (bool): Confirm box hits with pixel masks.
+            max_obstacles (int): Obstacle slots per run; about two are ever alive.
+            lookahead (int): Obstacles ahead of the player included in observations.
+            dt (float): Seconds per step.
+        """
+        self.num_envs = num_envs
+        self.use_masks = use_masks
+        self.max_obstacles = max_obstacles
+        self.lookahead = lookahead
+        self.dt = dt
+        self.rng = np.random.default_rng(seed)
+
+        scale = WINDOW_HEIGHT / image_size(BG_IMG_PATH)[1]
+
+        # Player, as placed by Plane.__init__
+        self.player_mask = _alpha_mask(PLANE_IMG_PATH.format(0), scale / 1.7)
+        self.player_w, self.player_h = self.player_mask.shape
+        self.player_x = int(WINDOW_WIDTH / 20)
+        self.player_start_y = WINDOW_HEIGHT / 2 - self.player_h / 2
+        # Lowest opaque row per player column (-1 for empty columns)
+        rows = np.arange(self.player_h)
+        self.player_bottom = np.where(self.player_mask.any(axis=1), (self.player_mask * rows).max(axis=1), -1)
+
+        # Obstacle images 0 and 1, upright and flipped
+        obstacle_scale = scale * 1.1
+        self.obstacle_masks = {
+            (index, flip): _alpha_mask(OBSTACLE_IMG_PATH.format(index), obstacle_scale, flip)
+            for index in (0, 1) for flip in (False, True)
+        }
+        self.obstacle_sizes = np.array([self.obstacle_masks[(i, False)].shape for i in (0, 1)])
+
+        # Ground: highest opaque row per column, repeated so a scrolled window never wraps
+        ground = _alpha_mask(GROUND_IMG_PATH, scale)
+        self.ground_w, ground_h = ground.shape
+        first_row = np.where(ground.any(axis=1), ground.argmax(axis=1), ground_h)
+        self.ground_profile = np.tile(WINDOW_HEIGHT - ground_h + first_row, 2)
+        self.ground_top = int(self.ground_profile.min())
+
+        n, k = num_envs, max_obstacles
+        self.y = np.zeros(n)
+        self.vy = np.zeros(n)
+        self.ground_x = np.zeros(n)
+        self.spawn_clock = np.zeros(n)
+        self.steps = np.zeros(n, dtype=np.int64)
+        self.ob_active = np.zeros((n, k), dtype=bool)
+        self.ob_x = np.zeros((n, k))
+        self.ob_top = np.zeros((n, k))
+        self.ob_w = np.zeros((n, k))
+        self.ob_h = np.zeros((n, k))
+        self.ob_image = np.zeros((n, k), dtype=np.int8)
+        self.ob_flip = np.zeros((n, k), dtype=bool)
+        self.all_envs = np.arange(n)
+        self.obs = np.zeros((n, 2 + 3 * lookahead), dtype=np.float32)
+
+    def reset(self, envs=None):
+        """Reset the given envs (all by default) and return observations for every env."""
+        envs = self.all_envs if envs is None else envs
+        self.y[envs] = self.player_start_y
+        self.vy[envs] = 0
+        self.ground_x[envs] = 0
+        self.spawn_clock[envs] = 0
+        self.steps[envs] = 0
+        self.ob_active[envs] = False
+        return self.observe()
+
+    def step(self, actions):
+        """
+        Advance every env by one step.
+
+        Args:
+            actions (array of bool): Jump flag per env.
+
+        Returns:
+            (obs, rewards, dones): Observations after the step (finished envs are
+            already reset), reward 1 per surviving step, and the finished flags.
+        """
+        dt = self.dt
+        jump = np.asarray(actions, dtype=bool)
+        self.vy[jump] = JUMP_FORCE
+
+        # Plane.apply_gravity
+        self.vy += GRAVITY * dt
+        self.y += self.vy * dt
+
+        # Obstacle.update and Ground.update scrolling
+        self.ob_x -= OBSTACLE_SCROLL_SPEED * dt
+        self.ob_active &= self.ob_x + self.ob_w > OBSTACLE_KILL_X
+        self.ground_x -= GROUND_SCROLL_SPEED * dt
+        self.ground_x[self.ground_x + self.ground_w / 2 <= 0] = 0
+
+        self.spawn_clock += dt
+        due = np.flatnonzero(self.spawn_clock >= OBSTACLE_INTERVAL)
+        if due.size:
+            self.spawn_clock[due] -= OBSTACLE_INTERVAL
+            self._spawn(due)
+
+        dones = self._collisions()
+        self.steps += 1
+        rewards = np.where(dones, 0.0, 1.0)
+        finished = np.flatnonzero(dones)
+        if finished.size:
+            self.reset(finished)
+        return self.observe(), rewards, dones
+
+    def _spawn(self, envs):
+        # Same random ranges as sprites.Obstacle
+        count = envs.size
+        up = self.rng.random(count) < 0.5
+        image = self.rng.integers(0, 2, count)
+        center_x = WINDOW_WIDTH + self.rng.integers(40, 101, count)
+        w = self.obstacle_sizes[image, 0]
+        h = self.obstacle_sizes[image, 1]
+        top = np.where(up, WINDOW_HEIGHT + self.rng.integers(10, 51, count) - h,
+                       self.rng.integers(-50, -9, count))
+
+        slot = np.argmin(self.ob_active[envs], axis=1)
+        self.ob_active[envs, slot] = True
+        self.ob_x[envs, slot] = center_x - w // 2
+        self.ob_top[envs, slot] = top
+        self.ob_w[envs, slot] = w
+        self.ob_h[envs, slot] = h
+        self.ob_image[envs, slot] = image
+        self.ob_flip[envs, slot] = ~up
+
+    def _collisions(self):
+        top = self.y.astype(np.int64)
+        bottom = top + self.player_h
+        left = self.player_x
+        right = left + self.player_w
+
+        hit = top <= 0
+
+        ground_hit = bottom > self.ground_top
+        if self.use_masks and ground_hit.any():
+            ground_hit &= self._ground_overlap(top, bottom)
+        hit |= ground_hit
+
+        ob_left = self.ob_x.astype(np.int64)
+        ob_top = self.ob_top.astype(np.int64)
+        overlap = (
+            self.ob_active
+            & (ob_left < right) & (ob_left + self.ob_w > left)
+            & (ob_top < bottom[:, None]) & (ob_top + self.ob_h > top[:, None])
+        )
+        if self.use_masks:
+            for env, slot in zip(*np.nonzero(overlap)):
+                overlap[env, slot] = self._mask_overlap(top[env], ob_left[env, slot], ob_top[env, slot],
+                                                        self.ob_image[env, slot], self.ob_flip[env, slot])
+        hit |= overlap.any(axis=1)
+        return hit
+
+    def _ground_overlap(self, top, bottom):
+        # Compare the player's lowest opaque pixel per column with the ground height there
+        offsets = (self.player_x - self.ground_x.astype(np.int64))[:, None] + np.arange(self.player_w)
+        ground_rows = self.ground_profile[offsets]
+        player_rows = top[:, None] + self.player_bottom
+        return ((self.player_bottom >= 0) & (player_rows >= ground_rows)).any(axis=1)
+
+    def _mask_overlap(self, player_top, ob_left, ob_top, image, flip):
+        mask = self.obstacle_masks[(int(image), bool(flip))]
+        x0 = max(self.player_x, ob_left)
+        x1 = min(self.player_x + self.player_w, ob_left + mask.shape[0])
+        y0 = max(player_top, ob_top)
+        y1 = min(player_top + self.player_h, ob_top + mask.shape[1])
+        player = self.player_mask[x0 - self.player_x:x1 - self.player_x, y0 - player_top:y1 - player_top]
+        obstacle = mask[x0 - ob_left:x1 - ob_left, y0 - ob_top:y1 - ob_top]
+        return bool((player & obstacle).any())
+
+    def observe(self):
+        """
+        Fill and return the (num_envs, 2 + 3 * lookahead) observation array:
+        player y and velocity, then (dx, top, bottom) of the nearest obstacles
+        ahead, normalised by the window size. Missing obstacles read as far away.
+        """
+        obs = self.obs
+        obs[:, 0] = self.y / WINDOW_HEIGHT
+        obs[:, 1] = self.vy / 1000
+
+        right = self.ob_x + self.ob_w
+        ahead = self.ob_active & (right > self.player_x)
+        key = np.where(ahead, self.ob_x, np.inf)
+        order = np.argsort(key, axis=1)[:, :self.lookahead]
+        rows = self.all_envs[:, None]
+        valid = ahead[rows, order]
+        obs[:, 2::3] = np.where(valid, (self.ob_x[rows, order] - self.player_x) / WINDOW_WIDTH, 2.0)
+        obs[:, 3::3] = np.where(valid, self.ob_top[rows, order] / WINDOW_HEIGHT, 0.0)
+        obs[:, 4::3] = np.where(valid, (self.ob_top + self.ob_h)[rows, order] / WINDOW_HEIGHT, 0.0)
+        return obs
+
+
+if __name__ == '__main__':
+    # Usage: python batch_env.py [num_envs] [steps] [--masks]
+    num_envs = int(sys.argv[1]) if len(sys.argv) > 1 else 1024
+    steps = int(sys.argv[2]) if len(sys.argv) > 2 else 1000
+    env = BatchEnv(num_envs, seed=0, use_masks='--masks' in sys.argv)
+    obs = env.reset()
+    episodes = 0
+    start = time.perf_counter()
+    for _ in range(steps):
+        # Jump when below the middle of the screen and falling
+        actions = (obs[:, 0] > 0.5) & (obs[:, 1] > 0)
+        obs, rewards, dones = env.step(actions)
+        episodes += int(dones.sum())
+    elapsed = time.perf_counter() - start
+    print(f'{num_envs * steps / elapsed:,.0f} env-steps/s ({episodes} episodes finished)')
@@ -0,0 +1 @@
+# Standalone benchmarks; run from code/ as `python -m benchmarks.<name>`
@@ -0,0 +1,57 @@
+import argparse
+import time
+import pygame
+from settings import WINDOW_WIDTH
+from simulation import init_headless, load_simulation
+
+
+def run(level, obstacles, frames, seed):
+    """
+    Scroll `obstacles` obstacles past the player and test collisions both with
+    a plain spritecollide/collide_mask pass and through the sim's BroadPhase.
+
+    Returns:
+        (ms per full pass, ms per broad phase query, BroadPhase stats, results agree)
+    """
+    sim = load_simulation(level, seed)
+    for _ in range(obstacles):
+        sim.spawn_obstacle(sim.plan_obstacle(sim.rng))
+    group = sim.obstacles if hasattr(sim, 'obstacles') else sim.collision_sprites
+    sprites = group.sprites()
+    # Spread them over four screens, ahead of and around the player
+    span = 4 * WINDOW_WIDTH
+    for i, sprite in enumerate(sprites):
+        if getattr(sprite, 'sprite_type', None) != 'ground':
+            sprite.rect.x = i * span // len(sprites) - WINDOW_WIDTH // 2
+
+    full = broad = 0
+    agree = True
+    for _ in range(frames):
+        for sprite in sprites:
+            if getattr(sprite, 'sprite_type', None) != 'ground':
+                sprite.rect.x = (sprite.rect.x - 7 + WINDOW_WIDTH) % span - WINDOW_WIDTH
+        start = time.perf_counter()
+        hits = pygame.sprite.spritecollide(sim.player, group, False, pygame.sprite.collide_mask)
+        middle = time.perf_counter()
+        sim.broad_phase.begin_step()
+        hit = sim.broad_phase.first_hit(sim.player, group)
+        end = time.perf_counter()
+        full += middle - start
+        broad += end - middle
+        agree &= hit is (hits[0] if hits else None)
+    return full / frames * 1000, broad / frames * 1000, sim.broad_phase.stats(), agree
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Collision tests per frame as obstacle density rises.')
+    parser.add_argument('--level', type=int, choices=[1, 2, 3], default=3)
+    parser.add_argument('--frames', type=int, default=2000)
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+
+    init_headless()
+    print(f'{"sprites":>8}{"full ms":>9}{"broad ms":>10}{"mask tests":>12}  agree')
+    for obstacles in (2, 8, 32, 128):
+        full_ms, broad_ms, stats, agree = run(args.level, obstacles, args.frames, args.seed)
+        # A full pass mask-tests every sprite, i.e. stats['broad'] of them
+        print(f'{stats["broad"]:8.0f}{full_ms:9.4f}{broad_ms:10.4f}{stats["narrow"]:12.2f}  {agree}')
@@ -0,0 +1,63 @@
+import argparse
+import random
+import time
+import pygame
+from settings import WINDOW_WIDTH, WINDOW_HEIGHT
+from simulation import init_headless, load_simulation
+from game_level2 import Crow, TRAIL_LENGTH, CROW_SPEEDS
+
+
+def draw_with_copies(crow, surface):
+    # The previous Crow.draw: one image copy and set_alpha per trail position
+    trail = [crow.trail[(crow.trail_head + i) % TRAIL_LENGTH] for i in range(-crow.trail_count, 0)]
+    for i, old_rect in enumerate(trail):
+        temp_img = crow.image.copy()
+        temp_img.set_alpha(180 - (len(trail) - i - 1) * (180 // len(trail)))
+        surface.blit(temp_img, old_rect)
+    surface.blit(crow.image, crow.rect)
+
+
+def run(crows, frames, faded, seed):
+    """
+    Update and draw `crows` crows with full trails, wrapping them around the
+    window so all of them stay on screen.
+
+    Returns:
+        ms per frame
+    """
+    surface = pygame.display.get_surface()
+    sim = load_simulation(2, seed)
+    sim.load_draw_assets()
+    rng = random.Random(seed)
+    flock = [sim.pool(Crow).acquire(sim.crow_groups, pos=(rng.randrange(WINDOW_WIDTH), rng.randrange(WINDOW_HEIGHT)),
+                                    speed=rng.randint(*CROW_SPEEDS), scale_factor=sim.crow_scale)
+             for _ in range(crows)]
+    dt = 1 / 120
+
+    start = time.perf_counter()
+    for _ in range(frames):
+        surface.fill('black')
+        sim.entities.update(dt)
+        for crow in flock:
+            if not crow.alive():
+                crow.rect.x += WINDOW_WIDTH + crow.rect.width
+                crow.add(sim.crow_groups)
+            if faded:
+                crow.draw(surface)
+            else:
+                draw_with_copies(crow, surface)
+    return (time.perf_counter() - start) / frames * 1000
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Crow ghost trails: per-frame copies against pre-faded frames.')
+    parser.add_argument('--frames', type=int, default=30)
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+
+    init_headless()
+    print(f'{"crows":>6}{"copies ms":>11}{"faded ms":>10}{"speedup":>9}')
+    for crows in (10, 100, 250):
+        copies = run(crows, args.frames, False, args.seed)
+        faded = run(crows, args.frames, True, args.seed)
+        print(f'{crows:6}{copies:11.3f}{faded:10.3f}{copies / faded:8.1f}x')
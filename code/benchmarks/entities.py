@@ -0,0 +1,102 @@
+import argparse
+import math
+import time
+import tracemalloc
+import pygame
+from settings import WINDOW_WIDTH, WINDOW_HEIGHT, SIMULATION_STEP
+from entities import EntityGroup, EntityView, sine_motion
+
+
+class LegacyObstacle(pygame.sprite.Sprite):
+    # The previous MovingObstacle: a Vector2 position and motion attributes in
+    # the sprite's dict, moved by its own update()
+    def __init__(self, group, image, x, y):
+        super().__init__()
+        self.reset(group, image, x, y)
+
+    def reset(self, group, image, x, y):
+        group.add(self)
+        self.image = image
+        self.rect = image.get_rect(topleft=(x, y))
+        self.pos = pygame.math.Vector2(self.rect.topleft)
+        self.start_y = y
+        self.amplitude = 20
+        self.speed = 2
+        self.time = 0
+
+    def update(self, dt):
+        self.pos.x -= 300 * dt
+        self.rect.x = int(self.pos.x)
+        if self.rect.right < -100:
+            self.kill()
+        self.time += dt
+        self.rect.y = self.start_y + self.amplitude * math.sin(self.speed * self.time)
+
+
+# Shared by every Obstacle, so built before anything is measured
+MOTION = sine_motion(20, 2)
+
+
+class Obstacle(EntityView):
+    speed = -300
+    kill_right = -100
+
+    def __init__(self, group, image, x, y):
+        super().__init__()
+        self.reset(group, image, x, y)
+
+    def reset(self, group, image, x, y):
+        group.add(self)
+        self.image = image
+        self.rect = image.get_rect(topleft=(x, y))
+        self.x = self.rect.x
+        self.motion = MOTION
+        self.base_y = y
+
+
+def build(cls, group, count, image):
+    for i in range(count):
+        cls(group, image, i * WINDOW_WIDTH // count, WINDOW_HEIGHT // 2)
+
+
+def run(cls, group_class, count, frames):
+    """
+    Build `count` sine-bobbing obstacles of cls and update them for `frames`
+    frames, putting the ones that left the window back on its right edge.
+
+    Returns:
+        (bytes per obstacle, update ns per obstacle)
+    """
+    image = pygame.Surface((40, 200))
+    group = group_class()
+    tracemalloc.start()
+    build(cls, group, count, image)
+    size = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    group.empty()
+
+    build(cls, group, count, image)
+    sprites = group.sprites()
+    dt = SIMULATION_STEP
+    elapsed = 0
+    for _ in range(frames):
+        start = time.perf_counter_ns()
+        group.update(dt)
+        elapsed += time.perf_counter_ns() - start
+        for sprite in sprites:
+            if not sprite.alive():
+                sprite.reset(group, image, WINDOW_WIDTH, WINDOW_HEIGHT // 2)
+    return size / count, elapsed / frames / count
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Obstacles: sprites updating themselves against an EntityGroup over columns.')
+    parser.add_argument('--frames', type=int, default=300)
+    args = parser.parse_args()
+
+    print(f'{"count":>6}{"path":>9}{"B/obstacle":>12}{"ns/obstacle":>13}')
+    for count in (10, 100, 1000):
+        for name, cls, group_class in (('legacy', LegacyObstacle, pygame.sprite.Group),
+                                       ('entity', Obstacle, EntityGroup)):
+            size, ns = run(cls, group_class, count, args.frames)
+            print(f'{count:6}{name:>9}{size:12.0f}{ns:13.0f}')
@@ -0,0 +1,64 @@
+import argparse
+import time
+import pygame
+from settings import SIMULATION_STEP, WINDOW_WIDTH, WINDOW_HEIGHT
+from simulation import JUMP, init_headless, hover_policy, load_simulation
+from rendering import FullRenderer
+from observation import PixelObserver
+
+
+def run(level, path, frames, size, seed):
+    """
+    Time `frames` pixel observations of a seeded level along one path:
+    'array3d' draws the full frame and copies it out with surfarray.array3d
+    (the naive way), 'smoothscale' draws the full frame and copies a
+    shrunk copy out, 'observer' and 'observer-gray' draw at size with a
+    PixelObserver stacking 4 frames. Stepping the simulation is not timed.
+
+    Returns:
+        (observations per second, MB copied into arrays per observation)
+    """
+    sim = load_simulation(level, seed)
+    sim.load_draw_assets()
+    canvas = pygame.Surface((WINDOW_WIDTH, WINDOW_HEIGHT)).convert()
+    renderer = FullRenderer(canvas)
+    small = pygame.Surface(size).convert()
+    observer = PixelObserver(size, grayscale=path == 'observer-gray', stack=4)
+    copied = 0
+
+    elapsed = 0
+    for _ in range(frames):
+        if not sim.active:
+            sim.reset()
+        sim.step(SIMULATION_STEP, (JUMP,) if hover_policy(sim) else ())
+
+        start = time.perf_counter()
+        if path == 'array3d':
+            renderer.render(sim.all_sprites)
+            copied += pygame.surfarray.array3d(canvas).nbytes
+        elif path == 'smoothscale':
+            renderer.render(sim.all_sprites)
+            pygame.transform.smoothscale(canvas, size, small)
+            copied += pygame.surfarray.array3d(small).nbytes
+        else:
+            observer.observe(sim.all_sprites)
+        elapsed += time.perf_counter() - start
+    if path.startswith('observer'):
+        copied = observer.bytes_copied
+    return frames / elapsed, copied / frames / 1e6
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Pixel observations: full frames against small ones drawn directly.')
+    parser.add_argument('--levels', type=int, nargs='+', default=[1, 2, 3])
+    parser.add_argument('--frames', type=int, default=1000)
+    parser.add_argument('--size', type=int, nargs=2, default=[48, 80], metavar=('WIDTH', 'HEIGHT'))
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+
+    init_headless()
+    print(f'{"level":<7}{"path":<15}{"obs/s":>8}{"MB copied/obs":>15}')
+    for level in args.levels:
+        for path in ('array3d', 'smoothscale', 'observer', 'observer-gray'):
+            rate, copied = run(level, path, args.frames, tuple(args.size), args.seed)
+            print(f'{level:<7}{path:<15}{rate:8.0f}{copied:15.4f}')
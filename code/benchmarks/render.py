@@ -0,0 +1,70 @@
+import argparse
+import time
+import pygame
+from settings import SIMULATION_STEP, WINDOW_WIDTH, WINDOW_HEIGHT
+from simulation import JUMP, init_headless, hover_policy, load_simulation
+from rendering import make_renderer, UiImage, UiText
+
+
+def run(mode, level, frames, scenario, seed):
+    """
+    Render `frames` frames of a seeded level with one renderer.
+
+    Scenarios: 'play' steps the simulation every frame; 'static' freezes the
+    world and only changes the score text, like a paused or menu screen.
+
+    Returns:
+        (ms per frame, mean fraction of the window pushed to the display)
+    """
+    surface = pygame.display.get_surface()
+    screen = surface.get_rect()
+    sim = load_simulation(level, seed)
+    renderer = make_renderer(surface, mode)
+    font = pygame.font.Font('../graphics/font/BD_Cartoon_Shout.ttf', 30)
+    score = renderer.add_ui(UiText(font, 'black'))
+    menu_surf = pygame.image.load('../graphics/ui/menu.png').convert_alpha()
+    renderer.add_ui(UiImage(menu_surf, menu_surf.get_rect(center=(WINDOW_WIDTH / 2, WINDOW_HEIGHT / 2)),
+                            visible=scenario == 'static'))
+
+    # Capture what each renderer hands to the display
+    updated = [0]
+    window = WINDOW_WIDTH * WINDOW_HEIGHT
+    update = pygame.display.update
+
+    def counting_update(rects=None):
+        if rects is None:
+            updated[0] += window
+        else:
+            updated[0] += sum(rect.clip(screen).width * rect.clip(screen).height for rect in rects)
+        update(rects)
+
+    pygame.display.update = counting_update
+    try:
+        start = time.perf_counter()
+        for frame in range(frames):
+            if scenario == 'play':
+                if not sim.active:
+                    sim.reset()
+                sim.step(SIMULATION_STEP, (JUMP,) if hover_policy(sim) else ())
+            score.set_text(str(frame // 60), (WINDOW_WIDTH / 2, WINDOW_HEIGHT / 10))
+            renderer.render(sim.all_sprites)
+            renderer.present()
+        elapsed = time.perf_counter() - start
+    finally:
+        pygame.display.update = update
+    return elapsed / frames * 1000, updated[0] / window / frames
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Compare full-window and dirty-rect rendering.')
+    parser.add_argument('--level', type=int, choices=[1, 2, 3], default=2)
+    parser.add_argument('--frames', type=int, default=1000)
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+
+    init_headless()
+    print(f'{"scenario":<10}{"mode":<7}{"ms/frame":>9}{"pushed":>9}')
+    for scenario in ('play', 'static'):
+        for mode in ('full', 'dirty'):
+            ms, pushed = run(mode, args.level, args.frames, scenario, args.seed)
+            print(f'{scenario:<10}{mode:<7}{ms:9.3f}{pushed:9.1%}')
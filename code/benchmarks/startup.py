@@ -0,0 +1,63 @@
+import argparse
+import subprocess
+import sys
+import time
+
+
+def first_frame(level, use_bundle):
+    """
+    Time, in a fresh process, from building a level's simulation to showing
+    its first frame; module imports and pygame.init are not counted.
+    """
+    import pygame
+    import settings
+    settings.USE_ASSET_BUNDLES = use_bundle
+    from simulation import init_headless, load_simulation
+    from rendering import FullRenderer
+    from assets import load_image
+    init_headless()
+    load_simulation(1 if level != 1 else 2)  # import the level modules outside the timing
+    import assets
+    assets.cache.clear()
+    assets.cache.bundles = []
+
+    start = time.perf_counter()
+    sim = load_simulation(level, seed=0)
+    load_image('../graphics/ui/menu.png')
+    renderer = FullRenderer(pygame.display.get_surface())
+    renderer.render(sim.all_sprites)
+    renderer.present()
+    return time.perf_counter() - start
+
+
+def measure(level, use_bundle, runs):
+    times = []
+    for _ in range(runs):
+        output = subprocess.run(
+            [sys.executable, '-m', 'benchmarks.startup', '--child', str(level), str(int(use_bundle))],
+            capture_output=True, text=True, check=True
+        ).stdout
+        times.append(float(output.split()[-1]))
+    return min(times), sorted(times)[len(times) // 2]
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Time to first frame with and without asset bundles.')
+    parser.add_argument('--levels', type=int, nargs='+', default=[1, 2, 3])
+    parser.add_argument('--runs', type=int, default=5)
+    parser.add_argument('--child', type=int, nargs=2, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        level, use_bundle = args.child
+        print(first_frame(level, bool(use_bundle)))
+        sys.exit()
+
+    import os
+    from bundle import bundle_path
+    print(f'{"level":<7}{"source":<8}{"best ms":>9}{"median ms":>11}')
+    for level in args.levels:
+        sources = [('png', False)] + ([('bundle', True)] if os.path.exists(bundle_path(level)) else [])
+        for name, use_bundle in sources:
+            best, median = measure(level, use_bundle, args.runs)
+            print(f'{level:<7}{name:<8}{best * 1000:9.1f}{median * 1000:11.1f}')
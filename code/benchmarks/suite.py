@@ -0,0 +1,269 @@
+import argparse
+import gc
+import importlib
+import json
+import os
+import platform
+import sys
+import time
+import tracemalloc
+from collections import defaultdict
+from contextlib import contextmanager
+import pygame
+from settings import SIMULATION_STEP
+from simulation import JUMP, init_headless, hover_policy, load_simulation
+from rendering import FullRenderer
+
+BASELINE_PATH = os.path.join(os.path.dirname(__file__), 'baseline.json')
+
+# Methods timed in every scenario: (module, class, method); a call made from
+# inside another timed call counts towards the outer one only
+OPERATIONS = [
+    ('sprites', 'Plane', 'update'),
+    ('spritesLevelOne', 'Pony', 'update'),
+    ('spritesLevelOne', 'BG', 'animate'),
+    ('entities', 'EntityGroup', 'update'),
+    ('game_level2', 'Crow', 'draw'),
+]
+
+# name -> (level, attributes set on the simulation before it starts)
+SCENARIOS = {
+    'steady-1': (1, {}),
+    'steady-2': (2, {}),
+    'steady-3': (3, {}),
+    'dense-1': (1, {'obstacle_spacing': 140}),
+    'dense-2': (2, {'obstacle_spacing': 140}),
+    'crows': (2, {'crow_spacing': 80}),
+    'gravity-flips': (3, {'gravity_interval_min': 200, 'gravity_interval_max': 400,
+                          'gravity_warning_distance': 100}),
+}
+
+
+class Timings:
+    def __init__(self, trace_memory=False):
+        """
+        Time (and with trace_memory, measure the Python memory peak of) calls
+        to wrapped functions, per operation name.
+        """
+        self.trace_memory = trace_memory
+        self.ns = defaultdict(int)
+        self.calls = defaultdict(int)
+        self.peak_bytes = defaultdict(int)
+        self.inside = False
+
+    def begin(self):
+        if self.trace_memory:
+            tracemalloc.reset_peak()
+            return time.perf_counter_ns(), tracemalloc.get_traced_memory()[0]
+        return time.perf_counter_ns(), 0
+
+    def end(self, name, started):
+        start, before = started
+        self.ns[name] += time.perf_counter_ns() - start
+        self.calls[name] += 1
+        if self.trace_memory:
+            self.peak_bytes[name] += tracemalloc.get_traced_memory()[1] - before
+
+    def wrap(self, name, func):
+        def timed(*args, **kwargs):
+            if self.inside:
+                return func(*args, **kwargs)
+            self.inside = True
+            started = self.begin()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                self.end(name, started)
+                self.inside = False
+        return timed
+
+    def clear(self):
+        self.ns.clear()
+        self.calls.clear()
+        self.peak_bytes.clear()
+
+
+@contextmanager
+def instrumented(timings):
+    """Swap the OPERATIONS methods for timed wrappers, restoring them afterwards."""
+    originals = []
+    for module_name, class_name, method in OPERATIONS:
+        cls = getattr(importlib.import_module(module_name), class_name)
+        original = vars(cls)[method]
+        originals.append((cls, method, original))
+        setattr(cls, method, timings.wrap(f'{module_name}.{class_name}.{method}', original))
+    try:
+        yield
+    finally:
+        for cls, method, original in originals:
+            setattr(cls, method, original)
+
+
+def wrapper_overhead():
+    """ns a timed wrapper adds to each call, subtracted from the results."""
+    timings = Timings()
+    func = timings.wrap('calibrate', lambda: None)
+    plain = lambda: None
+    calls = 100000
+    best = None
+    for _ in range(5):
+        start = time.perf_counter_ns()
+        for _ in range(calls):
+            func()
+        middle = time.perf_counter_ns()
+        for _ in range(calls):
+            plain()
+        overhead = ((middle - start) - (time.perf_counter_ns() - middle)) / calls
+        best = overhead if best is None else min(best, overhead)
+    return max(best, 0)
+
+
+def run(scenario, frames, warmup, seed, trace_memory=False):
+    """
+    Play a scenario with the hover bot for warmup + frames frames, stepping
+    and drawing each frame. The player cannot die, so the world keeps
+    filling up (collisions are still tested every step).
+
+    Returns:
+        Timings of the measured frames, with 'Simulation.step',
+        'Simulation.collisions' and 'FullRenderer.render' added.
+    """
+    level, attributes = SCENARIOS[scenario]
+    sim = load_simulation(level, seed)
+    for name, value in attributes.items():
+        setattr(sim, name, value)
+    sim.reset()
+    sim.load_draw_assets()
+    sim.die = lambda cause: None
+    renderer = FullRenderer(pygame.display.get_surface())
+
+    timings = Timings(trace_memory)
+    sim.collisions = timings.wrap('Simulation.collisions', sim.collisions)
+    # No collector pauses landing in random operations (as in timeit)
+    gc.collect()
+    gc.disable()
+    try:
+        with instrumented(timings):
+            for frame in range(warmup + frames):
+                if frame == warmup:
+                    timings.clear()
+                inputs = (JUMP,) if hover_policy(sim) else ()
+                # Timed here rather than wrapped, so the operations inside still count
+                started = timings.begin()
+                sim.step(SIMULATION_STEP, inputs)
+                timings.end('Simulation.step', started)
+                started = timings.begin()
+                renderer.render(sim.all_sprites)
+                timings.end('FullRenderer.render', started)
+    finally:
+        gc.enable()
+    return timings
+
+
+def measure(scenario, frames, warmup, seed, repeat, overhead):
+    """
+    Per-operation results of a scenario: the fastest of `repeat` timed runs
+    (with the wrapper overhead taken off) and a separate run under tracemalloc
+    for the memory peak, which only sees Python allocations (not SDL surfaces).
+
+    Returns:
+        {operation: {'calls': per frame, 'ns': per frame, 'peak_bytes': per frame}}
+    """
+    best = {}
+    for _ in range(repeat):
+        timings = run(scenario, frames, warmup, seed)
+        for name, ns in timings.ns.items():
+            if name in ('Simulation.step', 'FullRenderer.render'):
+                nested = 0  # timed directly, not through a wrapper
+            else:
+                nested = timings.calls[name] * overhead
+            ns = max(ns - nested, 0) / frames
+            best[name] = min(best.get(name, ns), ns)
+
+    tracemalloc.start()
+    try:
+        memory = run(scenario, frames, warmup, seed, trace_memory=True)
+    finally:
+        tracemalloc.stop()
+    return {
+        name: {
+            'calls': memory.calls[name] / frames,
+            'ns': round(best[name], 1),
+            'peak_bytes': round(memory.peak_bytes[name] / frames, 1),
+        }
+        for name in sorted(best)
+    }
+
+
+def compare(results, baseline, threshold, min_ns):
+    """
+    Print results against the baseline and return the regressions: operations
+    slower by more than threshold and by more than min_ns per frame (cheap
+    operations are mostly timer noise).
+    """
+    regressions = []
+    print(f'{"scenario":<14}{"operation":<34}{"calls":>7}{"ns/frame":>11}{"peak B":>9}'
+          f'{"baseline":>11}{"change":>9}')
+    for scenario, operations in results.items():
+        for name, result in operations.items():
+            if not result['calls']:
+                continue
+            base = baseline.get(scenario, {}).get(name)
+            line = (f'{scenario:<14}{name:<34}{result["calls"]:7.2f}{result["ns"]:11.0f}'
+                    f'{result["peak_bytes"]:9.0f}')
+            if base and base['ns']:
+                change = result['ns'] / base['ns'] - 1
+                slower = change > threshold and result['ns'] - base['ns'] > min_ns
+                line += f'{base["ns"]:11.0f}{change:+9.1%}' + ('  !' if slower else '')
+                if slower:
+                    regressions.append((scenario, name, change))
+            print(line)
+    return regressions
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(
+        description='Per-operation ns/frame and Python memory peaks of sprite update, draw '
+                    'and collision hot paths in scripted, seeded scenarios.')
+    parser.add_argument('scenarios', nargs='*', metavar='scenario',
+                        help=f'any of {", ".join(SCENARIOS)} (default: all)')
+    parser.add_argument('--frames', type=int, default=600)
+    parser.add_argument('--warmup', type=int, default=120)
+    parser.add_argument('--repeat', type=int, default=5, help='timed runs per scenario; the fastest counts')
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--baseline', default=BASELINE_PATH, help='results to compare against')
+    parser.add_argument('--save', action='store_true', help='store the results as the new baseline')
+    parser.add_argument('--threshold', type=float, default=0.15,
+                        help='slowdown (0.15 = 15%%) reported as a regression')
+    parser.add_argument('--min-ns', type=float, default=2000,
+                        help='smallest slowdown in ns/frame reported as a regression')
+    args = parser.parse_args()
+    unknown = set(args.scenarios) - set(SCENARIOS)
+    if unknown:
+        parser.error(f'unknown scenario: {", ".join(sorted(unknown))}')
+
+    init_headless()
+    overhead = wrapper_overhead()
+    results = {scenario: measure(scenario, args.frames, args.warmup, args.seed, args.repeat, overhead)
+               for scenario in args.scenarios or SCENARIOS}
+
+    baseline = {}
+    if os.path.exists(args.baseline) and not args.save:
+        with open(args.baseline) as file:
+            baseline = json.load(file)['results']
+    regressions = compare(results, baseline, args.threshold, args.min_ns)
+
+    if args.save:
+        with open(args.baseline, 'w') as file:
+            json.dump({
+                'machine': f'{platform.machine()} {platform.processor() or platform.system()}',
+                'python': platform.python_version(),
+                'pygame': pygame.version.ver,
+                'frames': args.frames,
+                'seed': args.seed,
+                'results': results,
+            }, file, indent=1)
+        print(f'Saved baseline to {args.baseline}')
+    elif regressions:
+        print(f'{len(regressions)} operation(s) more than {args.threshold:.0%} slower than the baseline')
+        sys.exit(1)
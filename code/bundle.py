@@ -0,0 +1,271 @@
+import json
+import mmap
+import os
+import struct
+import sys
+import time
+import pygame
+import assets
+import settings
+from assets import RotationAtlas, FrameSequence
+from settings import WINDOW_WIDTH, WINDOW_HEIGHT
+
+# File layout (little endian):
+#   header  magic, version, index length
+#   index   UTF-8 JSON: {"meta": {...}, "entries": {repr(cache key): entry}}
+#   data    raw pixel rows (BGRA, no padding) and mask words, each 64-byte aligned
+# meta["sources"] maps every source file of the entries to its [mtime ns, size]
+# when the bundle was built; a bundle whose sources changed is not used.
+MAGIC = b'FBAB'
+VERSION = 2
+HEADER = struct.Struct('<4sBI')
+ALIGN = 64
+BUNDLE_DIR = '../bundles'
+
+# Screen images that do not go through a Simulation
+UI_IMAGES = ['../graphics/ui/menu.png']
+
+
+def bundle_path(level, size=(WINDOW_WIDTH, WINDOW_HEIGHT)):
+    """Bundles hold pre-scaled images, so each window size gets its own file."""
+    return os.path.join(BUNDLE_DIR, f'level{level}-{size[0]}x{size[1]}.fbab')
+
+
+class AssetBundle:
+    def __init__(self, path):
+        """
+        Read-only view of a bundle file, memory-mapped so that pixel data is
+        only paged in when a surface is first drawn.
+
+        Alpha images are wrapped around the mapping without a copy. Opaque ones
+        are converted to the display format (one memcpy-speed pass), and masks
+        are copied into new Mask objects. The mapping is copy-on-write, so a
+        stray draw onto a shared surface cannot corrupt the file.
+        """
+        self.path = path
+        with open(path, 'rb') as file:
+            self.map = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_COPY)
+        magic, version, index_length = HEADER.unpack_from(self.map)
+        if magic != MAGIC or version != VERSION:
+            raise ValueError(f'{path} is not a version {VERSION} asset bundle')
+        index = json.loads(self.map[HEADER.size:HEADER.size + index_length])
+        self.meta = index['meta']
+        self.entries = index['entries']
+        self.data_start = _align(HEADER.size + index_length)
+        self.view = memoryview(self.map)
+
+    def stale_sources(self):
+        """Source files changed, or gone, since the bundle was built."""
+        built = self.meta.get('sources', {})
+        current = source_stamps(path for path in built if os.path.exists(path))
+        return [path for path, stamp in built.items() if current.get(path) != stamp]
+
+    def get(self, key, convert=True):
+        """
+        Return the cache entry stored under key, or None.
+
+        Args:
+            convert (bool): Convert opaque surfaces to the display format.
+                Pass False off the main thread, where that is not safe, and
+                convert() the result on the main thread.
+        """
+        entry = self.entries.get(repr(key))
+        if entry is None:
+            return None
+        return self._build(entry, convert)
+
+    def _build(self, entry, convert=True):
+        kind = entry['type']
+        if kind == 'surface':
+            return self._surface(entry, convert)
+        if kind == 'mask':
+            return self._mask(entry)
+        if kind == 'rotations':
+            frames = [None] * len(entry['frames'])
+            for i, pair in enumerate(entry['frames']):
+                if pair is not None:
+                    frames[i] = (self._surface(pair[0]), self._mask(pair[1]))
+            return RotationAtlas(self._surface(entry['source']), entry['step'], frames=frames)
+        if kind == 'surfaces':
+            return tuple(self._surface(item) for item in entry['surfaces'])
+        if kind == 'value':
+            value = entry['value']
+            return tuple(value) if isinstance(value, list) else value
+        raise ValueError(f'Unknown bundle entry type: {kind}')
+
+    def _surface(self, entry, convert=True):
+        start = self.data_start + entry['offset']
+        width, height = entry['size']
+        surf = pygame.image.frombuffer(self.view[start:start + width * height * 4], (width, height), 'BGRA')
+        return surf.convert() if convert and not entry['alpha'] else surf
+
+    def _mask(self, entry):
+        start = self.data_start + entry['offset']
+        mask = pygame.mask.Mask(entry['size'])
+        buffer = memoryview(mask).cast('B')
+        buffer[:] = self.view[start:start + buffer.nbytes]
+        return mask
+
+
+class _Writer:
+    # Appends pixel and mask data and returns the index entries describing it
+    def __init__(self):
+        self.data = bytearray()
+
+    def _append(self, payload):
+        offset = len(self.data)
+        self.data += payload
+        self.data += bytes(_align(len(self.data)) - len(self.data))
+        return offset
+
+    def surface(self, surf):
+        alpha = bool(surf.get_flags() & pygame.SRCALPHA)
+        offset = self._append(pygame.image.tobytes(surf, 'BGRA'))
+        return {'type': 'surface', 'offset': offset, 'size': list(surf.get_size()), 'alpha': alpha}
+
+    def mask(self, mask):
+        offset = self._append(memoryview(mask).cast('B'))
+        return {'type': 'mask', 'offset': offset, 'size': list(mask.get_size())}
+
+    def entry(self, value):
+        if isinstance(value, pygame.Surface):
+            return self.surface(value)
+        if isinstance(value, pygame.mask.Mask):
+            return self.mask(value)
+        if isinstance(value, RotationAtlas):
+            frames = [None if pair is None else [self.surface(pair[0]), self.mask(pair[1])]
+                      for pair in value.frames]
+            return {'type': 'rotations', 'source': self.surface(value.surface),
+                    'step': value.step, 'frames': frames}
+        if isinstance(value, tuple) and value and isinstance(value[0], pygame.Surface):
+            return {'type': 'surfaces', 'surfaces': [self.surface(surf) for surf in value]}
+        if isinstance(value, tuple):
+            return {'type': 'value', 'value': list(value)}
+        raise TypeError(f'Cannot bundle {type(value).__name__}')
+
+
+def write_bundle(path, cache, meta=None):
+    """Write every entry of an AssetCache to a bundle file; return its size in bytes."""
+    writer = _Writer()
+    entries = {}
+    bundled = []
+    for key, (value, _) in cache._items.items():
+        if key[0] in ('source', 'sound'):
+            # Unscaled originals and audio stay in their own files
+            continue
+        bundled.append(key)
+        if isinstance(value, FrameSequence):
+            # Stored frame by frame, under the keys cache.frames() looks up
+            for i, frame_path in enumerate(value.paths):
+                frame_key = ('image', frame_path, value.scale, False, False)
+                entries[repr(frame_key)] = writer.surface(value.get(i))
+        else:
+            entries[repr(key)] = writer.entry(value)
+
+    meta = dict(meta or {}, sources=source_stamps(_source_paths(bundled)))
+    index = json.dumps({'meta': meta, 'entries': entries}).encode()
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, 'wb') as file:
+        file.write(HEADER.pack(MAGIC, VERSION, len(index)))
+        file.write(index)
+        file.write(bytes(_align(HEADER.size + len(index)) - HEADER.size - len(index)))
+        file.write(writer.data)
+    return os.path.getsize(path)
+
+
+def build_level(level, frames=3000):
+    """
+    Fill a fresh asset cache by building and playing a level headless, plus
+    its draw-only assets, then write it out. Playing matters: crows, moving
+    obstacles and rotation angles outside the prerendered range are only
+    loaded once they show up. Everything is decoded from the source files,
+    not read from the bundle being replaced.
+    """
+    from simulation import load_simulation, run_headless
+    cache = assets.cache
+    cache.clear()
+    cache.bundles = []
+    use_bundles, settings.USE_ASSET_BUNDLES = settings.USE_ASSET_BUNDLES, False
+    try:
+        sim = load_simulation(level, seed=0)
+        sim.load_draw_assets()
+        run_headless(sim, frames)
+        for path in UI_IMAGES:
+            cache.image(path)
+    finally:
+        settings.USE_ASSET_BUNDLES = use_bundles
+    meta = {'level': level, 'window': [WINDOW_WIDTH, WINDOW_HEIGHT]}
+    return write_bundle(bundle_path(level), cache, meta)
+
+
+def open_level_bundle(level):
+    """
+    The level's AssetBundle, or None when bundles are turned off, it was not
+    built, or it is out of date (an older format, or built from source files
+    that have changed since), in which case the assets are decoded instead.
+    """
+    path = bundle_path(level)
+    if not settings.USE_ASSET_BUNDLES or not os.path.exists(path):
+        return None
+    try:
+        bundle = AssetBundle(path)
+    except ValueError as error:
+        print(f'Ignoring {error}; rebuild it with python bundle.py')
+        return None
+    stale = bundle.stale_sources()
+    if stale:
+        print(f'Ignoring {path}: {len(stale)} source file(s) changed since it was built '
+              f'(e.g. {stale[0]}); rebuild it with python bundle.py')
+        return None
+    return bundle
+
+
+def attach_level_bundle(level, bundle=None):
+    """
+    Use the level's bundle for the shared asset cache if there is an up to
+    date one (see open_level_bundle); return it or None.
+
+    Args:
+        level (int): Level number.
+        bundle (AssetBundle or None): Already opened, e.g. by a preloader.
+    """
+    for attached in assets.cache.bundles:
+        if attached.meta.get('level') == level:
+            return attached
+    if bundle is None:
+        bundle = open_level_bundle(level)
+        if bundle is None:
+            return None
+    assets.cache.attach(bundle)
+    return bundle
+
+
+def source_stamps(paths):
+    """{path: [mtime ns, size]}, what a bundle records of its source files."""
+    stamps = {}
+    for path in paths:
+        stat = os.stat(path)
+        stamps[path] = [stat.st_mtime_ns, stat.st_size]
+    return stamps
+
+
+def _source_paths(keys):
+    # Cache keys are (kind, path or tuple of paths, ...)
+    paths = set()
+    for key in keys:
+        paths.update(key[1] if isinstance(key[1], tuple) else (key[1],))
+    return sorted(paths)
+
+
+def _align(offset):
+    return (offset + ALIGN - 1) // ALIGN * ALIGN
+
+
+if __name__ == '__main__':
+    # Usage: python bundle.py [level ...]   (run from code/, after changing assets)
+    from simulation import init_headless
+    init_headless()
+    for level in [int(arg) for arg in sys.argv[1:]] or [1, 2, 3]:
+        start = time.perf_counter()
+        size = build_level(level)
+        print(f'{bundle_path(level)}: {size / 1e6:.1f} MB in {time.perf_counter() - start:.1f}s')
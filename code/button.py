@@ -1,4 +1,5 @@
 import pygame
+from text import render_text
 
 class Button:
     def __init__(self, image, pos, text_input, font, base_color, hovering_color):
@@ -19,8 +20,10 @@ class Button:
         self.base_color = base_color
         self.hovering_color = hovering_color
         self.text_input = text_input
+        self.color = base_color
+        self.progress = None  # loading bar under the label, see set_progress()
 
-        self.text = self.font.render(self.text_input, True, self.base_color)
+        self.text = render_text(self.font, self.text_input, self.base_color)
         if self.image is None:
             self.image = self.text
 
@@ -32,6 +35,16 @@ class Button:
         if self.image:
             screen.blit(self.image, self.rect)
         screen.blit(self.text, self.text_rect)
+        if self.progress is not None:
+            # Dim track with the loaded part filled in the label color
+            bar = pygame.Rect(self.text_rect.left, self.text_rect.bottom + 2, self.text_rect.width, 3)
+            pygame.draw.rect(screen, (80, 80, 80), bar)
+            bar.width = round(bar.width * self.progress)
+            pygame.draw.rect(screen, self.color, bar)
+
+    def set_progress(self, progress):
+        """Show how far the button's target has loaded: None hides the bar, 1 is ready."""
+        self.progress = progress
 
     def check_for_input(self, position):
         """Return True if the mouse is over the button."""
@@ -39,5 +52,6 @@ class Button:
 
     def change_color(self, position):
         """Update text color based on hover state."""
-        color = self.hovering_color if self.rect.collidepoint(position) else self.base_color
-        self.text = self.font.render(self.text_input, True, color)
+        self.color = self.hovering_color if self.rect.collidepoint(position) else self.base_color
+        # Both colors come from the text cache after the first hover
+        self.text = render_text(self.font, self.text_input, self.color)
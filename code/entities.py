@@ -0,0 +1,159 @@
+import math
+from array import array
+from functools import lru_cache
+import pygame
+from pool import PooledSprite
+from settings import SIMULATION_STEP
+
+# Entity kinds: how EntityGroup.update moves them along x
+SCROLL = 0  # left at vx, the rect following the float x
+CROW = 1    # the rect itself moves by vx * dt; animates and leaves a trail
+
+
+class Motion:
+    def __init__(self, offset, step=SIMULATION_STEP):
+        """
+        Vertical trajectory y = base_y + offset(t), t being the seconds since
+        the entity spawned, tabulated once per simulation step and shared by
+        every entity following it. The table grows as entities get older, so
+        each step costs an entity one lookup whatever the function.
+
+        t adds up step by step (as a per-entity timer would), so the table
+        holds the values that evaluating offset every step gives.
+
+        Args:
+            offset (callable): y offset in pixels at time t.
+            step (float): Seconds per update; EntityGroup.update must be
+                called with this dt (Simulation's fixed step).
+        """
+        self.offset = offset
+        self.step = step
+        self.offsets = [offset(0)]
+        self.t = 0
+
+    def extend(self, steps):
+        """Tabulate the offsets up to `steps` steps after spawning."""
+        offsets, offset, step = self.offsets, self.offset, self.step
+        t = self.t
+        for _ in range(len(offsets), steps + 1):
+            t += step
+            offsets.append(offset(t))
+        self.t = t
+
+
+@lru_cache(maxsize=None)
+def sine_motion(amplitude, frequency, step=SIMULATION_STEP):
+    """Motion bobbing amplitude * sin(frequency * t) around base_y."""
+    return Motion(lambda t: amplitude * math.sin(frequency * t), step)
+
+
+def _column(name):
+    # Property reading and writing a view's row of one EntityGroup column
+    def get(self):
+        return getattr(self.entities, name)[self.index]
+
+    def set(self, value):
+        getattr(self.entities, name)[self.index] = value
+
+    return property(get, set)
+
+
+class EntityView(PooledSprite):
+    """
+    Thin sprite over one row of an EntityGroup's columns: it only draws and
+    collides, and has no update() of its own. Its simulation fields (x, vx,
+    motion, base_y, age) are properties reading the row, so they can only be
+    set once the view is in an EntityGroup; reset() adds it first.
+
+    The class attributes are the same for every sprite of a class and are
+    copied into the row when the view joins the group.
+    """
+    kind = SCROLL
+    speed = 0.0       # initial vx, pixels/sec
+    snap = int        # float x -> rect.x (level 1 uses round)
+    kill_right = 0    # killed once the rect's right edge is at or left of this
+
+    x = _column('xs')
+    vx = _column('vxs')
+    motion = _column('motions')  # Motion moving the rect's y, if any
+    base_y = _column('base_ys')
+    age = _column('ages')        # updates since spawning, indexing motion.offsets
+
+    def __init__(self):
+        super().__init__()
+        self.entities = None  # EntityGroup holding the view's row, and the row
+        self.index = None
+
+
+class EntityGroup(pygame.sprite.Group):
+    def __init__(self):
+        """
+        Sprite group storing the simulation state of its EntityViews in
+        parallel columns, row i belonging to views[i], so one loop moves every
+        obstacle and crow without a method call or a dict per sprite. Numbers
+        are kept unboxed in arrays. A view leaving the group has the last row
+        moved into its place, so removal does not shift the columns.
+        """
+        super().__init__()
+        self.views = []
+        self.kinds = array('b')
+        self.xs = array('d')
+        self.vxs = array('d')
+        self.snaps = []
+        self.kill_rights = array('l')
+        self.motions = []
+        self.base_ys = array('l')
+        self.ages = array('l')
+        self.columns = (self.views, self.kinds, self.xs, self.vxs, self.snaps,
+                        self.kill_rights, self.motions, self.base_ys, self.ages)
+
+    def add_internal(self, sprite, layer=None):
+        super().add_internal(sprite, layer)
+        sprite.entities = self
+        sprite.index = len(self.views)
+        self.views.append(sprite)
+        self.kinds.append(sprite.kind)
+        self.xs.append(0.0)
+        self.vxs.append(sprite.speed)
+        self.snaps.append(sprite.snap)
+        self.kill_rights.append(sprite.kill_right)
+        self.motions.append(None)
+        self.base_ys.append(0)
+        self.ages.append(0)
+
+    def remove_internal(self, sprite):
+        super().remove_internal(sprite)
+        index = sprite.index
+        for column in self.columns:
+            column[index] = column[-1]
+            column.pop()
+        if index < len(self.views):
+            self.views[index].index = index
+        sprite.entities = sprite.index = None
+
+    def update(self, dt):
+        # dt is the fixed simulation step that Motion tables are built for
+        views, kinds, xs, vxs, snaps = self.views, self.kinds, self.xs, self.vxs, self.snaps
+        kill_rights, motions, base_ys, ages = self.kill_rights, self.motions, self.base_ys, self.ages
+        dead = []
+        for i, view in enumerate(views):
+            rect = view.rect
+            if kinds[i] == CROW:
+                view.animate(dt)
+                rect.x += vxs[i] * dt
+            else:
+                x = xs[i] = xs[i] + vxs[i] * dt
+                rect.x = snaps[i](x)
+            if rect.right <= kill_rights[i]:
+                dead.append(view)
+                continue
+            motion = motions[i]
+            if motion is not None:
+                age = ages[i] = ages[i] + 1
+                offsets = motion.offsets
+                if age >= len(offsets):
+                    motion.extend(age)
+                rect.y = base_ys[i] + offsets[age]
+        # Killing moves rows around, so not while looping over them
+        for view in dead:
+            view.kill()
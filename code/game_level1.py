@@ -1,115 +1,170 @@
 import pygame
 import sys
-import time
 from settings import *
-from spritesLevelOne import BG, Ground, Pony, Obstacle
+from spritesLevelOne import BG, Ground, Pony, Obstacle, plan_obstacle, obstacle_bounds
+from simulation import Simulation, FixedStepper, JUMP
+from scenes import Scene, SceneManager
+from replay import ReplayRecorder
+from assets import load_image
+from audio import play_music, stop_music, play_sfx
+from profiler import FrameProfiler
+from pacing import FramePacer, set_mode
+from rendering import make_renderer, UiImage, UiText
+
+# Files the level select screen loads ahead of time: (path, alpha), sounds and
+# the images whose rotation atlases it renders
+# (see preload.py; the background frames stream in on their own thread)
+PRELOAD_IMAGES = [
+    ('../graphics/environment/ground1.png', True),
+    *[(f'../graphics/pony/fly{i}.png', True) for i in range(3)],
+    ('../graphics/obstacles/3.png', True),
+    ('../graphics/obstacles/4.png', True),
+    ('../graphics/ui/menu.png', True),
+]
+PRELOAD_SOUNDS = ['../sounds/jump.wav']
+PRELOAD_ROTATIONS = [f'../graphics/pony/fly{i}.png' for i in range(3)]
+
+PLAYER_SCALE = 1 / 1.7  # of the level's scale factor
+
+
+class Level1Simulation(Simulation):
+    level = 1
+    background_path = '../graphics/environment/background0.png'
+
+    def build_world(self):
+        BG(self.all_sprites, self.scale_factor)
+        Ground([self.all_sprites, self.collision_sprites], self.scale_factor)
 
-class Game:
-    def __init__(self):
-        # Initialize pygame, display, and clock
-        pygame.init()
-        self.display_surface = pygame.display.set_mode((WINDOW_WIDTH, WINDOW_HEIGHT))
-        pygame.display.set_caption("Level 1")
-        self.clock = pygame.time.Clock()
-        self.active = True
+    def spawn_player(self):
+        return Pony(self.all_sprites, self.scale_factor * PLAYER_SCALE)
 
-        # Sprite groups for drawing and collision detection
-        self.all_sprites = pygame.sprite.Group()
-        self.collision_sprites = pygame.sprite.Group()
+    def plan_obstacle(self, rng):
+        return plan_obstacle(rng)
 
-        # Calculate scale factor for images based on background height
-        bg_image = pygame.image.load('../graphics/environment/background0.png')
-        self.scale_factor = WINDOW_HEIGHT / bg_image.get_height()
+    def obstacle_bounds(self, params):
+        return [obstacle_bounds(params, self.scale_factor * 1.1)]
 
-        # Create initial game objects
-        BG(self.all_sprites, self.scale_factor)
-        Ground([self.all_sprites, self.collision_sprites], self.scale_factor)
-        self.pony = Pony(self.all_sprites, self.scale_factor / 1.7)
+    def spawn_obstacle(self, params):
+        self.pool(Obstacle).acquire([self.all_sprites, self.collision_sprites, self.entities],
+                                    self.scale_factor * 1.1, params)
+
+    def collisions(self):
+        # Check for collisions between pony and obstacles/ground or ceiling
+        hit = self.broad_phase.first_hit(self.player, self.collision_sprites)
+        if hit:
+            return hit.sprite_type
+        if self.player.rect.top <= 0:
+            return 'ceiling'
+        return None
+
+
+class Game(Scene):
+    def __init__(self, seed=None, record_path=None):
+        # Initialize pygame, display, and frame pacing
+        pygame.init()
+        self.display_surface = set_mode((WINDOW_WIDTH, WINDOW_HEIGHT))
+        pygame.display.set_caption("Level 1")
+        self.pacer = FramePacer()
+
+        # Game logic runs in fixed steps, independent of the frame rate
+        self.sim = Level1Simulation(seed)
+        self.sim.load_draw_assets()
+        self.record_path = record_path
+        self.recorder = ReplayRecorder(1, self.sim) if record_path else None
+        self.stepper = FixedStepper()
+        self.pending_inputs = set()
 
-        # Setup obstacle spawn timer event
-        self.obstacle_timer = pygame.USEREVENT + 1
-        pygame.time.set_timer(self.obstacle_timer, 1400)
+        # Per-phase frame timings (F3 shows the overlay)
+        self.profiler = FrameProfiler()
+        self.sim.profiler = self.profiler
 
         # Font setup for score display
         self.font = pygame.font.Font('../graphics/font/BD_Cartoon_Shout.ttf', 30)
-        self.score = 0
-        self.start_offset = 0
 
         # Load menu image and set center position
-        self.menu_surf = pygame.image.load('../graphics/ui/menu.png').convert_alpha()
+        self.menu_surf = load_image('../graphics/ui/menu.png')
         self.menu_rect = self.menu_surf.get_rect(center=(WINDOW_WIDTH / 2, WINDOW_HEIGHT / 2))
 
-        # Background music setup and loop play
-        self.music = pygame.mixer.Sound('../sounds/music1.wav')
-        self.music.play(loops=-1)
-
-    def collisions(self):
-        # Check for collisions between pony and obstacles or ceiling
-        collision = pygame.sprite.spritecollide(
-            self.pony, self.collision_sprites, False, pygame.sprite.collide_mask
-        ) or self.pony.rect.top <= 0
-
-        if collision:
-            # Remove all obstacle sprites on collision
-            for sprite in self.collision_sprites.sprites():
-                if getattr(sprite, 'sprite_type', None) == 'obstacle':
-                    sprite.kill()
-            self.active = False
-            self.pony.kill()
+        # Score and menu are drawn above the world by the renderer
+        self.renderer = make_renderer(self.display_surface)
+        self.score_text = self.renderer.add_ui(UiText(self.font, 'black'))
+        self.menu = self.renderer.add_ui(UiImage(self.menu_surf, self.menu_rect, visible=False))
 
     def display_score(self):
         # Display current score; position depends on game state
-        y = WINDOW_HEIGHT / 10 if self.active else WINDOW_HEIGHT / 2 + self.menu_rect.height / 1.5
-        if self.active:
-            # Score is time elapsed since game start in seconds
-            self.score = (pygame.time.get_ticks() - self.start_offset) // 1000
-
-        score_surf = self.font.render(str(self.score), True, 'black')
-        score_rect = score_surf.get_rect(midtop=(WINDOW_WIDTH / 2, y))
-        self.display_surface.blit(score_surf, score_rect)
+        y = WINDOW_HEIGHT / 10 if self.sim.active else WINDOW_HEIGHT / 2 + self.menu_rect.height / 1.5
+        self.score_text.set_text(str(self.sim.score), (WINDOW_WIDTH / 2, y))
+
+    def save_session(self):
+        # Replay file and profiler trace, when enabled
+        if self.recorder:
+            self.recorder.save(self.record_path)
+        self.profiler.dump_trace()
+
+    def enter(self, manager):
+        super().enter(manager)
+        # Background music, streamed in a loop
+        play_music(MUSIC_PATH)
+        self.pacer.start()
+
+    def exit(self):
+        self.save_session()
+        stop_music()
+        self.pacer.close()
 
     def run(self):
-        last_time = time.time()
+        """Play this level on its own until the window is closed."""
+        SceneManager().run(self)
+        pygame.quit()
 
-        while True:
-            # Calculate delta time for smooth movement
-            dt = time.time() - last_time
-            last_time = time.time()
+    def step(self):
+        # Delta time for smooth movement; sleeps until the frame is due
+        # and is clamped after a stall
+        dt = self.pacer.tick()
 
-            # Event handling loop
+        # Event handling loop
+        with self.profiler.phase('events'):
             for event in pygame.event.get():
+                self.profiler.handle_event(event)
                 if event.type == pygame.QUIT:
-                    pygame.quit()
-                    sys.exit()
+                    self.manager.quit()
+                    return
 
                 if event.type == pygame.MOUSEBUTTONDOWN:
-                    if self.active:
-                        self.pony.jump()
+                    if self.sim.active:
+                        self.pending_inputs.add(JUMP)
                     else:
                         # Reset game after crash
-                        self.pony = Pony(self.all_sprites, self.scale_factor / 1.7)
-                        self.active = True
-                        self.start_offset = pygame.time.get_ticks()
-
-                if event.type == self.obstacle_timer and self.active:
-                    # Spawn new obstacles at timed intervals
-                    Obstacle([self.all_sprites, self.collision_sprites], self.scale_factor * 1.1)
-
-            # Draw background and sprites
-            self.display_surface.fill('black')
-            self.all_sprites.update(dt)
-            self.all_sprites.draw(self.display_surface)
+                        self.sim.reset()
+
+        # Advance the simulation; inputs apply to the first step they reach
+        for _ in range(self.stepper.advance(dt)):
+            self.sim.step(self.stepper.step, self.pending_inputs)
+            self.pending_inputs.clear()
+
+        for sim_event in self.sim.pop_events():
+            if sim_event == JUMP:
+                play_sfx('../sounds/jump.wav')
+
+        with self.profiler.phase('score'):
             self.display_score()
 
-            # Check collisions if game active, else show menu
-            if self.active:
-                self.collisions()
-            else:
-                self.display_surface.blit(self.menu_surf, self.menu_rect)
+        # Show menu after a crash
+        self.menu.show(not self.sim.active)
+
+        # Draw background, sprites and UI
+        with self.profiler.phase('draw'):
+            self.renderer.render(self.sim.all_sprites)
 
-            pygame.display.update()
-            # Optional framerate cap
-            # self.clock.tick(FRAMERATE)
+        if self.profiler.overlay_visible:
+            self.profiler.draw(self.display_surface)
+            self.renderer.invalidate()
+        with self.profiler.phase('display'):
+            self.renderer.present()
+        self.profiler.end_frame()
 
 if __name__ == '__main__':
-    Game().run()
+    # Usage: python game_level1.py [seed] [replay file to record]
+    seed = int(sys.argv[1]) if len(sys.argv) > 1 else None
+    record_path = sys.argv[2] if len(sys.argv) > 2 else None
+    Game(seed, record_path).run()
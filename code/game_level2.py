@@ -1,175 +1,358 @@
 import pygame
 import sys
-import time
-import random
-import math
 import settings
-from settings import WINDOW_WIDTH, WINDOW_HEIGHT, FRAMERATE
-from sprites import BG, Ground, Plane, Obstacle
+from settings import WINDOW_WIDTH, WINDOW_HEIGHT
+from sprites import BG, Ground, Plane, Obstacle, plan_obstacle, obstacle_bounds
 from button import Button
+from assets import load_image, load_mask, load_faded, load_opaque_rows
+from audio import play_music, stop_music, play_sfx
+from entities import EntityView, CROW, sine_motion
+from schedule import CROWS
+from simulation import Simulation, FixedStepper, JUMP
+from scenes import Scene, SceneManager
+from replay import ReplayRecorder
+from profiler import FrameProfiler
+from pacing import FramePacer, set_mode
+from rendering import make_renderer, UiImage, UiText, UiButton
+
+
+# Files the level select screen loads ahead of time: (path, alpha), sounds and
+# the images whose rotation atlases it renders
+# (see preload.py)
+PRELOAD_IMAGES = [
+    (settings.BG_IMG_PATH, False),
+    (settings.GROUND_IMG_PATH, True),
+    *[(settings.PLANE_IMG_PATH.format(i), True) for i in range(3)],
+    *[(settings.OBSTACLE_IMG_PATH.format(i), True) for i in range(2)],
+    ("../graphics/level_2/crow_idle.png", True),
+    ("../graphics/level_2/crow_fly.png", True),
+    ("../graphics/ui/menu.png", True),
+]
+PRELOAD_SOUNDS = [settings.JUMP_SOUND_PATH]
+PRELOAD_ROTATIONS = [settings.PLANE_IMG_PATH.format(i) for i in range(3)]
+
+PLAYER_SCALE = 1 / 1.7  # of the level's scale factor
+
+# Crow ghost trail: the last TRAIL_LENGTH positions, drawn with these alphas
+# (newest first) from pre-faded copies of the crow frames
+CROW_PATHS = ("../graphics/level_2/crow_idle.png", "../graphics/level_2/crow_fly.png")
+CROW_SHRINK = 0.5  # crows are drawn at 50% of the scale they are spawned with
+TRAIL_LENGTH = 10
+TRAIL_ALPHAS = tuple(180 - age * (180 // TRAIL_LENGTH) for age in range(TRAIL_LENGTH))
+
+# Crow spawns: speed range (leftward, pixels/sec), heights and the least
+# height difference between the two crows of a pair
+CROW_SPEEDS = (-850, -600)
+CROW_HEIGHTS = (WINDOW_HEIGHT // 5, WINDOW_HEIGHT * 2 // 3)
+CROW_PAIR_DISTANCE = 180
+
+
+class Crow(EntityView):
+    sprite_type = 'crow'
+    kind = CROW
+    kill_right = -1
+
+    def __init__(self, groups, pos, speed, scale_factor=1):
+        super().__init__()
 
+        # Animation
+        self.animation_speed = 10  # frames per second
 
-class Crow(pygame.sprite.Sprite):
-    def __init__(self, all_sprites, obstacle_sprites, pos, scale_factor=1):
-        super().__init__(all_sprites, obstacle_sprites)
+        # Old positions for the ghost trail: a ring buffer of reused rects,
+        # trail_head being the slot written next
+        self.trail = [pygame.Rect(0, 0, 0, 0) for _ in range(TRAIL_LENGTH)]
+        self.trail_head = 0
+        self.trail_count = 0
 
-        # Load frames
-        self.frames = [
-            pygame.image.load("../graphics/level_2/crow_idle.png").convert_alpha(),
-            pygame.image.load("../graphics/level_2/crow_fly.png").convert_alpha()
-        ]
+        self.reset(groups, pos, speed, scale_factor)
 
-        # Scale frames smaller
-        shrink_factor = 0.5  # 50% size
-        self.frames = [
-            pygame.transform.scale_by(frame, scale_factor * shrink_factor)
-            for frame in self.frames
-        ]
+    def reset(self, groups, pos, speed, scale_factor=1):
+        self.add(groups)
+
+        # Load frames, scaled smaller
+        self.scale_factor = scale_factor
+        self.frames = [load_image(path, scale_factor * CROW_SHRINK) for path in CROW_PATHS]
+        self.masks = [load_mask(path, scale_factor * CROW_SHRINK) for path in CROW_PATHS]
+        self.faded_frames = None  # loaded on first draw, see load_faded_frames()
 
         self.frame_index = 0
         self.image = self.frames[self.frame_index]
         self.rect = self.image.get_rect(midleft=pos)
-        self.mask = pygame.mask.from_surface(self.image)
-
-        # Animation
-        self.animation_speed = 10  # frames per second
+        self.mask = self.masks[self.frame_index]
         self.timer = 0
 
-        # Movement speed (leftward)
-        self.speed = random.randint(-850, -600)  # pixels/sec
-
-        # Store old positions for ghost trail effect
-        self.trail = []
+        # Movement speed (leftward, pixels/sec), applied by the EntityGroup
+        self.vx = speed
+        self.trail_count = 0
 
     def animate(self, dt):
+        # Called by the EntityGroup before it moves the crow
         self.timer += self.animation_speed * dt
         if self.timer >= 1:
             self.timer = 0
             self.frame_index = (self.frame_index + 1) % len(self.frames)
             self.image = self.frames[self.frame_index]
-            self.mask = pygame.mask.from_surface(self.image)
+            self.mask = self.masks[self.frame_index]
 
-    def update(self, dt):
-        self.animate(dt)
+        # Add current position to trail, overwriting the oldest once full
+        self.trail[self.trail_head].update(self.rect)
+        self.trail_head = (self.trail_head + 1) % TRAIL_LENGTH
+        self.trail_count = min(self.trail_count + 1, TRAIL_LENGTH)
 
-        # Add current position to trail
-        self.trail.append(self.rect.copy())
-        if len(self.trail) > 10:  # keep only last 5 positions
-            self.trail.pop(0)
-
-        # Move crow
-        self.rect.x += self.speed * dt
-
-        # Remove if off-screen
-        if self.rect.right < 0:
-            self.kill()
+    @staticmethod
+    def load_faded_frames(scale_factor):
+        """Per animation frame, one faded copy per TRAIL_ALPHAS entry."""
+        return [load_faded(path, scale_factor * CROW_SHRINK, TRAIL_ALPHAS) for path in CROW_PATHS]
 
     def draw(self, surface):
-        max_alpha = 180  # Start of trail visibility
-        min_alpha = 0  # End of trail visibility
-        fade_range = max_alpha - min_alpha
-
-        # Draw old positions first (faded)
-        for i, old_rect in enumerate(self.trail):
-            temp_img = self.image.copy()
-            fade = max_alpha - ((len(self.trail) - i - 1) * (fade_range // len(self.trail)))     #alpha for trail effects
-            temp_img.set_alpha(fade)
-            surface.blit(temp_img, old_rect)
-
-        # Draw current crow
+        if self.faded_frames is None:
+            self.faded_frames = self.load_faded_frames(self.scale_factor)
+        faded = self.faded_frames[self.frame_index]
+
+        # Old positions first, oldest (faintest) at the bottom, then the crow
+        head = self.trail_head
+        surface.blits([(faded[age], self.trail[(head - 1 - age) % TRAIL_LENGTH])
+                       for age in range(self.trail_count - 1, -1, -1)], False)
         surface.blit(self.image, self.rect)
 
+    def bounds(self):
+        """Screen area touched by draw(), trail included."""
+        return self.rect.unionall(self.trail[:self.trail_count])
 
-class CustomObstacle(pygame.sprite.Sprite):
-    def __init__(self, groups, scale_factor, flipped, x_pos, y_pos, offset=0):
-        super().__init__(groups)
 
-        sprite_index = 0  # or random if you want variation
-        surf = pygame.image.load(settings.OBSTACLE_IMG_PATH.format(sprite_index)).convert_alpha()
+class CustomObstacle(EntityView):
+    sprite_type = 'obstacle'
+    speed = -settings.OBSTACLE_SCROLL_SPEED
+    kill_right = -101
 
-        if flipped:
-            surf = pygame.transform.flip(surf, False, True)
+    def __init__(self, groups, scale_factor, flipped, x_pos, y_pos, offset=0):
+        super().__init__()
+        # Not self.reset: subclasses extend reset with their own arguments
+        CustomObstacle.reset(self, groups, scale_factor, flipped, x_pos, y_pos, offset)
 
-        self.image = pygame.transform.scale(
-            surf,
-            pygame.math.Vector2(surf.get_size()) * scale_factor
-        )
+    def reset(self, groups, scale_factor, flipped, x_pos, y_pos, offset=0):
+        self.add(groups)
+
+        sprite_index = 0  # or random if you want variation
+        path = settings.OBSTACLE_IMG_PATH.format(sprite_index)
+        self.image = load_image(path, scale_factor, flipped)
 
         if flipped:
             self.rect = self.image.get_rect(midtop=(x_pos, y_pos + offset))
         else:
             self.rect = self.image.get_rect(midbottom=(x_pos, y_pos - offset))
-        self.pos = pygame.math.Vector2(self.rect.topleft)
-        self.mask = pygame.mask.from_surface(self.image)
+        self.x = self.rect.x
+        self.mask = load_mask(path, scale_factor, flipped)
 
-    def update(self, dt):
-        self.pos.x -= settings.OBSTACLE_SCROLL_SPEED * dt
-        self.rect.x = int(self.pos.x)
-        if self.rect.right < -100:
-            self.kill()
+def spawn_double_obstacle(groups, scale_factor=0.4, spawn=CustomObstacle):
+    """A CustomObstacle from the floor and one from the ceiling, at the same x."""
+    x = settings.WINDOW_WIDTH + 60
 
-class DoubleObstacle:
-    def __init__(self, all_sprites, collision_sprites, obstacles, scale_factor=0.4, gap_size=250):
-        x = settings.WINDOW_WIDTH + 60
+    offset = -50  # tweak this to taste
 
-        offset = -50  # tweak this to taste
+    top_y = 0 + offset  # push top one down by offset
+    bottom_y = WINDOW_HEIGHT - offset  # push bottom one up by offset
 
-        top_y = 0 + offset  # push top one down by offset
-        bottom_y = WINDOW_HEIGHT - offset  # push bottom one up by offset
+    spawn(groups, scale_factor, flipped=False, x_pos=x, y_pos=bottom_y)
+    spawn(groups, scale_factor, flipped=True, x_pos=x, y_pos=top_y)
 
-        CustomObstacle([all_sprites, collision_sprites, obstacles], scale_factor, flipped=False, x_pos=x, y_pos=bottom_y)
-        CustomObstacle([all_sprites, collision_sprites, obstacles], scale_factor, flipped=True, x_pos=x, y_pos=top_y)
+
+def custom_obstacle_bounds(scale_factor, flipped, y_pos):
+    """(top, bottom) span a CustomObstacle placed so blocks."""
+    path = settings.OBSTACLE_IMG_PATH.format(0)
+    image = load_image(path, scale_factor, flipped)
+    if flipped:
+        rect = image.get_rect(midtop=(0, y_pos))
+    else:
+        rect = image.get_rect(midbottom=(0, y_pos))
+    top, bottom = load_opaque_rows(path, scale_factor, flipped)
+    return rect.top + top, rect.top + bottom
 
 
 class MovingObstacle(CustomObstacle):
     def __init__(self, groups, scale_factor, flipped, x_pos, y_pos, amplitude=20, speed=2):
         super().__init__(groups, scale_factor, flipped, x_pos, y_pos)
-        self.start_y = y_pos
-        self.amplitude = amplitude
-        self.speed = speed
-        self.time = 0
+        self.set_motion(y_pos, amplitude, speed)
 
-    def update(self, dt):
-        super().update(dt)
-        self.time += dt
-        # Move vertically in sine wave pattern
-        self.rect.y = self.start_y + self.amplitude * math.sin(self.speed * self.time)
+    def reset(self, groups, scale_factor, flipped, x_pos, y_pos, amplitude=20, speed=2):
+        super().reset(groups, scale_factor, flipped, x_pos, y_pos)
+        self.set_motion(y_pos, amplitude, speed)
 
+    def set_motion(self, y_pos, amplitude, speed):
+        # Bobs vertically in a sine wave around where reset placed it (see
+        # entities.Motion); y_pos is the bottom of a standing obstacle, not its top
+        self.motion = sine_motion(amplitude, speed)
+        self.base_y = self.rect.y
+        self.age = 0
 
-class Game:
-    def __init__(self):
-        pygame.init()
-        self.display_surface = pygame.display.set_mode((WINDOW_WIDTH, WINDOW_HEIGHT))
-        pygame.display.set_caption("Level 2")
-        self.clock = pygame.time.Clock()
-        self.active = True
 
-        # Sprite groups
-        self.all_sprites = pygame.sprite.Group()
-        self.collision_sprites = pygame.sprite.Group()  # ground + obstacles
-        self.obstacles = pygame.sprite.Group()  # just obstacles
+class Level2Simulation(Simulation):
+    level = 2
+    crow_spacing = 1200  # px of distance between crow spawns
+    moving_amplitude = 70  # MovingObstacle bob, pixels up and down
+
+    def __init__(self, seed=None):
+        self.obstacles = pygame.sprite.Group()  # obstacles and crows
+        super().__init__(seed)
+
+    def build_world(self):
+        # The whole world is rebuilt on every reset
+        pass
+
+    @property
+    def crow_groups(self):
+        return [self.all_sprites, self.obstacles, self.entities]
+
+    @property
+    def crow_scale(self):
+        return self.scale_factor / 1.5
+
+    def spawn_player(self):
+        return Plane(self.all_sprites, scale_factor=self.scale_factor * PLAYER_SCALE)
+
+    def load_draw_assets(self):
+        Crow.load_faded_frames(self.crow_scale)
+
+    def reset(self):
+        self.clear_obstacles()  # hands them back to their pools
+        self.all_sprites.empty()
+        self.collision_sprites.empty()
+        self.obstacles.empty()
 
-        # Background
-        bg_height = pygame.image.load("../graphics/environment/background.png").get_height()
-        self.scale_factor = WINDOW_HEIGHT / bg_height
         BG(self.all_sprites, scale_factor=self.scale_factor)
         Ground(self.all_sprites, self.collision_sprites, scale_factor=self.scale_factor)
-        self.plane = Plane(self.all_sprites, scale_factor=self.scale_factor / 1.7)
+        self.player = None
+        super().reset()
 
-        # Timers
-        self.obstacle_timer = pygame.USEREVENT + 1
-        pygame.time.set_timer(self.obstacle_timer, 1400)
+    def make_schedule(self):
+        schedule = super().make_schedule()
+        schedule.add_track(CROWS, lambda rng: self.crow_spacing, self.plan_crows, self.crow_bounds)
+        return schedule
 
-        self.crow_timer = pygame.USEREVENT + 2
-        pygame.time.set_timer(self.crow_timer, 3000)  # every 3 seconds
+    def spawn(self, spawn):
+        if spawn.kind == CROWS:
+            self.spawn_crows(spawn.params)
+        else:
+            super().spawn(spawn)
+
+    def plan_obstacle(self, rng):
+        # ('double',), ('moving', flipped) or ('single', Obstacle placement)
+        if rng.random() < 0.2:   # chance for a double obstacle
+            return ('double',)
+        if rng.random() < 0.4:  # chance for moving obstacle spawn
+            return ('moving', rng.choice([True, False]))
+        return ('single', plan_obstacle(rng))
+
+    def obstacle_bounds(self, params):
+        shape = params[0]
+        if shape == 'double':
+            # Placed as spawn_double_obstacle places them
+            scale_factor = self.scale_factor * 0.8
+            return [custom_obstacle_bounds(scale_factor, False, WINDOW_HEIGHT + 50),
+                    custom_obstacle_bounds(scale_factor, True, -50)]
+        if shape == 'moving':
+            flipped = params[1]
+            top, bottom = custom_obstacle_bounds(self.scale_factor * 1.1, flipped, self.moving_y(flipped))
+            return [(top - self.moving_amplitude, bottom + self.moving_amplitude)]
+        return [obstacle_bounds(params[1], self.scale_factor * 1.1)]
+
+    @staticmethod
+    def moving_y(flipped):
+        y = -80
+        if flipped:
+            return y  # near top of screen for flipped obstacle
+        return WINDOW_HEIGHT - y  # near bottom for normal obstacle
+
+    def spawn_obstacle(self, params):
+        shape = params[0]
+        if shape == 'double':
+            spawn_double_obstacle([self.all_sprites, self.collision_sprites, self.obstacles, self.entities],
+                                  scale_factor=self.scale_factor * 0.8, spawn=self.pool(CustomObstacle).acquire)
+        elif shape == 'moving':
+            flipped = params[1]
+            self.pool(MovingObstacle).acquire(
+                [self.all_sprites, self.collision_sprites, self.obstacles, self.entities],
+                scale_factor=self.scale_factor * 1.1,
+                flipped=flipped,
+                x_pos=WINDOW_WIDTH + 60,
+                y_pos=self.moving_y(flipped),
+                amplitude=self.moving_amplitude,
+                speed=3
+            )
+        else:
+            self.pool(Obstacle).acquire(self.all_sprites, self.collision_sprites, self.obstacles, self.entities,
+                                        scale_factor=self.scale_factor * 1.1, placement=params[1])
+
+    def plan_crows(self, rng):
+        """((y, speed), ...) of the crows of one spawn."""
+        low, high = CROW_HEIGHTS
+        if rng.random() < 0.2:  # 20% chance for 2 crows
+            y1 = rng.randint(low, high)
+            # y2 drawn from the heights far enough from y1 (no retries)
+            below = max(0, y1 - CROW_PAIR_DISTANCE - low + 1)  # low .. y1 - distance
+            above = max(0, high - (y1 + CROW_PAIR_DISTANCE) + 1)  # y1 + distance .. high
+            if below + above:
+                i = rng.randrange(below + above)
+                y2 = low + i if i < below else y1 + CROW_PAIR_DISTANCE + i - below
+                return (y1, rng.randint(*CROW_SPEEDS)), (y2, rng.randint(*CROW_SPEEDS))
+            heights = (y1,)
+        else:  # 80% chance for 1 crow
+            heights = (rng.randint(low, high),)
+        return tuple((y, rng.randint(*CROW_SPEEDS)) for y in heights)
+
+    def crow_bounds(self, params):
+        scale_factor = self.crow_scale * CROW_SHRINK
+        spans = []
+        for y, speed in params:
+            for path in CROW_PATHS:
+                rect = load_image(path, scale_factor).get_rect(midleft=(WINDOW_WIDTH, y))
+                top, bottom = load_opaque_rows(path, scale_factor)
+                spans.append((rect.top + top, rect.top + bottom))
+        return spans
+
+    def spawn_crows(self, params):
+        for y, speed in params:
+            self.pool(Crow).acquire(self.crow_groups, pos=(WINDOW_WIDTH, y), speed=speed, scale_factor=self.crow_scale)
+
+    def collisions(self):
+        hit = self.broad_phase.first_hit(self.player, self.obstacles)
+        if hit:
+            return hit.sprite_type
+        if self.player.rect.top <= 0:
+            return 'ceiling'
+        if self.player.rect.bottom >= WINDOW_HEIGHT:
+            return 'floor'
+        return None
+
+    def clear_obstacles(self):
+        for sprite in self.obstacles:
+            sprite.kill()
+
+
+class Game(Scene):
+    def __init__(self, seed=None, record_path=None):
+        pygame.init()
+        self.display_surface = set_mode((WINDOW_WIDTH, WINDOW_HEIGHT))
+        pygame.display.set_caption("Level 2")
+        self.pacer = FramePacer()
+
+        # Game logic runs in fixed steps, independent of the frame rate
+        self.sim = Level2Simulation(seed)
+        self.sim.load_draw_assets()
+        self.record_path = record_path
+        self.recorder = ReplayRecorder(2, self.sim) if record_path else None
+        self.stepper = FixedStepper()
+        self.pending_inputs = set()
+
+        # Per-phase frame timings (F3 shows the overlay)
+        self.profiler = FrameProfiler()
+        self.sim.profiler = self.profiler
 
         # Score
         self.font = pygame.font.Font("../graphics/font/BD_Cartoon_Shout.ttf", 30)
-        self.score = 0
-        self.start_offset = pygame.time.get_ticks()
 
         # Death menu
-        self.menu_surf = pygame.image.load("../graphics/ui/menu.png").convert_alpha()
+        self.menu_surf = load_image("../graphics/ui/menu.png")
         self.menu_rect = self.menu_surf.get_rect(center=(WINDOW_WIDTH / 2, WINDOW_HEIGHT / 2))
 
         # Main menu button (clickable on death screen)
@@ -182,134 +365,96 @@ class Game:
             "red"
         )
 
-        # Music
-        self.music = pygame.mixer.Sound("../sounds/music.wav")
-        self.music.set_volume(settings.BGM_VOLUME)
-        self.music.play(loops=-1)
-
-    def collisions(self):
-        if pygame.sprite.spritecollide(self.plane, self.obstacles, False, pygame.sprite.collide_mask) \
-                or self.plane.rect.top <= 0 \
-                or self.plane.rect.bottom >= WINDOW_HEIGHT:
-            for sprite in self.obstacles:
-                sprite.kill()
-            self.active = False
-            self.plane.kill()
+        # UI drawn above the world by the renderer
+        self.renderer = make_renderer(self.display_surface)
+        self.menu = self.renderer.add_ui(UiImage(self.menu_surf, self.menu_rect, visible=False))
+        self.menu_button = self.renderer.add_ui(UiButton(self.main_menu_button, visible=False))
+        self.score_text = self.renderer.add_ui(UiText(self.font, "black"))
 
     def display_score(self):
-        if self.active:
-            self.score = (pygame.time.get_ticks() - self.start_offset) // 1000
+        if self.sim.active:
             y = WINDOW_HEIGHT / 10
         else:
             y = WINDOW_HEIGHT / 2 + (self.menu_rect.height / 1.5)
 
-        score_surf = self.font.render(str(self.score), True, "black")
-        score_rect = score_surf.get_rect(midtop=(WINDOW_WIDTH / 2, y))
-        self.display_surface.blit(score_surf, score_rect)
+        self.score_text.set_text(str(self.sim.score), (WINDOW_WIDTH / 2, y))
 
-    def reset_game(self):
-        self.all_sprites.empty()
-        self.collision_sprites.empty()
-        self.obstacles.empty()
+    def save_session(self):
+        # Replay file and profiler trace, when enabled
+        if self.recorder:
+            self.recorder.save(self.record_path)
+        self.profiler.dump_trace()
 
-        BG(self.all_sprites, scale_factor=self.scale_factor)
-        Ground(self.all_sprites, self.collision_sprites, scale_factor=self.scale_factor)
-        self.plane = Plane(self.all_sprites, scale_factor=self.scale_factor / 1.7)
+    def enter(self, manager):
+        super().enter(manager)
+        # Background music, streamed in a loop
+        play_music(settings.MUSIC_PATH)
+        self.pacer.start()
 
-        self.active = True
-        self.start_offset = pygame.time.get_ticks()
-        self.score = 0
+    def exit(self):
+        self.save_session()
+        stop_music()
+        self.pacer.close()
 
     def run(self):
-        last_time = time.time()
+        """Play this level on its own until the window is closed (MAIN MENU closes it too)."""
+        SceneManager().run(self)
+        pygame.quit()
 
-        while True:
-            self.music.set_volume(settings.BGM_VOLUME)
-            dt = time.time() - last_time
-            last_time = time.time()
-            mouse_pos = pygame.mouse.get_pos()
+    def step(self):
+        # Sleeps until the frame is due; dt is clamped after a stall
+        dt = self.pacer.tick()
+        mouse_pos = pygame.mouse.get_pos()
 
+        with self.profiler.phase('events'):
             for event in pygame.event.get():
+                self.profiler.handle_event(event)
                 if event.type == pygame.QUIT:
-                    pygame.quit()
-                    sys.exit()
+                    self.manager.quit()
+                    return
 
                 elif event.type == pygame.MOUSEBUTTONDOWN and event.button == 1:
-                    if self.active:
-                        self.plane.jump()
+                    if self.sim.active:
+                        self.pending_inputs.add(JUMP)
                     else:
-                        if self.main_menu_button.check_for_input(mouse_pos):
-                            self.music.stop()
-                            from main import main_menu  # import here to avoid circular import
-                            main_menu()
-                        else:
-                            self.reset_game()
-
-                elif event.type == self.obstacle_timer and self.active:
-                    if random.random() < 0.2:   # chance for DoubleObstacle spawn
-                        # Spawn double obstacle
-                        DoubleObstacle(self.all_sprites, self.collision_sprites, self.obstacles,
-                                       scale_factor=self.scale_factor * 0.8)
-                    elif random.random() < 0.4:  # chance for moving obstacle spawn
-                        x_pos = WINDOW_WIDTH + 60
-                        y = -80
-                        flipped = random.choice([True, False])
-
-                        if flipped:
-                            y_pos = y  # near top of screen for flipped obstacle
+                        if self.main_menu_button.check_for_input(event.pos):
+                            self.manager.home()
+                            return
                         else:
-                            y_pos = WINDOW_HEIGHT - y  # near bottom for normal obstacle
-
-                        MovingObstacle(
-                            [self.all_sprites, self.collision_sprites, self.obstacles],
-                            scale_factor=self.scale_factor * 1.1,
-                            flipped=flipped,
-                            x_pos=x_pos,
-                            y_pos=y_pos,
-                            amplitude=70,
-                            speed=3
-                        )
-                    else:
-                        Obstacle(self.all_sprites, self.collision_sprites, self.obstacles,
-                                 scale_factor=self.scale_factor * 1.1)
-
-
-                elif event.type == self.crow_timer and self.active:
-                    if random.random() < 0.2:  # 20% chance for 2 crows
-                        min_distance = 180
-                        y1 = random.randint(WINDOW_HEIGHT // 5, WINDOW_HEIGHT * 2 // 3)
-
-                        while True:
-                            y2 = random.randint(WINDOW_HEIGHT // 5, WINDOW_HEIGHT * 2 // 3)
-                            if abs(y2 - y1) >= min_distance:
-                                break
-                        Crow(self.all_sprites, self.obstacles, pos=(WINDOW_WIDTH, y1), scale_factor=self.scale_factor / 1.5)
-                        Crow(self.all_sprites, self.obstacles, pos=(WINDOW_WIDTH, y2), scale_factor=self.scale_factor / 1.5)
-
-                    else:  # 80% chance for 1 crow
-                        y = random.randint(WINDOW_HEIGHT // 5, WINDOW_HEIGHT * 2 // 3)
-                        Crow(self.all_sprites, self.obstacles, pos=(WINDOW_WIDTH, y), scale_factor=self.scale_factor / 1.5)
-
-            # Draw
-            self.display_surface.fill("black")
-            self.all_sprites.update(dt)
-            for sprite in self.all_sprites:
-                if hasattr(sprite, "draw"):
-                    sprite.draw(self.display_surface)
-                else:
-                    self.display_surface.blit(sprite.image, sprite.rect)
-
-            if self.active:
-                self.collisions()
-            else:
-                self.display_surface.blit(self.menu_surf, self.menu_rect)
-                self.main_menu_button.change_color(mouse_pos)
-                self.main_menu_button.update(self.display_surface)
+                            self.sim.reset()
 
+        # Advance the simulation; inputs apply to the first step they reach
+        for _ in range(self.stepper.advance(dt)):
+            self.sim.step(self.stepper.step, self.pending_inputs)
+            self.pending_inputs.clear()
+
+        for sim_event in self.sim.pop_events():
+            if sim_event == JUMP:
+                play_sfx(settings.JUMP_SOUND_PATH)
+
+        # Death menu
+        self.menu.show(not self.sim.active)
+        self.menu_button.show(not self.sim.active)
+        if not self.sim.active:
+            self.menu_button.hover(mouse_pos)
+
+        with self.profiler.phase('score'):
             self.display_score()
-            pygame.display.update()
-            self.clock.tick(FRAMERATE)
+
+        # Draw
+        with self.profiler.phase('draw'):
+            self.renderer.render(self.sim.all_sprites)
+
+        if self.profiler.overlay_visible:
+            self.profiler.draw(self.display_surface)
+            self.renderer.invalidate()
+        with self.profiler.phase('display'):
+            self.renderer.present()
+        self.profiler.end_frame()
 
 
 if __name__ == "__main__":
-    Game().run()
+    # Usage: python game_level2.py [seed] [replay file to record]
+    seed = int(sys.argv[1]) if len(sys.argv) > 1 else None
+    record_path = sys.argv[2] if len(sys.argv) > 2 else None
+    Game(seed, record_path).run()
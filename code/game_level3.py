@@ -2,43 +2,125 @@ import pygame
 import sys
 import time
 import settings
-from random import randint
-from settings import WINDOW_WIDTH, WINDOW_HEIGHT, FRAMERATE
-from sprites import BG, Ground, Plane, Obstacle
+from settings import WINDOW_WIDTH, WINDOW_HEIGHT
+from sprites import BG, Ground, Plane, Obstacle, plan_obstacle, obstacle_bounds
 from button import Button
-from main import main_menu  # Make sure this doesn’t cause circular import issues
+from simulation import Simulation, FixedStepper, JUMP
+from schedule import GRAVITY_FLIP
+from scenes import Scene, SceneManager
+from replay import ReplayRecorder
+from assets import load_image
+from audio import play_music, stop_music, play_sfx
+from profiler import FrameProfiler
+from pacing import FramePacer, set_mode
+from rendering import make_renderer, UiImage, UiText, UiButton
+
+
+# Files the level select screen loads ahead of time: (path, alpha), sounds and
+# the images whose rotation atlases it renders
+# (see preload.py)
+PRELOAD_IMAGES = [
+    (settings.BG_IMG_PATH, False),
+    (settings.GROUND_IMG_PATH, True),
+    *[(settings.PLANE_IMG_PATH.format(i), True) for i in range(3)],
+    *[(settings.OBSTACLE_IMG_PATH.format(i), True) for i in range(2)],
+    ("../graphics/level_3/gravity.png", True),
+    ("../graphics/ui/menu.png", True),
+]
+PRELOAD_SOUNDS = [settings.JUMP_SOUND_PATH]
+PRELOAD_ROTATIONS = [settings.PLANE_IMG_PATH.format(i) for i in range(3)]
+
+PLAYER_SCALE = 1 / 1.7  # of the level's scale factor
+
+
+class Level3Simulation(Simulation):
+    level = 3
+    # Gravity Flip (px of distance between flips)
+    gravity_interval_min = 2000
+    gravity_interval_max = 3500
+    gravity_warning_distance = 800
+
+    def build_world(self):
+        BG(self.all_sprites, scale_factor=self.scale_factor)
+        Ground(self.all_sprites, self.collision_sprites, scale_factor=self.scale_factor)
+
+    def spawn_player(self):
+        return Plane(self.all_sprites, scale_factor=self.scale_factor * PLAYER_SCALE)
+
+    def plan_obstacle(self, rng):
+        return plan_obstacle(rng)
+
+    def obstacle_bounds(self, params):
+        return [obstacle_bounds(params, self.scale_factor * 1.1)]
+
+    def spawn_obstacle(self, params):
+        self.pool(Obstacle).acquire(self.all_sprites, self.collision_sprites, self.entities,
+                                    scale_factor=self.scale_factor * 1.1, placement=params)
+
+    def make_schedule(self):
+        schedule = super().make_schedule()
+        schedule.add_track(GRAVITY_FLIP, lambda rng: rng.randint(self.gravity_interval_min, self.gravity_interval_max))
+        return schedule
+
+    def reset(self):
+        super().reset()
+        self.gravity_flipped = False
+        self.gravity_warning_active = False
+        self.next_gravity_flip_distance = self.schedule.next_distance(GRAVITY_FLIP)
+
+    def spawn(self, spawn):
+        if spawn.kind == GRAVITY_FLIP:
+            self.flip_gravity()
+        else:
+            super().spawn(spawn)
+
+    def flip_gravity(self):
+        self.gravity_flipped = not self.gravity_flipped
+        self.player.flip_gravity(self.gravity_flipped)
+        self.events.append('gravity_flip')
+        self.next_gravity_flip_distance = self.schedule.next_distance(GRAVITY_FLIP)
+
+    def update_level(self, dt):
+        self.check_gravity_zone()
 
+    def check_gravity_zone(self):
+        # Warn while the next flip is close
+        self.gravity_warning_active = (
+            self.distance_traveled >= self.next_gravity_flip_distance - self.gravity_warning_distance)
+
+    def collisions(self):
+        collided = self.broad_phase.first_hit(self.player, self.collision_sprites)
+        if collided:
+            return collided.sprite_type
+        if self.player.rect.top <= 0:
+            return 'ceiling'
+        return None
 
-class Game:
-    def __init__(self):
+
+class Game(Scene):
+    def __init__(self, seed=None, record_path=None):
         pygame.init()
-        self.display_surface = pygame.display.set_mode((WINDOW_WIDTH, WINDOW_HEIGHT))
+        self.display_surface = set_mode((WINDOW_WIDTH, WINDOW_HEIGHT))
         pygame.display.set_caption("Level 3")
-        self.clock = pygame.time.Clock()
-        self.active = True
+        self.pacer = FramePacer()
 
-        # Sprite groups
-        self.all_sprites = pygame.sprite.Group()
-        self.collision_sprites = pygame.sprite.Group()
+        # Game logic runs in fixed steps, independent of the frame rate
+        self.sim = Level3Simulation(seed)
+        self.sim.load_draw_assets()
+        self.record_path = record_path
+        self.recorder = ReplayRecorder(3, self.sim) if record_path else None
+        self.stepper = FixedStepper()
+        self.pending_inputs = set()
 
-        # Background setup
-        bg_height = pygame.image.load("../graphics/environment/background.png").get_height()
-        self.scale_factor = WINDOW_HEIGHT / bg_height
-        BG(self.all_sprites, scale_factor=self.scale_factor)
-        Ground(self.all_sprites, self.collision_sprites, scale_factor=self.scale_factor)
-        self.plane = Plane(self.all_sprites, scale_factor=self.scale_factor / 1.7)
-
-        # Obstacles
-        self.obstacle_timer = pygame.USEREVENT + 1
-        pygame.time.set_timer(self.obstacle_timer, 1400)
+        # Per-phase frame timings (F3 shows the overlay)
+        self.profiler = FrameProfiler()
+        self.sim.profiler = self.profiler
 
         # Score
         self.font = pygame.font.Font("../graphics/font/BD_Cartoon_Shout.ttf", 30)
-        self.score = 0
-        self.time_elapsed = 0  # <-- Timer in seconds
 
         # UI Menu
-        self.menu_surf = pygame.image.load("../graphics/ui/menu.png").convert_alpha()
+        self.menu_surf = load_image("../graphics/ui/menu.png")
         self.menu_rect = self.menu_surf.get_rect(center=(WINDOW_WIDTH / 2, WINDOW_HEIGHT / 2))
 
         # Main Menu Button
@@ -51,11 +133,6 @@ class Game:
             "red"
         )
 
-        # Music
-        self.music = pygame.mixer.Sound("../sounds/music.wav")
-        self.music.set_volume(settings.BGM_VOLUME)  # use settings value
-        self.music.play(loops=-1)
-
         # Effects
         self.flash_surface = pygame.Surface((WINDOW_WIDTH, WINDOW_HEIGHT))
         self.flash_surface.fill((255, 0, 0))
@@ -66,23 +143,22 @@ class Game:
         self.shake_time = 0
         self.shake_magnitude = 10
 
-        # Gravity Flip
-        self.distance_traveled = 0
-        self.gravity_flipped = False
-        self.gravity_interval_min = 2000
-        self.gravity_interval_max = 3500
-        self.gravity_warning_distance = 800
-        self.next_gravity_flip_distance = randint(self.gravity_interval_min, self.gravity_interval_max)
-        self.gravity_warning_active = False
+        # Gravity warning icon
         self.gravity_icon_visible = True
         self.gravity_icon_flash_interval = 0.3
         self.last_flash_time = 0
 
-        icon_raw = pygame.image.load("../graphics/level_3/gravity.png").convert_alpha()
-        icon_raw = pygame.transform.flip(icon_raw, False, True)
+        icon_raw = load_image("../graphics/level_3/gravity.png", flip=True)
         self.gravity_icon = pygame.transform.scale(icon_raw, (80, 80))
         self.gravity_icon_rect = self.gravity_icon.get_rect(center=(WINDOW_WIDTH / 2, WINDOW_HEIGHT / 4))
 
+        # UI drawn above the world by the renderer
+        self.renderer = make_renderer(self.display_surface)
+        self.menu = self.renderer.add_ui(UiImage(self.menu_surf, self.menu_rect, visible=False))
+        self.menu_button = self.renderer.add_ui(UiButton(self.main_menu_button, visible=False))
+        self.gravity_warning = self.renderer.add_ui(UiImage(self.gravity_icon, self.gravity_icon_rect, visible=False))
+        self.score_text = self.renderer.add_ui(UiText(self.font, "black"))
+
     def trigger_screen_effects(self):
         self.flash_time = time.time()
         self.shake_time = time.time()
@@ -93,117 +169,115 @@ class Game:
             offset_x = int((self.shake_magnitude * 2) * (0.5 - now % 0.1))
             offset_y = int((self.shake_magnitude * 2) * (0.5 - now % 0.1))
             self.display_surface.scroll(offset_x, offset_y)
+            self.renderer.invalidate()
 
         if now - self.flash_time < self.flash_duration:
             self.flash_surface.set_alpha(150)
             self.display_surface.blit(self.flash_surface, (0, 0))
+            self.renderer.invalidate()
 
-    def check_gravity_zone(self):
-        if self.distance_traveled >= self.next_gravity_flip_distance:
-            self.gravity_flipped = not self.gravity_flipped
-            self.plane.flip_gravity(self.gravity_flipped)
-
-            self.gravity_warning_active = False
-            self.gravity_icon_visible = True
-            self.last_flash_time = time.time()
-
-            self.next_gravity_flip_distance = self.distance_traveled + randint(
-                self.gravity_interval_min, self.gravity_interval_max
-            )
-
-        elif self.distance_traveled >= self.next_gravity_flip_distance - self.gravity_warning_distance:
-            self.gravity_warning_active = True
+    def display_score(self):
+        y = WINDOW_HEIGHT / 10 if self.sim.active else WINDOW_HEIGHT / 2 + self.menu_rect.height / 1.5
+        self.score_text.set_text(str(self.sim.score), (WINDOW_WIDTH / 2, y))
+
+    def draw_gravity_warning(self):
+        if self.sim.gravity_warning_active:
+            now = time.time()
+            if now - self.last_flash_time >= self.gravity_icon_flash_interval:
+                self.gravity_icon_visible = not self.gravity_icon_visible
+                self.last_flash_time = now
+            self.gravity_warning.show(self.gravity_icon_visible)
         else:
-            self.gravity_warning_active = False
+            self.gravity_warning.show(self.sim.gravity_flipped)
 
-    def collisions(self):
-        collided = pygame.sprite.spritecollide(
-            self.plane, self.collision_sprites, False, pygame.sprite.collide_mask
-        )
-        if collided or self.plane.rect.top <= 0:
-            for sprite in self.collision_sprites:
-                if getattr(sprite, 'sprite_type', '') == 'obstacle':
-                    sprite.kill()
+    def save_session(self):
+        # Replay file and profiler trace, when enabled
+        if self.recorder:
+            self.recorder.save(self.record_path)
+        self.profiler.dump_trace()
 
-            self.active = False
-            self.plane.kill()
-            self.trigger_screen_effects()
+    def enter(self, manager):
+        super().enter(manager)
+        # Background music, streamed in a loop
+        play_music(settings.MUSIC_PATH)
+        self.pacer.start()
 
-    def display_score(self):
-        y = WINDOW_HEIGHT / 10 if self.active else WINDOW_HEIGHT / 2 + self.menu_rect.height / 1.5
-        score_value = int(self.time_elapsed)
-        score_surf = self.font.render(str(score_value), True, "black")
-        score_rect = score_surf.get_rect(midtop=(WINDOW_WIDTH / 2, y))
-        self.display_surface.blit(score_surf, score_rect)
-
-    def reset_game(self):
-        self.plane = Plane(self.all_sprites, scale_factor=self.scale_factor / 1.7)
-        self.active = True
-        self.time_elapsed = 0
-        self.gravity_flipped = False
-        self.gravity_warning_active = False
-        self.gravity_icon_visible = True
-        self.distance_traveled = 0
-        self.next_gravity_flip_distance = randint(
-            self.gravity_interval_min, self.gravity_interval_max
-        )
+    def exit(self):
+        self.save_session()
+        stop_music()
+        self.pacer.close()
 
     def run(self):
-        last_time = time.time()
-
-        while True:
-            self.music.set_volume(settings.BGM_VOLUME)
+        """Play this level on its own until the window is closed (MAIN MENU closes it too)."""
+        SceneManager().run(self)
+        pygame.quit()
 
-            dt = time.time() - last_time
-            last_time = time.time()
+    def step(self):
+        # Sleeps until the frame is due; dt is clamped after a stall
+        dt = self.pacer.tick()
 
-            mouse_pos = pygame.mouse.get_pos()
+        mouse_pos = pygame.mouse.get_pos()
 
+        with self.profiler.phase('events'):
             for event in pygame.event.get():
+                self.profiler.handle_event(event)
                 if event.type == pygame.QUIT:
-                    pygame.quit()
-                    sys.exit()
+                    self.manager.quit()
+                    return
 
                 elif event.type == pygame.MOUSEBUTTONDOWN and event.button == 1:
-                    if self.active:
-                        self.plane.jump()
+                    if self.sim.active:
+                        self.pending_inputs.add(JUMP)
                     else:
-                        if self.main_menu_button.check_for_input(mouse_pos):
-                            self.music.stop()
-                            main_menu()
+                        if self.main_menu_button.check_for_input(event.pos):
+                            self.manager.home()
+                            return
                         else:
-                            self.reset_game()
-
-                elif event.type == self.obstacle_timer and self.active:
-                    Obstacle(self.all_sprites, self.collision_sprites, scale_factor=self.scale_factor * 1.1)
-
-            self.display_surface.fill("black")
-            self.all_sprites.update(dt)
-            self.all_sprites.draw(self.display_surface)
-
-            if self.active:
-                self.time_elapsed += dt  # <-- Timer only increases during gameplay
-                self.distance_traveled += 400 * dt
-                self.check_gravity_zone()
-                self.collisions()
-
-                # Gravity warning UI
-                if self.gravity_warning_active:
-                    now = time.time()
-                    if now - self.last_flash_time >= self.gravity_icon_flash_interval:
-                        self.gravity_icon_visible = not self.gravity_icon_visible
-                        self.last_flash_time = now
-                    if self.gravity_icon_visible:
-                        self.display_surface.blit(self.gravity_icon, self.gravity_icon_rect)
-                elif self.gravity_flipped:
-                    self.display_surface.blit(self.gravity_icon, self.gravity_icon_rect)
-            else:
-                # Death menu
-                self.display_surface.blit(self.menu_surf, self.menu_rect)
-                self.main_menu_button.change_color(mouse_pos)
-                self.main_menu_button.update(self.display_surface)
+                            self.sim.reset()
+                            self.gravity_icon_visible = True
+
+        # Advance the simulation; inputs apply to the first step they reach
+        for _ in range(self.stepper.advance(dt)):
+            self.sim.step(self.stepper.step, self.pending_inputs)
+            self.pending_inputs.clear()
+
+        for sim_event in self.sim.pop_events():
+            if sim_event == JUMP:
+                play_sfx(settings.JUMP_SOUND_PATH)
+            elif sim_event == 'gravity_flip':
+                self.gravity_icon_visible = True
+                self.last_flash_time = time.time()
+            elif sim_event == 'death':
+                self.trigger_screen_effects()
+
+        if self.sim.active:
+            # Gravity warning UI
+            self.draw_gravity_warning()
+        else:
+            self.gravity_warning.show(False)
+            self.menu_button.hover(mouse_pos)
+        # Death menu
+        self.menu.show(not self.sim.active)
+        self.menu_button.show(not self.sim.active)
 
+        with self.profiler.phase('score'):
             self.display_score()
+
+        with self.profiler.phase('draw'):
+            self.renderer.render(self.sim.all_sprites)
+        with self.profiler.phase('effects'):
             self.apply_effects()
-            pygame.display.update()
-            self.clock.tick(FRAMERATE)
+
+        if self.profiler.overlay_visible:
+            self.profiler.draw(self.display_surface)
+            self.renderer.invalidate()
+        with self.profiler.phase('display'):
+            self.renderer.present()
+        self.profiler.end_frame()
+
+
+if __name__ == '__main__':
+    # Usage: python game_level3.py [seed] [replay file to record]
+    seed = int(sys.argv[1]) if len(sys.argv) > 1 else None
+    record_path = sys.argv[2] if len(sys.argv) > 2 else None
+    Game(seed, record_path).run()
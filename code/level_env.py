@@ -0,0 +1,224 @@
+import random
+import sys
+import time
+import numpy as np
+from observation import PixelObserver
+from settings import WINDOW_WIDTH, WINDOW_HEIGHT, SIMULATION_STEP
+from simulation import JUMP, init_headless, load_simulation
+
+# Actions
+NOOP = 0
+JUMP_ACTION = 1
+
+FAR_AWAY = 2.0  # dx (in window widths) of obstacles and crows that are not there
+
+
+class LevelEnv:
+    level = None
+    action_count = 2  # NOOP, JUMP_ACTION
+    extra_size = 0  # level specific observation values, see observe_level
+
+    def __init__(self, frame_skip=4, lookahead=2, obs_type='state', pixel_size=(48, 80),
+                 grayscale=False, frame_stack=1, max_frames=None, seed=None):
+        """
+        Gym-style environment around one level's Simulation.
+
+        reset() and step() follow the gymnasium signatures, without depending
+        on it. Action 1 jumps and 0 does nothing; every step runs frame_skip
+        simulation steps, jumping only in the first one, and earns 1 per
+        simulation step survived.
+
+        The 'state' observation is a float32 vector: the player's y and
+        velocity, then (dx, gap top, gap bottom) of the next `lookahead`
+        obstacle columns, then the level's own values (observe_level).
+        Positions are divided by the window size. The 'pixels' observation is
+        the level drawn at pixel_size by an observation.PixelObserver: a
+        (height, width, 3) uint8 image, (height, width) when grayscale, with a
+        leading axis of frame_stack frames when that is above 1. Both are
+        views of reused buffers, overwritten by the next step.
+
+        Args:
+            frame_skip (int): Simulation steps per env step (action repeat).
+            lookahead (int): Obstacle columns ahead of the player observed.
+            obs_type (str): 'state' or 'pixels'.
+            pixel_size (tuple): (width, height) of pixel observations and render().
+            grayscale (bool): Gray pixel observations.
+            frame_stack (int): Frames per pixel observation, the newest last.
+            max_frames (int or None): Simulation steps after which an episode is truncated.
+            seed (int or None): Seeds the episode seeds that reset() picks.
+        """
+        if obs_type not in ('state', 'pixels'):
+            raise ValueError(f'Unknown observation type: {obs_type}')
+        init_headless()
+        self.frame_skip = frame_skip
+        self.lookahead = lookahead
+        self.obs_type = obs_type
+        self.max_frames = max_frames
+        self.rng = random.Random(seed)
+        self.sim = None
+
+        self.state = np.zeros(2 + 3 * lookahead + self.extra_size, dtype=np.float32)
+
+        self.observer = PixelObserver(pixel_size, grayscale, frame_stack)
+
+    @property
+    def observation_shape(self):
+        return self.state.shape if self.obs_type == 'state' else self.observer.shape
+
+    def reset(self, seed=None):
+        """
+        Start an episode in a new simulation; the same seed replays the same level.
+
+        Returns:
+            (observation, info)
+        """
+        if seed is None:
+            seed = self.rng.randrange(2 ** 32)
+        self.sim = load_simulation(self.level, seed)
+        if self.obs_type == 'pixels':
+            return self.observer.reset(self.sim.all_sprites), self.info()
+        return self.observe(), self.info()
+
+    def step(self, action):
+        """
+        Apply an action for frame_skip simulation steps.
+
+        Returns:
+            (observation, reward, terminated, truncated, info)
+        """
+        sim = self.sim
+        inputs = (JUMP,) if action == JUMP_ACTION else ()
+        reward = 0.0
+        for _ in range(self.frame_skip):
+            sim.step(SIMULATION_STEP, inputs)
+            inputs = ()
+            if not sim.active:
+                break
+            reward += 1
+        sim.pop_events()
+        terminated = not sim.active
+        truncated = not terminated and self.max_frames is not None and sim.frame >= self.max_frames
+        return self.observe(), reward, terminated, truncated, self.info()
+
+    def info(self):
+        sim = self.sim
+        return {'score': sim.score, 'frame': sim.frame, 'seed': sim.seed, 'death_cause': sim.death_cause}
+
+    def observe(self):
+        if self.obs_type == 'pixels':
+            return self.observer.observe(self.sim.all_sprites)
+
+        state = self.state
+        player = self.sim.player
+        state[0] = player.pos.y / WINDOW_HEIGHT
+        state[1] = player.direction / 1000
+
+        columns = self.obstacle_columns()
+        for i in range(self.lookahead):
+            if i < len(columns):
+                left, gap_top, gap_bottom = columns[i]
+                state[2 + 3 * i:5 + 3 * i] = ((left - player.rect.left) / WINDOW_WIDTH,
+                                              gap_top / WINDOW_HEIGHT, gap_bottom / WINDOW_HEIGHT)
+            else:
+                state[2 + 3 * i:5 + 3 * i] = (FAR_AWAY, 0.0, 1.0)
+        self.observe_level(state[2 + 3 * self.lookahead:])
+        return state
+
+    def obstacle_columns(self):
+        """
+        Obstacles ahead of the player as (left, gap top, gap bottom) columns,
+        nearest first. Overlapping obstacles (a double obstacle pair) make one
+        column; its gap runs from the lowest hanging obstacle to the highest
+        standing one.
+        """
+        player_left = self.sim.player.rect.left
+        ahead = sorted((sprite.rect for sprite in self.sim.collision_sprites
+                        if getattr(sprite, 'sprite_type', None) == 'obstacle' and sprite.rect.right > player_left),
+                       key=lambda rect: rect.left)
+        columns = []
+        right = None
+        for rect in ahead:
+            if right is None or rect.left >= right:
+                columns.append([rect.left, 0, WINDOW_HEIGHT])
+                right = rect.right
+            right = max(right, rect.right)
+            column = columns[-1]
+            if rect.centery < WINDOW_HEIGHT / 2:
+                column[1] = max(column[1], rect.bottom)
+            else:
+                column[2] = min(column[2], rect.top)
+        return columns
+
+    def observe_level(self, values):
+        """Fill the extra_size level specific values of the state vector."""
+
+    def render(self):
+        """The current frame at pixel_size (a reused array), as in pixel observations."""
+        if self.obs_type != 'pixels':
+            self.observer.draw(self.sim.all_sprites)
+            self.observer.capture()
+        return self.observer.latest()
+
+
+class Level1Env(LevelEnv):
+    level = 1
+
+
+class Level2Env(LevelEnv):
+    level = 2
+    crow_lookahead = 2
+    extra_size = 3 * crow_lookahead
+
+    def observe_level(self, values):
+        # (dx, y, speed) of the nearest crows ahead
+        player_left = self.sim.player.rect.left
+        crows = sorted((sprite for sprite in self.sim.obstacles
+                        if sprite.sprite_type == 'crow' and sprite.rect.right > player_left),
+                       key=lambda crow: crow.rect.left)
+        for i in range(self.crow_lookahead):
+            if i < len(crows):
+                crow = crows[i]
+                values[3 * i:3 * i + 3] = ((crow.rect.left - player_left) / WINDOW_WIDTH,
+                                           crow.rect.centery / WINDOW_HEIGHT, crow.vx / 1000)
+            else:
+                values[3 * i:3 * i + 3] = (FAR_AWAY, 0.5, 0.0)
+
+
+class Level3Env(LevelEnv):
+    level = 3
+    extra_size = 3
+
+    def observe_level(self, values):
+        # Gravity direction, distance to the next flip, warning shown
+        sim = self.sim
+        values[0] = -1.0 if sim.gravity_flipped else 1.0
+        values[1] = (sim.next_gravity_flip_distance - sim.distance_traveled) / sim.gravity_interval_max
+        values[2] = float(sim.gravity_warning_active)
+
+
+def make_env(level, **kwargs):
+    """Environment for a level; keyword arguments go to LevelEnv."""
+    envs = {1: Level1Env, 2: Level2Env, 3: Level3Env}
+    if level not in envs:
+        raise ValueError(f'Unknown level: {level}')
+    return envs[level](**kwargs)
+
+
+if __name__ == '__main__':
+    # Usage: python level_env.py [level] [steps] [--pixels [--gray]] (--gray stacks 4 frames)
+    level = int(sys.argv[1]) if len(sys.argv) > 1 else 2
+    steps = int(sys.argv[2]) if len(sys.argv) > 2 else 5000
+    env = make_env(level, obs_type='pixels' if '--pixels' in sys.argv else 'state',
+                   grayscale='--gray' in sys.argv, frame_stack=4 if '--gray' in sys.argv else 1, seed=0)
+    obs, info = env.reset()
+    rng = random.Random(0)
+    episodes = 0
+    start = time.perf_counter()
+    for _ in range(steps):
+        obs, reward, terminated, truncated, info = env.step(JUMP_ACTION if rng.random() < 0.15 else NOOP)
+        if terminated or truncated:
+            episodes += 1
+            obs, info = env.reset()
+    elapsed = time.perf_counter() - start
+    print(f'Level {level} ({env.obs_type}, shape {env.observation_shape}): {steps / elapsed:,.0f} env steps/s, '
+          f'{steps * env.frame_skip / elapsed:,.0f} simulation steps/s, {episodes} episodes')
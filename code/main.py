@@ -1,13 +1,18 @@
 import pygame
-import sys
 from functools import lru_cache
 from button import Button
+from text import render_text
 from settings import WINDOW_WIDTH, WINDOW_HEIGHT
-from options import options_menu
+from options import OptionsMenu
+from preload import Preloader
+from menu import MenuScene
+from scenes import SceneManager
+from pacing import set_mode
 
 # --- Initialize ---
 pygame.init()
-screen = pygame.display.set_mode((WINDOW_WIDTH, WINDOW_HEIGHT))
+# Same window flags as the levels (vsync), so switching scenes keeps the window
+screen = set_mode((WINDOW_WIDTH, WINDOW_HEIGHT))
 pygame.display.set_caption("Menu")
 
 # --- Constants ---
@@ -58,124 +63,166 @@ def draw_back_button(text_color, hover_color, font_size):
     )
 
 # --- Reusable message screen ---
-def render_back_screen(bg_color, message, text_color=WHITE, font_size=20):
-    while True:
-        screen.fill(bg_color)
-        msg_text = get_font(font_size).render(message, True, text_color)
-        msg_rect = msg_text.get_rect(center=(WINDOW_WIDTH / 2, WINDOW_HEIGHT / 2 - 80))
-        screen.blit(msg_text, msg_rect)
-
-        back_btn = draw_back_button(text_color, RED if bg_color == BLACK else GREEN, 30)
+class MessageScreen(MenuScene):
+    name = "message"
+
+    def __init__(self, bg_color, message, text_color=WHITE, font_size=20):
+        self.bg_color = bg_color
+        self.msg_text = render_text(get_font(font_size), message, text_color)
+        self.msg_rect = self.msg_text.get_rect(center=(WINDOW_WIDTH / 2, WINDOW_HEIGHT / 2 - 80))
+        self.back_btn = draw_back_button(text_color, RED if bg_color == BLACK else GREEN, 30)
+
+    def step(self):
         mouse_pos = pygame.mouse.get_pos()
-        back_btn.change_color(mouse_pos)
-        back_btn.update(screen)
+        self.loop.hover([self.back_btn], mouse_pos)
+
+        if self.loop.needs_redraw:
+            screen.fill(self.bg_color)
+            screen.blit(self.msg_text, self.msg_rect)
+            self.back_btn.change_color(mouse_pos)
+            self.back_btn.update(screen)
+            self.loop.present()
 
-        for event in pygame.event.get():
+        for event in self.loop.wait():
             if event.type == pygame.QUIT:
-                pygame.quit()
-                sys.exit()
-            elif event.type == pygame.MOUSEBUTTONDOWN and back_btn.check_for_input(mouse_pos):
+                self.manager.quit()
+            elif event.type == pygame.MOUSEBUTTONDOWN and self.back_btn.check_for_input(event.pos):
+                self.manager.pop()
                 return
 
-        pygame.display.update()
-
 # --- Placeholder & options screens ---
 def placeholder_level(message):
-    render_back_screen(BLACK, message)
+    return MessageScreen(BLACK, message)
 
 def options():
-    options_menu(screen, get_font)
+    return OptionsMenu(screen, get_font)
 
 # --- Level launcher ---
-def launch_level(level_number):
-    level_messages = {
-        1: "Level 1 Coming Soon!",
-    }
-    if level_number in level_messages:
+def launch_level(level_number, preloader):
+    """Return the Game scene for a level, its preload finished first."""
+    preloader.finish(level_number)
+
+    if level_number == 1:
         from game_level1 import Game
-        Game().run()
     elif level_number == 2:
         from game_level2 import Game
-        Game().run()
-    elif level_number == 3:
+    else:
         from game_level3 import Game
-        Game().run()
+    return Game()
 
 # --- Level select screen ---
-def play():
-    def create_level_buttons():
+class LevelSelect(MenuScene):
+    name = "level select"
+
+    def __init__(self, preloader):
+        self.preloader = preloader
         labels = ["LEVEL 1", "LEVEL 2", "LEVEL 3", "BACK"]
         colors = [GREEN, GREEN, GREEN, RED]
         actions = [1, 2, 3, "back"]
-        return [
+        self.level_buttons = [
             (Button(None, (WINDOW_WIDTH / 2, (160 + i * 80) * scale_factor),
                     label, get_font(20), WHITE, color), level_action)
             for i, (label, color, level_action) in enumerate(zip(labels, colors, actions))
         ]
+        self.title = render_text(get_font(25), "Select a Level", WHITE)
+        self.title_rect = self.title.get_rect(center=(WINDOW_WIDTH / 2, 80 * scale_factor))
 
-    while True:
-        screen.fill(BLACK)
+    def step(self):
+        loop = self.loop
+        preloader = self.preloader
         mouse_pos = pygame.mouse.get_pos()
-
-        title = get_font(25).render("Select a Level", True, WHITE)
-        screen.blit(title, title.get_rect(center=(WINDOW_WIDTH / 2, 80 * scale_factor)))
-
-        level_buttons = create_level_buttons()
-
-        for button, _ in level_buttons:
-            button.change_color(mouse_pos)
-            button.update(screen)
-
-        for event in pygame.event.get():
+        loop.hover([button for button, _ in self.level_buttons], mouse_pos)
+
+        # Preload the hovered level, or else the one played last
+        hovered = next((action for button, action in self.level_buttons
+                        if action != "back" and button.check_for_input(mouse_pos)), None)
+        preloader.request(hovered or preloader.last_level)
+        preloader.poll()
+        for button, action in self.level_buttons:
+            if action != "back" and button.progress != preloader.progress(action):
+                button.set_progress(preloader.progress(action))
+                loop.needs_redraw = True
+
+        if loop.needs_redraw:
+            screen.fill(BLACK)
+            screen.blit(self.title, self.title_rect)
+            for button, _ in self.level_buttons:
+                button.change_color(mouse_pos)
+                button.update(screen)
+            loop.present()
+
+        # Wake up for loading bar updates while a preload runs
+        for event in loop.wait(busy=preloader.busy):
             if event.type == pygame.QUIT:
-                pygame.quit()
-                sys.exit()
+                self.manager.quit()
             elif event.type == pygame.MOUSEBUTTONDOWN and event.button == 1:
-                for button, action in level_buttons:
-                    if button.check_for_input(mouse_pos):
+                for button, action in self.level_buttons:
+                    if button.check_for_input(event.pos):
                         if action == "back":
-                            return
+                            self.manager.pop()
                         else:
-                            launch_level(action)
-
-        pygame.display.update()
+                            self.manager.push(launch_level(action, preloader))
+                        return
 
 # --- Main menu screen ---
-def main_menu():
-    pygame.display.set_caption("Menu")
-
-    while True:
-        screen.blit(bg, bg_rect.topleft)
-        mouse_pos = pygame.mouse.get_pos()
-
-        title = get_font(40).render("MAIN MENU", True, GOLD)
-        screen.blit(title, title.get_rect(center=(WINDOW_WIDTH / 2, 80 * scale_factor)))
-
-        buttons = [
+class MainMenu(MenuScene):
+    name = "main"
+
+    def __init__(self, preloader):
+        # Level preloading, shared with the level select screen
+        self.preloader = preloader
+        self.title = render_text(get_font(40), "MAIN MENU", GOLD)
+        self.title_rect = self.title.get_rect(center=(WINDOW_WIDTH / 2, 80 * scale_factor))
+        self.buttons = [
             Button(play_img, (WINDOW_WIDTH / 2, 200 * scale_factor), "PLAY", get_font(30), LIGHT_GREEN, WHITE),
             Button(options_img, (WINDOW_WIDTH / 2, 300 * scale_factor), "OPTIONS", get_font(30), LIGHT_GREEN, WHITE),
             Button(quit_img, (WINDOW_WIDTH / 2, 400 * scale_factor), "QUIT", get_font(30), LIGHT_GREEN, WHITE)
         ]
 
-        for button in buttons:
-            button.change_color(mouse_pos)
-            button.update(screen)
+    def enter(self, manager):
+        super().enter(manager)
+        pygame.display.set_caption("Menu")
+
+    def resume(self):
+        super().resume()
+        pygame.display.set_caption("Menu")
+
+    def step(self):
+        loop = self.loop
+        mouse_pos = pygame.mouse.get_pos()
+        loop.hover(self.buttons, mouse_pos)
+
+        if loop.needs_redraw:
+            screen.blit(bg, bg_rect.topleft)
+            screen.blit(self.title, self.title_rect)
+            for button in self.buttons:
+                button.change_color(mouse_pos)
+                button.update(screen)
+            loop.present()
 
-        for event in pygame.event.get():
+        for event in loop.wait():
             if event.type == pygame.QUIT:
-                pygame.quit()
-                sys.exit()
+                self.manager.quit()
             elif event.type == pygame.MOUSEBUTTONDOWN and event.button == 1:
-                if buttons[0].check_for_input(mouse_pos):
-                    play()
-                elif buttons[1].check_for_input(mouse_pos):
-                    options()
-                elif buttons[2].check_for_input(mouse_pos):
-                    pygame.quit()
-                    sys.exit()
-
-        pygame.display.update()
+                if self.buttons[0].check_for_input(event.pos):
+                    self.manager.push(LevelSelect(self.preloader))
+                elif self.buttons[1].check_for_input(event.pos):
+                    self.manager.push(options())
+                elif self.buttons[2].check_for_input(event.pos):
+                    self.manager.quit()
+                else:
+                    continue
+                return
 
 # --- Run main menu ---
+def main_menu():
+    """Run the whole game, starting on the main menu, until it is closed."""
+    preloader = Preloader()
+    # Levels return to a new main menu through manager.home(), never by
+    # importing this module (run as __main__, it would load a second time)
+    manager = SceneManager(root_factory=lambda: MainMenu(preloader))
+    manager.run(MainMenu(preloader))
+    pygame.quit()
+
 if __name__ == "__main__":
     main_menu()
@@ -0,0 +1,99 @@
+import time
+import pygame
+from scenes import Scene
+from settings import MENU_IDLE_TIMEOUT, MENU_BUSY_TIMEOUT, MENU_CPU_REPORT
+
+# Window events after which the screen has to be drawn again
+REDRAW_EVENTS = {pygame.WINDOWEXPOSED, pygame.WINDOWSHOWN, pygame.WINDOWRESTORED, pygame.VIDEOEXPOSE}
+
+
+class MenuLoop:
+    def __init__(self, name):
+        """
+        Event-driven loop for a menu screen.
+
+        wait() blocks in pygame.event.wait until input arrives, so an idle
+        menu costs next to no CPU. The screen draws only when needs_redraw
+        is set: when it opens, after window events, when hover() sees the
+        mouse move onto or off a button, or when the screen itself flags a
+        change.
+
+        The owning scene forwards its pause/resume/exit hooks, so the clocks
+        only run while the screen is on top; with settings.MENU_CPU_REPORT the
+        screen prints its CPU time on close().
+        """
+        self.name = name
+        self.needs_redraw = True
+        self.hovered = None
+        self.redraws = 0
+        self.wall = 0.0
+        self.cpu = 0.0
+        self._started = None
+        self.resume()
+
+    def pause(self):
+        if self._started:
+            wall, cpu = self._started
+            self.wall += time.perf_counter() - wall
+            self.cpu += time.process_time() - cpu
+            self._started = None
+
+    def resume(self):
+        """Restart the clocks; whatever covered the screen has to be drawn over."""
+        self._started = (time.perf_counter(), time.process_time())
+        self.needs_redraw = True
+
+    def close(self):
+        self.pause()
+        if MENU_CPU_REPORT:
+            print(self.report())
+
+    def wait(self, busy=False):
+        """
+        Block until input arrives and return every pending event.
+
+        Args:
+            busy (bool): Something on screen is animating (e.g. a loading
+                bar), so wake up at MENU_BUSY_TIMEOUT rather than MENU_IDLE_TIMEOUT.
+        """
+        event = pygame.event.wait(MENU_BUSY_TIMEOUT if busy else MENU_IDLE_TIMEOUT)
+        events = [] if event.type == pygame.NOEVENT else [event]
+        events += pygame.event.get()
+        if any(event.type in REDRAW_EVENTS for event in events):
+            self.needs_redraw = True
+        return events
+
+    def hover(self, buttons, mouse_pos):
+        """Flag a redraw when the mouse moves onto or off one of buttons."""
+        hovered = tuple(button.check_for_input(mouse_pos) for button in buttons)
+        if hovered != self.hovered:
+            self.hovered = hovered
+            self.needs_redraw = True
+
+    def present(self):
+        pygame.display.update()
+        self.needs_redraw = False
+        self.redraws += 1
+
+    def report(self):
+        share = self.cpu / self.wall if self.wall else 0
+        return (f'Menu {self.name}: open {self.wall:.1f}s, CPU {self.cpu:.2f}s ({share:.1%}), '
+                f'{self.redraws} redraws')
+
+
+class MenuScene(Scene):
+    """Scene drawn through a MenuLoop (self.loop), which follows its hooks."""
+    name = 'menu'
+
+    def enter(self, manager):
+        super().enter(manager)
+        self.loop = MenuLoop(self.name)
+
+    def exit(self):
+        self.loop.close()
+
+    def pause(self):
+        self.loop.pause()
+
+    def resume(self):
+        self.loop.resume()
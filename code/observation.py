@@ -0,0 +1,109 @@
+import weakref
+import numpy as np
+import pygame
+from settings import WINDOW_WIDTH, WINDOW_HEIGHT
+
+
+class PixelObserver:
+    def __init__(self, size=(48, 80), grayscale=False, stack=1):
+        """
+        Small pixel observations of a level, drawn straight at their final size.
+
+        Each sprite image is shrunk (and made gray) once, the first time it is
+        drawn, then blitted at the scaled position into a surface of `size`;
+        the full-size frame is never drawn. The frame is read through a
+        surfarray view, which copies nothing, into a preallocated ring holding
+        the last `stack` frames.
+
+        The ring stores every frame twice, `stack` slots apart, so the last
+        frames in order are always one contiguous slice of it: observe()
+        returns a view of the ring, not a copy. Crows are drawn without their
+        ghost trails.
+
+        Args:
+            size (tuple): (width, height) of the observations.
+            grayscale (bool): (height, width) frames of gray levels instead of
+                (height, width, 3) RGB ones.
+            stack (int): Frames per observation (frame stacking).
+        """
+        self.size = size
+        self.grayscale = grayscale
+        self.stack = stack
+        self.scale = (size[0] / WINDOW_WIDTH, size[1] / WINDOW_HEIGHT)
+        self.surface = pygame.Surface(size).convert()
+        self.images = weakref.WeakKeyDictionary()  # sprite image -> shrunk copy
+
+        width, height = size
+        shape = (height, width) if grayscale else (height, width, 3)
+        self.frames = np.zeros((2 * stack, *shape), dtype=np.uint8)
+        self.head = 0  # slot of the newest frame
+        self.bytes_copied = 0  # into the ring, since creation
+
+    @property
+    def shape(self):
+        """Shape of observe() results; a single frame's when stack is 1."""
+        frame = self.frames.shape[1:]
+        return frame if self.stack == 1 else (self.stack, *frame)
+
+    def shrink(self, image):
+        small = self.images.get(image)
+        if small is None:
+            width, height = image.get_size()
+            small = pygame.transform.smoothscale(
+                image, (max(1, round(width * self.scale[0])), max(1, round(height * self.scale[1]))))
+            if self.grayscale:
+                small = pygame.transform.grayscale(small)
+            self.images[image] = small
+        return small
+
+    def draw(self, sprites):
+        surface = self.surface
+        scale_x, scale_y = self.scale
+        surface.fill('black')
+        for sprite in sprites:
+            image = self.shrink(sprite.image)
+            rect = sprite.rect
+            x, y = round(rect.x * scale_x), round(rect.y * scale_y)
+            surface.blit(image, (x, y))
+            # A rect wider than its image (level 1's scrolling background) repeats it
+            right = round(rect.right * scale_x)
+            step = image.get_width()
+            for x in range(x + step, right, step):
+                surface.blit(image, (x, y))
+
+    def capture(self):
+        """Copy the drawn frame into the ring and return the newest frame."""
+        self.head = (self.head + 1) % self.stack
+        frame = self.frames[self.head]
+        # The view locks the surface; it has to be gone before the next draw
+        if self.grayscale:
+            view = pygame.surfarray.pixels_red(self.surface)  # gray, so any channel
+            frame[...] = view.T
+        else:
+            view = pygame.surfarray.pixels3d(self.surface)
+            frame[...] = view.transpose(1, 0, 2)
+        del view
+        self.frames[self.head + self.stack] = frame
+        self.bytes_copied += 2 * frame.nbytes
+        return frame
+
+    def observe(self, sprites):
+        """Draw sprites as the newest frame; return the last `stack` frames, oldest first."""
+        self.draw(sprites)
+        self.capture()
+        return self.stacked()
+
+    def reset(self, sprites):
+        """Start a new episode: every frame of the stack shows sprites."""
+        self.draw(sprites)
+        frame = self.capture()
+        self.frames[:] = frame
+        return self.stacked()
+
+    def stacked(self):
+        if self.stack == 1:
+            return self.frames[self.head]
+        return self.frames[self.head + 1:self.head + 1 + self.stack]
+
+    def latest(self):
+        return self.frames[self.head]
@@ -1,17 +1,20 @@
 import pygame
-import sys
 import settings
 import time
 from button import Button
+from text import render_text, cache as text_cache
+from audio import play_music, stop_music, play_sfx, set_volume
+from menu import MenuScene
 
 pygame.init()
 
 class Slider:
-    def __init__(self, x, y, w, h, start_val):
+    def __init__(self, x, y, w, h, start_val, on_change=None):
         self.rect = pygame.Rect(x, y, w, h)
         self.value = float(start_val)
         self.handle_radius = h // 2
         self.dragging = False
+        self.on_change = on_change  # called with the new value while dragging
 
     def draw(self, surface, bar_color=(150,150,150), handle_color=(255,255,255)):
         pygame.draw.rect(surface, bar_color, self.rect)
@@ -31,94 +34,100 @@ class Slider:
             self.dragging = False
         elif event.type == pygame.MOUSEMOTION and self.dragging:
             rx = max(self.rect.x, min(event.pos[0], self.rect.x + self.rect.width))
-            self.value = (rx - self.rect.x) / self.rect.width
-
-def options_menu(screen, get_font):
-    clock = pygame.time.Clock()
-    pygame.display.set_caption("Options")
-
-    # background same as main
-    original_bg = pygame.image.load("../graphics/main menu/Background.png")
-    bg_height = original_bg.get_height()
-    scale_factor = settings.WINDOW_HEIGHT / bg_height
-    bg = pygame.transform.scale(original_bg, (int(original_bg.get_width() * scale_factor), settings.WINDOW_HEIGHT))
-    bg_rect = bg.get_rect(center=(settings.WINDOW_WIDTH // 2, settings.WINDOW_HEIGHT // 2))
-
-    # slider width centered, slight nudge left (small)
-    slider_width = 300
-    base_center_x = (settings.WINDOW_WIDTH - slider_width) // 2
-    slider_x = base_center_x - 0   # Offset pos
-
-    # initialize sliders from settings (persisted values)
-    bgm_slider = Slider(slider_x, 200, slider_width, 18, getattr(settings, "BGM_VOLUME", 1.0))
-    sfx_slider = Slider(slider_x, 300, slider_width, 18, getattr(settings, "SFX_VOLUME", 1.0))
-
-    # back button (reuse your Button)
-    back_btn = Button(None, (settings.WINDOW_WIDTH // 2, 500), "BACK", get_font(30), "black", "red")
-
-    # preview sounds (optional)
-    try:
-        preview_bgm = pygame.mixer.Sound("../sounds/music.wav")
-        preview_bgm.play(loops=-1)
-        preview_bgm.set_volume(bgm_slider.value)
-    except Exception:
-        preview_bgm = None
-
-    try:
-        preview_sfx = pygame.mixer.Sound("../sounds/jump.wav")
-    except Exception:
-        preview_sfx = None
-
-    last_sfx_play_time = 0
-    sfx_cooldown = 0.5  # in seconds    <-- SFX interval
-
-    running = True
-    while running:
-        screen.blit(bg, bg_rect.topleft)
+            value = (rx - self.rect.x) / self.rect.width
+            if value != self.value:
+                self.value = value
+                if self.on_change:
+                    self.on_change(value)
+
+def draw_label(surface, font, name, value, pos):
+    # Static name from the text cache, changing value composed from glyphs
+    label = render_text(font, f"{name}: ", "black")
+    surface.blit(label, pos)
+    text_cache.atlas(font, "black").draw(surface, f"{value:.2f}", (pos[0] + label.get_width(), pos[1]))
+
+class OptionsMenu(MenuScene):
+    name = "options"
+
+    def __init__(self, screen, get_font):
+        self.screen = screen
+        self.get_font = get_font
+
+        # background same as main
+        original_bg = pygame.image.load("../graphics/main menu/Background.png")
+        bg_height = original_bg.get_height()
+        scale_factor = settings.WINDOW_HEIGHT / bg_height
+        self.bg = pygame.transform.scale(original_bg, (int(original_bg.get_width() * scale_factor), settings.WINDOW_HEIGHT))
+        self.bg_rect = self.bg.get_rect(center=(settings.WINDOW_WIDTH // 2, settings.WINDOW_HEIGHT // 2))
+
+        # slider width centered, slight nudge left (small)
+        slider_width = 300
+        base_center_x = (settings.WINDOW_WIDTH - slider_width) // 2
+        self.slider_x = base_center_x - 0   # Offset pos
+
+        # initialize sliders from settings (persisted values); moving one stores
+        # and applies the new volume right away
+        self.bgm_slider = Slider(self.slider_x, 200, slider_width, 18, getattr(settings, "BGM_VOLUME", 1.0),
+                                 on_change=lambda value: set_volume(bgm=value))
+        self.sfx_slider = Slider(self.slider_x, 300, slider_width, 18, getattr(settings, "SFX_VOLUME", 1.0),
+                                 on_change=lambda value: set_volume(sfx=value))
+
+        # back button (reuse your Button)
+        self.back_btn = Button(None, (settings.WINDOW_WIDTH // 2, 500), "BACK", get_font(30), "black", "red")
+
+        self.last_sfx_play_time = 0
+        self.sfx_cooldown = 0.5  # in seconds    <-- SFX interval
+
+    def enter(self, manager):
+        super().enter(manager)
+        pygame.display.set_caption("Options")
+        # preview music (streamed, like in the levels)
+        play_music(settings.MUSIC_PATH)
+
+    def exit(self):
+        super().exit()
+        stop_music()
+
+    def step(self):
+        loop = self.loop
+        screen = self.screen
         mouse_pos = pygame.mouse.get_pos()
+        loop.hover([self.back_btn], mouse_pos)
 
-        # draw labels aligned with slider_x
-        screen.blit(get_font(24).render(f"BGM: {bgm_slider.value:.2f}", True, "black"), (slider_x, 160))
-        screen.blit(get_font(24).render(f"SFX: {sfx_slider.value:.2f}", True, "black"), (slider_x, 260))
+        if loop.needs_redraw:
+            screen.blit(self.bg, self.bg_rect.topleft)
 
-        bgm_slider.draw(screen)
-        sfx_slider.draw(screen)
+            # draw labels aligned with slider_x
+            draw_label(screen, self.get_font(24), "BGM", self.bgm_slider.value, (self.slider_x, 160))
+            draw_label(screen, self.get_font(24), "SFX", self.sfx_slider.value, (self.slider_x, 260))
 
-        back_btn.change_color(mouse_pos)
-        back_btn.update(screen)
+            self.bgm_slider.draw(screen)
+            self.sfx_slider.draw(screen)
 
-        current_time = time.time()
+            self.back_btn.change_color(mouse_pos)
+            self.back_btn.update(screen)
+            loop.present()
 
-        for event in pygame.event.get():
+        # keep waking while the sfx slider is held, for the preview below
+        values = (self.bgm_slider.value, self.sfx_slider.value)
+        for event in loop.wait(busy=self.sfx_slider.dragging):
             if event.type == pygame.QUIT:
-                pygame.quit()
-                sys.exit()
+                self.manager.quit()
+                return
 
-            bgm_slider.handle_event(event)
-            sfx_slider.handle_event(event)
+            self.bgm_slider.handle_event(event)
+            self.sfx_slider.handle_event(event)
 
             if event.type == pygame.MOUSEBUTTONDOWN:
-                if back_btn.check_for_input(mouse_pos):
-                    running = False
-
-        # write values back into settings so they persist globally
-        settings.BGM_VOLUME = bgm_slider.value
-        settings.SFX_VOLUME = sfx_slider.value
-
-        # update preview volume live
-        if preview_bgm:
-            preview_bgm.set_volume(settings.BGM_VOLUME)
+                if self.back_btn.check_for_input(event.pos):
+                    self.manager.pop()
+                    return
+        if (self.bgm_slider.value, self.sfx_slider.value) != values:
+            loop.needs_redraw = True
 
         # play sfx only if dragging AND cooldown passed
-        if preview_sfx and sfx_slider.dragging:
-            if current_time - last_sfx_play_time > sfx_cooldown:
-                preview_sfx.set_volume(settings.SFX_VOLUME)
-                preview_sfx.play()
-                last_sfx_play_time = current_time
-
-        pygame.display.update()
-        clock.tick(60)
-
-    # previews sounds
-    if preview_bgm:
-        preview_bgm.stop()
+        current_time = time.time()
+        if self.sfx_slider.dragging:
+            if current_time - self.last_sfx_play_time > self.sfx_cooldown:
+                play_sfx(settings.JUMP_SOUND_PATH)
+                self.last_sfx_play_time = current_time
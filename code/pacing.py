@@ -0,0 +1,137 @@
+import time
+import warnings
+import pygame
+from settings import (
+    FRAMERATE, FRAME_PACING, FRAME_CPU_BUDGET, MIN_FRAMERATE,
+    MAX_FRAME_TIME, FRAME_PACING_REPORT
+)
+
+PACING_MODES = ('cap', 'vsync', 'adaptive', 'uncapped')
+ADAPT_RATE = 0.05  # weight of the newest frame in the smoothed work time
+
+_vsync = False  # the window from set_mode() waits for the display refresh
+
+
+def set_mode(size, pacing=FRAME_PACING):
+    """
+    Open the game window, vsync'd (through pygame.SCALED) for 'vsync' pacing.
+
+    Drivers that cannot vsync either raise or warn and hand back an ordinary
+    window; the FramePacer then caps at FRAMERATE instead.
+    """
+    global _vsync
+    if pacing == 'vsync':
+        with warnings.catch_warnings(record=True) as caught:
+            warnings.simplefilter('always')
+            try:
+                surface = pygame.display.set_mode(size, pygame.SCALED, vsync=1)
+            except pygame.error:
+                surface = None
+        if surface is not None and not caught:
+            _vsync = True
+            return surface
+    _vsync = False
+    return pygame.display.set_mode(size)
+
+
+class FramePacer:
+    def __init__(self, mode=FRAME_PACING, framerate=FRAMERATE, cpu_budget=FRAME_CPU_BUDGET,
+                 min_framerate=MIN_FRAMERATE, max_frame_time=MAX_FRAME_TIME):
+        """
+        Paces a level's frames and counts the ones that miss.
+
+        tick() runs at the top of every frame: it sleeps until the frame is
+        due and returns the time since the previous one, read from the
+        monotonic perf_counter and clamped to max_frame_time, so a stall
+        (dragging the window, a slow disk) never hands the simulation more
+        than that in one frame.
+
+        Args:
+            mode (str): 'cap' sleeps to at most `framerate` frames per second;
+                'vsync' lets presenting wait for the display (see set_mode) and
+                falls back to 'cap' without a vsync'd window; 'adaptive' caps
+                like 'cap' but lowers the frame rate, down to min_framerate,
+                while a frame's work takes more than cpu_budget of its frame
+                time; 'uncapped' never sleeps.
+            framerate (int): Highest frame rate (and the nominal one for vsync).
+            cpu_budget (float): Share of each frame the adaptive mode may spend working.
+            min_framerate (int): Lowest frame rate the adaptive mode goes down to.
+            max_frame_time (float): Longest dt returned, in seconds.
+        """
+        if mode not in PACING_MODES:
+            raise ValueError(f'Unknown frame pacing: {mode}')
+        if mode == 'vsync' and not _vsync:
+            mode = 'cap'
+        self.mode = mode
+        self.min_period = 1 / framerate
+        self.max_period = 1 / min_framerate
+        self.cpu_budget = cpu_budget
+        self.max_frame_time = max_frame_time
+        self.start()
+
+    def start(self):
+        """Start timing (and counting) from now, e.g. when the level gets the screen."""
+        now = time.perf_counter()
+        self.period = self.min_period
+        self.work = 0.0  # smoothed time a frame spends working, for 'adaptive'
+        self.deadline = now
+        self.last = now
+        self.started = (now, time.process_time())
+        self.frames = 0
+        self.late = 0     # frames whose work overran their slot
+        self.dropped = 0  # frames that took longer than 1.5 slots
+        self.clamped = 0  # frames whose dt was cut to max_frame_time
+
+    def tick(self):
+        """Wait until the next frame is due and return its dt in seconds."""
+        now = time.perf_counter()
+        if self.mode == 'adaptive':
+            # The frame time that keeps the work within the CPU budget; a
+            # single stall counts no more than max_frame_time
+            work = min(now - self.last, self.max_frame_time)
+            self.work += (work - self.work) * ADAPT_RATE
+            self.period = min(max(self.work / self.cpu_budget, self.min_period), self.max_period)
+        if self.mode in ('cap', 'adaptive'):
+            # Deadlines follow each other by a period, so oversleeping one
+            # frame shortens the next sleep instead of drifting
+            self.deadline += self.period
+            if now < self.deadline:
+                time.sleep(self.deadline - now)
+            else:
+                self.late += 1
+                if now - self.deadline > self.period:
+                    self.deadline = now
+            now = time.perf_counter()
+
+        dt = now - self.last
+        self.last = now
+        self.frames += 1
+        if dt > self.period * 1.5:
+            self.dropped += 1
+        if dt > self.max_frame_time:
+            self.clamped += 1
+            dt = self.max_frame_time
+        return dt
+
+    def stats(self):
+        wall = time.perf_counter() - self.started[0]
+        cpu = time.process_time() - self.started[1]
+        return {
+            'mode': self.mode,
+            'frames': self.frames,
+            'fps': self.frames / wall if wall else 0,
+            'cpu': cpu / wall if wall else 0,
+            'late': self.late,
+            'dropped': self.dropped,
+            'clamped': self.clamped,
+        }
+
+    def report(self):
+        stats = self.stats()
+        return (f'Frames ({stats["mode"]}): {stats["frames"]} at {stats["fps"]:.0f} fps, '
+                f'CPU {stats["cpu"]:.1%}, {stats["late"]} late, {stats["dropped"]} dropped, '
+                f'{stats["clamped"]} clamped')
+
+    def close(self):
+        if FRAME_PACING_REPORT:
+            print(self.report())
@@ -0,0 +1,66 @@
+import pygame
+from abc import ABC, abstractmethod
+from settings import POOL_MAX_SIZE
+
+
+class PooledSprite(pygame.sprite.Sprite, ABC):
+    """
+    Sprite that goes back to the SpritePool that created it when killed.
+
+    Subclasses implement reset() with the same arguments as __init__.
+    """
+    pool = None
+
+    @abstractmethod
+    def reset(self, *args, **kwargs):
+        """Add the sprite to the given groups and re-place it as if newly built."""
+
+    def kill(self):
+        was_alive = self.alive()
+        super().kill()
+        if was_alive and self.pool is not None:
+            self.pool.release(self)
+
+
+class SpritePool:
+    def __init__(self, sprite_class, max_size=POOL_MAX_SIZE):
+        """
+        Recycles killed sprites of one PooledSprite class.
+
+        Args:
+            sprite_class (type): Class built when the pool is empty.
+            max_size (int): Most idle sprites kept; extra ones are left to the GC.
+        """
+        self.sprite_class = sprite_class
+        self.max_size = max_size
+        self.free = []
+        self.created = 0
+        self.reused = 0
+        self.dropped = 0
+
+    def acquire(self, *args, **kwargs):
+        """Return a sprite set up with the given constructor arguments."""
+        if self.free:
+            sprite = self.free.pop()
+            sprite.reset(*args, **kwargs)
+            self.reused += 1
+        else:
+            sprite = self.sprite_class(*args, **kwargs)
+            sprite.pool = self
+            self.created += 1
+        return sprite
+
+    def release(self, sprite):
+        if len(self.free) < self.max_size:
+            self.free.append(sprite)
+        else:
+            self.dropped += 1
+
+    def stats(self):
+        return {
+            'created': self.created,
+            'reused': self.reused,
+            'dropped': self.dropped,
+            'idle': len(self.free),
+            'live': self.created - self.dropped - len(self.free),
+        }
@@ -0,0 +1,207 @@
+import importlib
+import queue
+import threading
+import time
+import pygame
+import assets
+from assets import RotationAtlas
+from bundle import open_level_bundle, attach_level_bundle
+from settings import WINDOW_HEIGHT, ROTATION_STEP, ROTATION_PRERENDER_RANGE
+
+POLL_BUDGET = 0.004  # seconds of main-thread work per poll(), to keep menus smooth
+WARM_CHUNK = 1 << 20  # bytes read at a time when warming a bundle file
+
+
+class PreloadJob:
+    def __init__(self, level):
+        """
+        Loads one level's assets ahead of its start.
+
+        A worker thread imports the level module, then either reads the level's
+        asset bundle through once (so its pages are in the OS cache) or decodes
+        the files in the module's PRELOAD_IMAGES, and loads PRELOAD_SOUNDS. It
+        never touches the asset cache: results are queued, and poll() converts
+        them and stores them on the main thread. Bundles that are out of date
+        (see bundle.open_level_bundle) are not used.
+
+        Without a bundle, the rotation atlases of PRELOAD_ROTATIONS (the
+        largest part of a level's start-up) are also rendered by poll(), a few
+        angles per call.
+        """
+        self.level = level
+        self.cancelled = threading.Event()
+        self.results = queue.SimpleQueue()
+        self.total = None  # known once the worker has imported the level
+        self.done = 0
+        self.building = None  # (path, scale, atlas, angles left) being rendered
+        self.error = None  # what stopped the worker, if it failed
+        self.thread = threading.Thread(target=self._work, name=f'preload-level{level}', daemon=True)
+        self.thread.start()
+
+    @property
+    def progress(self):
+        return self.done / self.total if self.total else 0.0
+
+    @property
+    def complete(self):
+        return self.total is not None and self.done >= self.total
+
+    @property
+    def failed(self):
+        return self.error is not None
+
+    def poll(self, budget=POLL_BUDGET):
+        """Hand finished items over to the asset cache for up to budget seconds."""
+        deadline = time.perf_counter() + budget
+        while time.perf_counter() < deadline:
+            if self.building:
+                self._build_rotations(deadline)
+                continue
+            try:
+                kind, path, value = self.results.get_nowait()
+            except queue.Empty:
+                return
+            if kind == 'image':
+                path, alpha = path
+                assets.cache.source(path, alpha, decoded=value)
+            elif kind == 'sound':
+                assets.cache.sound(path, loaded=value)
+            elif kind == 'bundle':
+                attach_level_bundle(self.level, value)
+            elif kind == 'rotations':
+                self._start_rotations(path, value)
+                continue  # counted once rendered
+            self.done += 1
+
+    def _start_rotations(self, path, scaling):
+        background_path, player_scale = scaling
+        scale = WINDOW_HEIGHT / assets.image_size(background_path)[1] * player_scale
+        # Starts with only the 0 degree frame; lookup() renders the others
+        atlas = RotationAtlas(assets.load_image(path, scale), ROTATION_STEP, prerender_range=0)
+        last = round(ROTATION_PRERENDER_RANGE / ROTATION_STEP)
+        angles = [i * ROTATION_STEP for i in range(-last, last + 1)]
+        self.building = (path, scale, atlas, angles)
+
+    def _build_rotations(self, deadline):
+        path, scale, atlas, angles = self.building
+        while angles and time.perf_counter() < deadline:
+            atlas.lookup(angles.pop())
+        if not angles:
+            assets.cache.rotations(path, scale, ROTATION_STEP, built=atlas)
+            self.building = None
+            self.done += 1
+
+    def finish(self):
+        """Block until everything is loaded and handed over; return whether it all was."""
+        while not self.complete and (self.thread.is_alive() or not self.results.empty() or self.building):
+            self.poll(budget=1.0)
+            self.thread.join(0.001)
+        self.poll(budget=1.0)
+        return self.complete and not self.failed
+
+    def _work(self):
+        try:
+            self._load()
+        except Exception as error:  # e.g. a missing or corrupt file
+            self.error = error
+
+    def _load(self):
+        module = importlib.import_module(f'game_level{self.level}')
+        images = module.PRELOAD_IMAGES
+        rotations = module.PRELOAD_ROTATIONS
+        # The level scales everything to fit its background to the window
+        background_path = getattr(module, f'Level{self.level}Simulation').background_path
+        player_scale = module.PLAYER_SCALE
+        sounds = module.PRELOAD_SOUNDS if pygame.mixer.get_init() else []
+
+        # An up to date bundle already holds the scaled images, so only its
+        # pages are read
+        bundle = open_level_bundle(self.level)
+        if bundle is not None:
+            self.total = 1 + len(sounds)
+            with open(bundle.path, 'rb') as file:
+                while file.read(WARM_CHUNK):
+                    if self.cancelled.is_set():
+                        return
+            self.results.put(('bundle', bundle.path, bundle))
+        else:
+            self.total = len(images) + len(rotations) + len(sounds)
+            for path, alpha in images:
+                if self.cancelled.is_set():
+                    return
+                self.results.put(('image', (path, alpha), pygame.image.load(path)))
+            for path in rotations:
+                self.results.put(('rotations', path, (background_path, player_scale)))
+
+        for path in sounds:
+            if self.cancelled.is_set():
+                return
+            try:
+                self.results.put(('sound', path, pygame.mixer.Sound(path)))
+            except (pygame.error, FileNotFoundError):
+                # Loaded (and reported) by the level itself
+                self.results.put(('skipped', path, None))
+
+
+class Preloader:
+    def __init__(self):
+        """Runs at most one PreloadJob at a time and remembers which levels are ready."""
+        self.job = None
+        self.ready = set()
+        self.last_level = None  # level started last, preloaded when nothing else is asked for
+
+    @property
+    def busy(self):
+        return self.job is not None
+
+    def request(self, level):
+        """Start preloading level, cancelling any other level in progress."""
+        if level is None or level in self.ready or (self.job and self.job.level == level):
+            return
+        self.cancel()
+        self.job = PreloadJob(level)
+
+    def cancel(self):
+        # The worker stops at its next file; whatever it queued is dropped
+        if self.job:
+            self.job.cancelled.set()
+            self.job = None
+
+    def poll(self):
+        """Call once per menu frame."""
+        if self.job:
+            self.job.poll()
+            if self.job.failed:
+                self.report_failure(self.job)
+                self.job = None
+            elif self.job.complete:
+                self.ready.add(self.job.level)
+                self.job = None
+
+    def finish(self, level):
+        """
+        Complete level's preload if it is running (about to start it); cancel
+        any other. If the preload failed, the level loads whatever is missing
+        itself, as without preloading.
+        """
+        self.last_level = level
+        if self.job and self.job.level == level:
+            if self.job.finish():
+                self.ready.add(level)
+            else:
+                self.report_failure(self.job)
+            self.job = None
+        else:
+            self.cancel()
+
+    def report_failure(self, job):
+        # The level's own loading reports the file again if it is really missing
+        print(f'Preload: level {job.level} failed ({job.error}), it will load when started')
+
+    def progress(self, level):
+        """0..1 while level is loading, 1 when ready, None when not preloading."""
+        if level in self.ready:
+            return 1.0
+        if self.job and self.job.level == level:
+            return self.job.progress
+        return None
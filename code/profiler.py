@@ -0,0 +1,147 @@
+import csv
+import json
+import time
+from array import array
+from contextlib import nullcontext
+import pygame
+from settings import PROFILER_HISTORY, PROFILER_TRACE_PATH
+
+TOGGLE_KEY = pygame.K_F3
+OVERLAY_REFRESH = 30  # frames between overlay text updates
+GRAPH_SIZE = (200, 60)
+GRAPH_MAX_MS = 33.3
+
+
+class _Phase:
+    # Reused context manager so timing a phase allocates nothing
+    __slots__ = ('profiler', 'name', 'start')
+
+    def __init__(self, profiler, name):
+        self.profiler = profiler
+        self.name = name
+        self.start = 0
+
+    def __enter__(self):
+        self.start = time.perf_counter_ns()
+
+    def __exit__(self, *exc):
+        self.profiler.current[self.name] += time.perf_counter_ns() - self.start
+
+
+class FrameProfiler:
+    def __init__(self, history=PROFILER_HISTORY, trace_path=PROFILER_TRACE_PATH):
+        """
+        Per-frame timings of named phases (events, update, draw, ...).
+
+        Each phase keeps its last `history` frame times, in nanoseconds, in a
+        ring buffer; the whole frame is recorded as the 'frame' phase.
+
+        Args:
+            history (int): Frames kept per phase.
+            trace_path (str or None): CSV or JSON file written by dump_trace().
+        """
+        self.history = history
+        self.trace_path = trace_path
+        self.phases = {}
+        self.current = {}
+        self.samples = {'frame': array('q', [0] * history)}
+        self.index = 0
+        self.count = 0
+        self.frame_start = time.perf_counter_ns()
+
+        self.overlay_visible = False
+        self.font = None
+        self.overlay_lines = []
+
+    def phase(self, name):
+        """Context manager adding its duration to this frame's `name` phase."""
+        phase = self.phases.get(name)
+        if phase is None:
+            phase = self.phases[name] = _Phase(self, name)
+            self.current[name] = 0
+            self.samples[name] = array('q', [0] * self.history)
+        return phase
+
+    def end_frame(self):
+        """Store this frame's phase times and start timing the next frame."""
+        now = time.perf_counter_ns()
+        self.samples['frame'][self.index] = now - self.frame_start
+        self.frame_start = now
+        for name, elapsed in self.current.items():
+            self.samples[name][self.index] = elapsed
+            self.current[name] = 0
+        self.index = (self.index + 1) % self.history
+        self.count += 1
+
+    def ordered(self, name):
+        """Recorded times of a phase, oldest first."""
+        samples = self.samples[name]
+        if self.count < self.history:
+            return samples[:self.count]
+        return samples[self.index:] + samples[:self.index]
+
+    def percentiles(self, name, points=(50, 95, 99)):
+        values = sorted(self.ordered(name))
+        if not values:
+            return [0] * len(points)
+        return [values[min(len(values) - 1, len(values) * p // 100)] for p in points]
+
+    def handle_event(self, event):
+        if event.type == pygame.KEYDOWN and event.key == TOGGLE_KEY:
+            self.overlay_visible = not self.overlay_visible
+
+    def draw(self, surface):
+        """Draw the percentile table and frame-time graph if the overlay is on."""
+        if not self.overlay_visible:
+            return
+        if self.font is None:
+            self.font = pygame.font.Font(None, 18)
+        if self.count % OVERLAY_REFRESH == 0 or not self.overlay_lines:
+            self.overlay_lines = [self.font.render('phase      p50   p95   p99 ms', True, 'white')]
+            for name in self.samples:
+                p50, p95, p99 = (value / 1e6 for value in self.percentiles(name))
+                text = f'{name:<10}{p50:6.2f}{p95:6.2f}{p99:6.2f}'
+                self.overlay_lines.append(self.font.render(text, True, 'white'))
+
+        width, height = GRAPH_SIZE
+        panel = pygame.Rect(4, 4, width + 8, 16 * len(self.overlay_lines) + height + 12)
+        surface.fill((0, 0, 0), panel)
+        for i, line in enumerate(self.overlay_lines):
+            surface.blit(line, (8, 8 + 16 * i))
+
+        # Frame times, newest on the right; 0 ms at the bottom, GRAPH_MAX_MS at the top
+        frames = self.ordered('frame')[-width:]
+        bottom = panel.bottom - 4
+        if len(frames) > 1:
+            points = [(8 + x, bottom - min(height, value / 1e6 / GRAPH_MAX_MS * height))
+                      for x, value in enumerate(frames)]
+            pygame.draw.lines(surface, (0, 255, 0), False, points)
+
+    def dump_trace(self, path=None):
+        """Write the recorded frames to a .csv or .json file (no-op without a path)."""
+        path = path or self.trace_path
+        if not path:
+            return
+        names = list(self.samples)
+        columns = [self.ordered(name) for name in names]
+        if path.endswith('.json'):
+            summary = {name: dict(zip(('p50', 'p95', 'p99'), self.percentiles(name))) for name in names}
+            with open(path, 'w') as file:
+                json.dump({'unit': 'ns', 'percentiles': summary,
+                           'frames': {name: list(column) for name, column in zip(names, columns)}}, file)
+        else:
+            with open(path, 'w', newline='') as file:
+                writer = csv.writer(file)
+                writer.writerow([f'{name}_ns' for name in names])
+                writer.writerows(zip(*columns))
+
+
+class NullProfiler:
+    """Stand-in used when nothing is profiling, e.g. headless simulations."""
+    _phase = nullcontext()
+
+    def phase(self, name):
+        return self._phase
+
+
+NULL_PROFILER = NullProfiler()
@@ -0,0 +1,216 @@
+import pygame
+import settings
+from text import render_text
+
+
+class UiImage(pygame.sprite.DirtySprite):
+    def __init__(self, image, rect, visible=True):
+        """
+        Static piece of screen UI (menu panel, icon) drawn by a renderer.
+
+        Args:
+            image (Surface): What to draw.
+            rect (Rect): Where to draw it.
+            visible (bool): Initial visibility; change it with show().
+        """
+        super().__init__()
+        self.image = image
+        self.rect = pygame.Rect(rect)
+        self.visible = int(visible)
+        self.dirty = 1
+
+    def show(self, visible=True):
+        if self.visible != int(visible):
+            self.visible = int(visible)
+            self.dirty = 1
+
+
+class UiText(UiImage):
+    def __init__(self, font, color, anchor='midtop', visible=True):
+        """Text label that only re-renders when its text or position changes."""
+        super().__init__(pygame.Surface((0, 0)), (0, 0, 0, 0), visible)
+        self.font = font
+        self.color = color
+        self.anchor = anchor
+        self.text = None
+        self.pos = None
+
+    def set_text(self, text, pos):
+        if text == self.text and pos == self.pos:
+            return
+        self.text = text
+        self.pos = pos
+        self.image = render_text(self.font, text, self.color)
+        self.rect = self.image.get_rect(**{self.anchor: pos})
+        self.dirty = 1
+
+
+class UiButton(UiImage):
+    def __init__(self, button, visible=True):
+        """Draws a button.Button, recomposing it only when its hover state flips."""
+        super().__init__(pygame.Surface((0, 0)), button.rect, visible)
+        self.button = button
+        self.hovered = None
+        self.hover((-1, -1))
+
+    def hover(self, mouse_pos):
+        hovered = self.button.check_for_input(mouse_pos)
+        if hovered == self.hovered:
+            return
+        self.hovered = hovered
+        self.button.change_color(mouse_pos)
+        self.rect = self.button.rect.union(self.button.text_rect)
+        self.image = pygame.Surface(self.rect.size, pygame.SRCALPHA)
+        # Same blits as Button.update, into a surface of our own
+        offset = (-self.rect.x, -self.rect.y)
+        if self.button.image:
+            self.image.blit(self.button.image, self.button.rect.move(offset))
+        self.image.blit(self.button.text, self.button.text_rect.move(offset))
+        self.dirty = 1
+
+
+class FullRenderer:
+    def __init__(self, surface):
+        """Original path: clear, redraw everything and flip the whole window each frame."""
+        self.surface = surface
+        self.ui = []
+
+    def add_ui(self, element):
+        """Register a UiImage drawn above the world, in the order added."""
+        self.ui.append(element)
+        return element
+
+    def render(self, world_sprites):
+        self.surface.fill('black')
+        for sprite in world_sprites:
+            if hasattr(sprite, 'draw'):
+                sprite.draw(self.surface)
+            else:
+                self.surface.blit(sprite.image, sprite.rect)
+        for element in self.ui:
+            if element.visible:
+                self.surface.blit(element.image, element.rect)
+
+    def invalidate(self):
+        """Something outside the renderer drew on the screen (no-op here)."""
+
+    def present(self):
+        pygame.display.update()
+
+
+class _WorldView(pygame.sprite.DirtySprite):
+    # Mirrors a simulation sprite; dirty only when its image or position changed.
+    # The rect covers the whole image, which may outgrow sprite.rect (rotation)
+    def __init__(self, sprite):
+        super().__init__()
+        self.sprite = sprite
+        self.image = sprite.image
+        self.rect = sprite.image.get_rect(topleft=sprite.rect.topleft)
+        self.dirty = 1
+
+    def sync(self):
+        sprite = self.sprite
+        if sprite.image is not self.image or sprite.rect.topleft != self.rect.topleft:
+            self.image = sprite.image
+            self.rect = sprite.image.get_rect(topleft=sprite.rect.topleft)
+            self.dirty = 1
+
+
+class DirtyRenderer:
+    def __init__(self, surface):
+        """
+        Dirty-rect path built on LayeredDirty: only regions whose sprites moved,
+        changed image or toggled visibility are redrawn and pushed to the window.
+
+        Sprites with their own draw() (crow trails) are drawn after the group and
+        their bounds() repainted on the next frame. Those that come before all
+        plain sprites (the level 1 background) are drawn into the background
+        instead. LayeredDirty falls back to full-window updates by itself when
+        tracking rects stops paying off.
+        """
+        self.surface = surface
+        self.background = pygame.Surface(surface.get_size()).convert()
+        self.background.fill('black')
+        self.group = pygame.sprite.LayeredDirty()
+        self.group.clear(surface, self.background)
+        self.views = {}
+        self.order = []
+        self.ui = []
+        self.custom_rects = []
+        self.rects = []
+        self.full_update = True
+
+    def add_ui(self, element):
+        self.ui.append(element)
+        self.group.add(element, layer=1)
+        return element
+
+    def render(self, world_sprites):
+        # Custom-drawn sprites below every plain one (an animated backdrop) are
+        # drawn into the background; the rest are drawn over the group
+        backdrop = []
+        custom = []
+        order = []
+        for sprite in world_sprites:
+            if hasattr(sprite, 'draw'):
+                (custom if order else backdrop).append(sprite)
+            else:
+                order.append(sprite)
+        if order != self.order:
+            self.sync_order(order)
+        for sprite in order:
+            self.views[sprite].sync()
+
+        for sprite in backdrop:
+            sprite.draw(self.background)
+            self.group.repaint_rect(sprite.bounds())
+
+        # Clean up after last frame's custom drawing
+        for rect in self.custom_rects:
+            self.group.repaint_rect(rect)
+        self.custom_rects = []
+
+        self.rects = self.group.draw(self.surface, self.background)
+        for sprite in custom:
+            sprite.draw(self.surface)
+            self.custom_rects.append(sprite.bounds())
+        self.rects.extend(self.custom_rects)
+
+    def sync_order(self, order):
+        # Views are drawn in the order they joined the group; sprites recycled
+        # between two frames move to the end of theirs, so rebuild on a mismatch
+        alive = set(order)
+        kept = [sprite for sprite in self.order if sprite in alive]
+        for sprite in [sprite for sprite in self.views if sprite not in alive]:
+            self.views.pop(sprite).kill()
+        if kept != order[:len(kept)]:
+            for view in self.views.values():
+                view.kill()
+            self.views = {}
+        for sprite in order:
+            if sprite not in self.views:
+                self.views[sprite] = _WorldView(sprite)
+                self.group.add(self.views[sprite], layer=0)
+        self.order = order
+
+    def invalidate(self):
+        """Push the whole window this frame and repaint all of it on the next."""
+        self.full_update = True
+
+    def present(self):
+        if self.full_update:
+            pygame.display.update()
+            self.group.repaint_rect(self.surface.get_rect())
+            self.full_update = False
+        else:
+            pygame.display.update(self.rects)
+
+
+def make_renderer(surface, mode=None):
+    """Build the renderer selected by settings.RENDER_MODE ('full' or 'dirty')."""
+    mode = mode or settings.RENDER_MODE
+    if mode == 'dirty':
+        return DirtyRenderer(surface)
+    if mode == 'full':
+        return FullRenderer(surface)
+    raise ValueError(f'Unknown render mode: {mode}')
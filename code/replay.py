@@ -0,0 +1,123 @@
+import struct
+import sys
+import time
+from settings import SIMULATION_STEP
+from simulation import JUMP, init_headless, load_simulation
+
+# File layout (little endian):
+#   header  magic, version, level, seed, step (s), frame count, action count
+#   actions one varint each: (frames since previous action << 1) | kind
+#   hash    32-byte Simulation.state_hash() after the last frame
+MAGIC = b'FBRP'
+VERSION = 2  # 2: spawns planned by schedule.SpawnSchedule
+HEADER = struct.Struct('<4sBBQdII')
+ACTION_JUMP = 0
+ACTION_RESET = 1
+
+
+class ReplayRecorder:
+    def __init__(self, level, sim):
+        """
+        Logs the inputs a Simulation receives so the run can be replayed exactly.
+
+        Args:
+            level (int): Level number passed to load_simulation on playback.
+            sim (Simulation): Freshly built simulation to record; attaches itself.
+        """
+        self.level = level
+        self.sim = sim
+        self.actions = []  # (frame, kind), in the order they were applied
+        sim.recorder = self
+
+    def jump(self, frame):
+        self.actions.append((frame, ACTION_JUMP))
+
+    def reset(self, frame):
+        self.actions.append((frame, ACTION_RESET))
+
+    def save(self, path):
+        with open(path, 'wb') as file:
+            file.write(HEADER.pack(MAGIC, VERSION, self.level, self.sim.seed, SIMULATION_STEP,
+                                   self.sim.frame, len(self.actions)))
+            previous = 0
+            for frame, kind in self.actions:
+                file.write(_encode_varint((frame - previous) << 1 | kind))
+                previous = frame
+            file.write(self.sim.state_hash())
+
+
+def load_replay(path):
+    """Return (level, seed, step, frame count, actions, final hash) from a replay file."""
+    with open(path, 'rb') as file:
+        data = file.read()
+    magic, version, level, seed, step, frames, count = HEADER.unpack_from(data)
+    if magic != MAGIC or version != VERSION:
+        raise ValueError(f'{path} is not a version {VERSION} replay file')
+
+    offset = HEADER.size
+    actions = []
+    frame = 0
+    for _ in range(count):
+        value, offset = _decode_varint(data, offset)
+        frame += value >> 1
+        actions.append((frame, value & 1))
+    final_hash = data[offset:offset + 32]
+    return level, seed, step, frames, actions, final_hash
+
+
+def play_replay(path):
+    """
+    Re-simulate a recorded run as fast as possible.
+
+    Returns:
+        (matches, frames per second): whether the final state hash matches the
+        recorded one, and the playback speed.
+    """
+    level, seed, step, frames, actions, final_hash = load_replay(path)
+    sim = load_simulation(level, seed)
+
+    start = time.perf_counter()
+    index = 0
+    for frame in range(frames):
+        jump = False
+        while index < len(actions) and actions[index][0] == frame:
+            if actions[index][1] == ACTION_RESET:
+                sim.reset()
+            else:
+                jump = True
+            index += 1
+        sim.step(step, (JUMP,) if jump else ())
+    # A restart clicked after the last step
+    for _, kind in actions[index:]:
+        if kind == ACTION_RESET:
+            sim.reset()
+    elapsed = time.perf_counter() - start
+    return sim.state_hash() == final_hash, frames / max(elapsed, 1e-9)
+
+
+def _encode_varint(value):
+    out = bytearray()
+    while value >= 0x80:
+        out.append(value & 0x7F | 0x80)
+        value >>= 7
+    out.append(value)
+    return bytes(out)
+
+
+def _decode_varint(data, offset):
+    value = shift = 0
+    while True:
+        byte = data[offset]
+        offset += 1
+        value |= (byte & 0x7F) << shift
+        if byte < 0x80:
+            return value, offset
+        shift += 7
+
+
+if __name__ == '__main__':
+    # Usage: python replay.py run.fbr
+    init_headless()
+    matches, fps = play_replay(sys.argv[1])
+    print(f'{"OK" if matches else "MISMATCH"}: replayed at {fps:.0f} frames/s')
+    sys.exit(0 if matches else 1)
@@ -0,0 +1,113 @@
+import argparse
+import multiprocessing
+import os
+import random
+import time
+from collections import Counter, defaultdict
+from settings import SIMULATION_STEP
+from simulation import JUMP, init_headless, load_simulation, hover_policy
+
+
+def random_policy(sim):
+    return random.random() < 0.05
+
+
+# Policies are looked up by name so tasks stay cheap to send to workers
+POLICIES = {
+    'hover': hover_policy,
+    'random': random_policy,
+}
+
+
+def _init_worker(levels):
+    """Start pygame headless and decode every level's assets once per worker."""
+    init_headless()
+    for level in levels:
+        load_simulation(level)
+
+
+def run_episode(task):
+    """
+    Play one seeded episode and return its summary.
+
+    Args:
+        task (tuple): (level, seed, policy name, frame limit).
+    """
+    level, seed, policy_name, max_frames = task
+    policy = POLICIES[policy_name]
+    random.seed(seed)  # only random_policy draws from the global generator
+    sim = load_simulation(level, seed)
+
+    start = time.perf_counter()
+    while sim.active and sim.frame < max_frames:
+        # A policy decision stands in for the mouse click Game.run would turn into JUMP
+        sim.step(SIMULATION_STEP, (JUMP,) if policy(sim) else ())
+
+    return {
+        'level': level,
+        'seed': seed,
+        'score': sim.score,
+        'distance': sim.distance_traveled,
+        'cause': sim.death_cause or 'timeout',
+        'frames': sim.frame,
+        'seconds': time.perf_counter() - start,
+        'worker': os.getpid(),
+    }
+
+
+def run_farm(levels, seeds, policy='hover', max_frames=20000, workers=None, on_result=None):
+    """
+    Shard (level, seed) episodes across a process pool.
+
+    Results stream back over the pool's pipe as soon as each episode ends and
+    are passed to on_result; the full list is returned with the wall time.
+    """
+    tasks = [(level, seed, policy, max_frames) for level in levels for seed in seeds]
+    workers = workers or os.cpu_count()
+    results = []
+    start = time.perf_counter()
+    pool = multiprocessing.Pool(workers, initializer=_init_worker, initargs=(levels,))
+    try:
+        for result in pool.imap_unordered(run_episode, tasks, chunksize=4):
+            results.append(result)
+            if on_result:
+                on_result(result)
+        pool.close()
+    except BaseException:
+        pool.terminate()
+        raise
+    finally:
+        pool.join()
+    return results, time.perf_counter() - start
+
+
+def summarize(results, elapsed):
+    frames = sum(result['frames'] for result in results)
+    print(f'{len(results)} episodes in {elapsed:.2f}s: '
+          f'{len(results) / elapsed:.1f} episodes/s, {frames / elapsed:,.0f} frames/s')
+
+    by_level = defaultdict(list)
+    for result in results:
+        by_level[result['level']].append(result)
+    for level, level_results in sorted(by_level.items()):
+        scores = [result['score'] for result in level_results]
+        causes = Counter(result['cause'] for result in level_results)
+        print(f'  Level {level}: mean score {sum(scores) / len(scores):.2f}, '
+              f'best {max(scores)}, deaths {dict(causes)}')
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Evaluate a bot on many seeds in parallel.')
+    parser.add_argument('--levels', type=int, nargs='+', default=[1, 2, 3])
+    parser.add_argument('--seeds', type=int, default=100, help='number of seeds per level')
+    parser.add_argument('--first-seed', type=int, default=0)
+    parser.add_argument('--policy', choices=sorted(POLICIES), default='hover')
+    parser.add_argument('--max-frames', type=int, default=20000)
+    parser.add_argument('--workers', type=int, default=None)
+    parser.add_argument('--verbose', action='store_true', help='print every episode as it finishes')
+    args = parser.parse_args()
+
+    seeds = range(args.first_seed, args.first_seed + args.seeds)
+    on_result = print if args.verbose else None
+    results, elapsed = run_farm(args.levels, seeds, args.policy, args.max_frames, args.workers, on_result)
+    summarize(results, elapsed)
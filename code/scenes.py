@@ -0,0 +1,142 @@
+import gc
+import os
+import assets
+from abc import ABC, abstractmethod
+from settings import SCENE_MEMORY_LOG
+
+
+class Scene(ABC):
+    """
+    One screen (a menu or a level) run by a SceneManager, one step() per
+    iteration of the main loop. Subclasses implement step(); the other hooks
+    do nothing by default.
+    """
+    manager = None
+
+    def enter(self, manager):
+        """Called when the scene is pushed; it can change scenes through manager."""
+        self.manager = manager
+
+    def exit(self):
+        """Called when the scene is removed for good: stop sounds, save, drop resources."""
+
+    def pause(self):
+        """Another scene was pushed on top of this one."""
+
+    def resume(self):
+        """The scene on top was removed; this one runs (and should redraw) again."""
+
+    @abstractmethod
+    def step(self):
+        """Handle input, update and draw once."""
+
+
+class SceneManager:
+    def __init__(self, root_factory=None, memory_log=SCENE_MEMORY_LOG):
+        """
+        Stack of scenes owning the game's only main loop.
+
+        Scenes ask for changes with push(), pop(), replace_all() and quit();
+        the changes are applied between steps, so a scene never runs after
+        its exit(). Removed scenes are garbage collected right away (sprites
+        and their groups reference each other), which keeps memory flat over
+        any number of menu/level round trips.
+
+        Every transition is recorded in `transitions` with the process memory
+        and the asset cache size after it, and printed when memory_log is set.
+
+        Args:
+            root_factory (callable or None): Builds the scene home() returns
+                to (the main menu); None makes home() quit.
+            memory_log (bool): Print every transition.
+        """
+        self.root_factory = root_factory
+        self.stack = []
+        self.pending = []
+        self.memory_log = memory_log
+        self.transitions = []  # (action, scene name, resident bytes, asset cache bytes)
+
+    @property
+    def top(self):
+        return self.stack[-1] if self.stack else None
+
+    def push(self, scene):
+        self.pending.append(('push', scene))
+
+    def pop(self):
+        self.pending.append(('pop', None))
+
+    def replace_all(self, scene):
+        """Remove every scene, then push scene (e.g. back to a fresh main menu)."""
+        self.pending.append(('replace_all', scene))
+
+    def home(self):
+        """Remove every scene and start over on a fresh root scene."""
+        if self.root_factory is None:
+            self.quit()
+        else:
+            self.replace_all(self.root_factory())
+
+    def quit(self):
+        """Remove every scene, which ends run()."""
+        self.pending.append(('quit', None))
+
+    def run(self, scene):
+        """Push scene and step the top scene until the stack is empty."""
+        self.start(scene)
+        while self.stack:
+            self.step()
+
+    def start(self, scene):
+        self.push(scene)
+        self._apply()
+
+    def step(self):
+        """Step the top scene once, then apply the changes it asked for."""
+        self.stack[-1].step()
+        self._apply()
+
+    def _apply(self):
+        while self.pending:
+            action, scene = self.pending.pop(0)
+            if action == 'push':
+                if self.stack:
+                    self.stack[-1].pause()
+                self.stack.append(scene)
+                scene.enter(self)
+            elif action == 'pop':
+                scene = self.stack.pop()
+                scene.exit()
+                if self.stack:
+                    self.stack[-1].resume()
+            else:
+                while self.stack:
+                    self.stack.pop().exit()
+                if action == 'replace_all':
+                    self.stack.append(scene)
+                    scene.enter(self)
+                else:
+                    self.pending.clear()
+            name = type(scene).__name__ if scene is not None else '-'
+            # Nothing but the stack may keep a removed scene alive
+            scene = None
+            if action != 'push':
+                gc.collect()
+            self._record(action, name)
+
+    def _record(self, action, name):
+        entry = (action, name, memory_usage(), assets.cache.used_bytes)
+        if self.memory_log:
+            previous = self.transitions[-1][2] if self.transitions else entry[2]
+            print(f'Scene {action} {name}: {entry[2] / 1e6:.1f} MB resident '
+                  f'({(entry[2] - previous) / 1e6:+.1f}), asset cache {entry[3] / 1e6:.1f} MB')
+        self.transitions.append(entry)
+
+
+def memory_usage():
+    """Resident memory of the process in bytes; 0 where /proc is not available."""
+    try:
+        with open('/proc/self/statm') as file:
+            return int(file.read().split()[1]) * os.sysconf('SC_PAGE_SIZE')
+    except (OSError, AttributeError, ValueError):
+        return 0
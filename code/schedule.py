@@ -0,0 +1,198 @@
+from collections import deque
+from settings import WINDOW_HEIGHT, OBSTACLE_SCROLL_SPEED, JUMP_FORCE, SPAWN_CHUNK, DIFFICULTY_CURVE
+
+# Spawn kinds, handled by Simulation.spawn
+OBSTACLE = 'obstacle'
+CROWS = 'crows'
+GRAVITY_FLIP = 'gravity_flip'
+
+PLAN_TRIES = 8  # plans of a spawn tried before it is left out of the level
+
+
+class Spawn:
+    """Something the level spawns once it has scrolled `distance` pixels."""
+    __slots__ = ('distance', 'kind', 'params')
+
+    def __init__(self, distance, kind, params):
+        self.distance = distance
+        self.kind = kind
+        self.params = params
+
+
+class Track:
+    __slots__ = ('kind', 'spacing', 'plan', 'bounds', 'at')
+
+    def __init__(self, kind, spacing, plan, bounds):
+        self.kind = kind
+        self.spacing = spacing
+        self.plan = plan
+        self.bounds = bounds
+        self.at = None  # distance of the next spawn, drawn when planning starts
+
+
+def curve_value(curve, distance):
+    """Value of a piecewise linear ((distance, value), ...) curve; flat past its ends."""
+    if distance <= curve[0][0]:
+        return curve[0][1]
+    for (start, low), (end, high) in zip(curve, curve[1:]):
+        if distance < end:
+            return low + (high - low) * (distance - start) / (end - start)
+    return curve[-1][1]
+
+
+def free_gaps(blocked):
+    """(top, bottom) spans of the window height left open by the blocked spans."""
+    gaps = []
+    top = 0
+    for start, end in sorted(blocked):
+        if start > top:
+            gaps.append((top, start))
+        top = max(top, end)
+    if top < WINDOW_HEIGHT:
+        gaps.append((top, WINDOW_HEIGHT))
+    return gaps
+
+
+class SpawnSchedule:
+    def __init__(self, rng, clearance, column_width=200, chunk_length=SPAWN_CHUNK, curve=DIFFICULTY_CURVE):
+        """
+        A level's spawns, planned ahead from a seed in chunks of chunk_length
+        pixels of distance and handed out by due() as the level scrolls, so
+        spawning follows the distance traveled rather than timers and the
+        random draws and checks happen once per chunk instead of in the frame
+        that spawns.
+
+        Each track repeats one kind of spawn every spacing(rng) pixels, times
+        the difficulty curve at that distance. A track's bounds(params) gives
+        the (top, bottom) spans its spawn blocks; spawns less than
+        column_width apart (by spawn distance) form one column. A spawn is
+        planned again, up to PLAN_TRIES times and then left out, when its
+        column would have no gap `clearance` pixels tall, or when the gap is
+        further from the previous column's than the player can climb or dive
+        at jump speed in between. Crows fly faster than the level scrolls, so
+        for them this is an estimate.
+
+        Args:
+            rng (random.Random): Draws everything the plans need.
+            clearance (float): Smallest gap the player fits through.
+            column_width (float): Spawn distances closer than this share a column.
+            chunk_length (float): Pixels of distance planned at a time.
+            curve (tuple): ((distance, spacing factor), ...) difficulty curve.
+        """
+        self.rng = rng
+        self.clearance = clearance
+        self.column_width = column_width
+        self.chunk_length = chunk_length
+        self.curve = curve
+        self.tracks = []
+        self.spawns = deque()  # planned, not yet due, by distance
+        self.planned_to = 0
+        self.replanned = 0
+        self.dropped = 0
+
+        # Validation state, carried over from one chunk to the next: the
+        # column being filled and the (start, gap) of the one before
+        self.column_start = None
+        self.column_blocked = []
+        self.column_gap = (0, WINDOW_HEIGHT)
+        self.previous = None
+
+    def add_track(self, kind, spacing, plan=None, bounds=None):
+        """
+        Args:
+            kind (str): Spawn kind (OBSTACLE, CROWS, ...).
+            spacing (callable): rng -> pixels from one spawn to the next (and
+                from the start to the first one).
+            plan (callable or None): rng -> the spawn's params.
+            bounds (callable or None): params -> blocked (top, bottom) spans;
+                None leaves the spawn out of the solvability checks.
+        """
+        self.tracks.append(Track(kind, spacing, plan, bounds))
+
+    def spacing(self, track, distance):
+        return track.spacing(self.rng) * curve_value(self.curve, distance)
+
+    def plan_chunk(self):
+        """Plan the spawns of the next chunk_length pixels of distance."""
+        rng = self.rng
+        end = self.planned_to + self.chunk_length
+        chunk = []
+        for track in self.tracks:
+            if track.at is None:
+                track.at = self.spacing(track, 0)
+            while track.at < end:
+                chunk.append(Spawn(track.at, track.kind, track.plan(rng) if track.plan else None))
+                track.at += self.spacing(track, track.at)
+        chunk.sort(key=lambda spawn: spawn.distance)
+
+        bounds = {track.kind: track.bounds for track in self.tracks}
+        plans = {track.kind: track.plan for track in self.tracks}
+        for spawn in chunk:
+            track_bounds = bounds[spawn.kind]
+            if track_bounds is None:
+                self.spawns.append(spawn)
+                continue
+            for _ in range(PLAN_TRIES):
+                if self.fits(spawn.distance, track_bounds(spawn.params)):
+                    self.spawns.append(spawn)
+                    break
+                spawn.params = plans[spawn.kind](rng)
+                self.replanned += 1
+            else:
+                self.dropped += 1
+        self.planned_to = end
+
+    def fits(self, distance, blocked):
+        """Check a spawn against its column; if it fits, add it there."""
+        if self.column_start is None or distance - self.column_start >= self.column_width:
+            start, others = distance, []
+            before = None if self.column_start is None else (self.column_start, self.column_gap)
+        else:
+            start, others, before = self.column_start, self.column_blocked, self.previous
+        gaps = [gap for gap in free_gaps(others + blocked) if gap[1] - gap[0] >= self.clearance]
+        if before is not None:
+            # The player's top moves from [top, bottom - clearance] in the
+            # previous gap into the new one at jump speed at most
+            (before_start, (top, bottom)), clearance = before, self.clearance
+            reach = -JUMP_FORCE * (start - before_start) / OBSTACLE_SCROLL_SPEED
+            gaps = [gap for gap in gaps
+                    if gap[0] + clearance - bottom <= reach and top + clearance - gap[1] <= reach]
+        if not gaps:
+            return False
+        if start != self.column_start:
+            self.previous = before
+        self.column_start = start
+        self.column_blocked = others + blocked
+        self.column_gap = max(gaps, key=lambda gap: gap[1] - gap[0])
+        return True
+
+    def plan_ahead(self, distance):
+        """Plan until more than a chunk past `distance` is planned."""
+        while distance + self.chunk_length >= self.planned_to:
+            self.plan_chunk()
+
+    def due(self, distance):
+        """Yield, in order, the spawns reached at `distance`, keeping a chunk planned ahead."""
+        if distance + self.chunk_length >= self.planned_to:
+            self.plan_chunk()
+        spawns = self.spawns
+        while spawns and spawns[0].distance <= distance:
+            yield spawns.popleft()
+
+    def next_distance(self, kind):
+        """Distance of the next planned spawn of a kind, planning ahead until there is one."""
+        if all(track.kind != kind for track in self.tracks):
+            return None
+        while True:
+            for spawn in self.spawns:
+                if spawn.kind == kind:
+                    return spawn.distance
+            self.plan_chunk()
+
+    def stats(self):
+        return {
+            'planned_to': self.planned_to,
+            'pending': len(self.spawns),
+            'replanned': self.replanned,
+            'dropped': self.dropped,
+        }
@@ -2,6 +2,34 @@ WINDOW_WIDTH = 480
 WINDOW_HEIGHT = 800
 FRAMERATE = 120
 
+# 'full' redraws and flips the whole window each frame; 'dirty' only updates
+# changed regions (see rendering.DirtyRenderer)
+RENDER_MODE = 'full'
+
+# Frame pacing in the levels (see pacing.FramePacer): 'cap' sleeps to at most
+# FRAMERATE frames per second, 'vsync' waits for the display refresh (pygame.SCALED
+# window; falls back to 'cap'), 'adaptive' lowers the frame rate down to
+# MIN_FRAMERATE while frames take more than FRAME_CPU_BUDGET of their time,
+# 'uncapped' never waits. Frame dt is clamped to MAX_FRAME_TIME seconds after a
+# stall; FRAME_PACING_REPORT prints frame stats when a level closes
+FRAME_PACING = 'cap'
+FRAME_CPU_BUDGET = 0.5
+MIN_FRAMERATE = 30
+MAX_FRAME_TIME = 0.05
+FRAME_PACING_REPORT = False
+
+# Fixed-timestep simulation (see simulation.FixedStepper)
+SIMULATION_STEP = 1 / 120
+MAX_STEPS_PER_FRAME = 8
+
+# Level spawns are planned SPAWN_CHUNK pixels of distance at a time (see
+# schedule.SpawnSchedule). DIFFICULTY_CURVE scales the spacing between spawns:
+# (distance, factor) points, interpolated linearly; gaps between obstacles must
+# be SPAWN_CLEARANCE player heights tall
+SPAWN_CHUNK = 4000
+DIFFICULTY_CURVE = ((0, 1.0),)
+SPAWN_CLEARANCE = 1.5
+
 # Gameplay speeds
 BG_SCROLL_SPEED = 300
 GROUND_SCROLL_SPEED = 360
@@ -10,6 +38,13 @@ JUMP_FORCE = -400
 GRAVITY = 555
 PLANE_ANIM_SPEED = 10
 
+# Player rotation: angles are looked up in a pre-rendered atlas in steps of
+# ROTATION_STEP degrees (+/- ROTATION_PRERENDER_RANGE rendered at load time);
+# EXACT_ROTATION rotates every frame instead (screenshots)
+ROTATION_STEP = 1
+ROTATION_PRERENDER_RANGE = 90
+EXACT_ROTATION = False
+
 # Asset paths
 PLANE_IMG_PATH = '../graphics/plane/yellow{}.png'
 BG_IMG_PATH = '../graphics/environment/background.png'
@@ -17,6 +52,43 @@ GROUND_IMG_PATH = '../graphics/environment/ground.png'
 OBSTACLE_IMG_PATH = '../graphics/obstacles/{}.png'
 JUMP_SOUND_PATH = '../sounds/jump.wav'
 
-# Volume controls
+# Volume controls (change them through audio.set_volume() while sounds play)
 BGM_VOLUME = 0.5
-SFX_VOLUME = 0.25
\ No newline at end of file
+SFX_VOLUME = 0.25
+
+# Music streams through pygame.mixer.music; sound effects get this many
+# reserved mixer channels (see audio.AudioManager)
+MUSIC_PATH = '../sounds/music.wav'
+SFX_CHANNELS = 2
+
+# Frame profiler (F3 toggles the overlay); set a .csv/.json path to dump a trace on exit
+PROFILER_HISTORY = 600
+PROFILER_TRACE_PATH = None
+
+# Idle obstacle/crow sprites kept per kind for reuse (see pool.SpritePool)
+POOL_MAX_SIZE = 16
+
+# Asset cache budget (decoded surfaces + masks)
+ASSET_CACHE_BYTES = 128 * 1024 * 1024
+
+# Load pre-scaled level assets from ../bundles when built (python bundle.py)
+USE_ASSET_BUNDLES = True
+
+# Level 1 animated background (see assets.FrameSequence): frames are decoded
+# on a worker thread; BG_RESIDENT_FRAMES keeps only that many decoded at once
+# (about 4.5 MB each), None keeps all of them
+BG_THREADED_DECODE = True
+BG_RESIDENT_FRAMES = None
+
+# Menus sleep until input arrives instead of redrawing every frame (see
+# menu.MenuLoop): the longest wait in ms when idle and while something on
+# screen animates; MENU_CPU_REPORT prints each menu's CPU time when it closes
+MENU_IDLE_TIMEOUT = 1000
+MENU_BUSY_TIMEOUT = 16
+MENU_CPU_REPORT = False
+
+# Print process memory after every scene change (see scenes.SceneManager)
+SCENE_MEMORY_LOG = False
+
+# Rendered text kept for reuse (see text.TextCache)
+TEXT_CACHE_BYTES = 4 * 1024 * 1024
@@ -0,0 +1,266 @@
+import hashlib
+import os
+import random
+import struct
+import sys
+import time
+import pygame
+from abc import ABC, abstractmethod
+from assets import image_size
+from bundle import attach_level_bundle
+from collision import BroadPhase
+from entities import EntityGroup
+from pool import SpritePool
+from profiler import NULL_PROFILER
+from schedule import SpawnSchedule, OBSTACLE
+from settings import (
+    WINDOW_WIDTH, WINDOW_HEIGHT, OBSTACLE_SCROLL_SPEED,
+    SIMULATION_STEP, MAX_STEPS_PER_FRAME, SPAWN_CLEARANCE
+)
+
+# Input actions accepted by Simulation.step
+JUMP = 'jump'
+
+
+class FixedStepper:
+    def __init__(self, step=SIMULATION_STEP, max_steps=MAX_STEPS_PER_FRAME):
+        """
+        Accumulator turning variable frame times into fixed simulation steps.
+
+        Args:
+            step (float): Simulation step in seconds.
+            max_steps (int): Most steps run for one frame; older backlog is dropped
+                so a long stall cannot snowball into an ever slower catch-up.
+        """
+        self.step = step
+        self.max_steps = max_steps
+        self.accumulator = 0
+
+    def advance(self, dt):
+        """Add a frame's dt and return how many fixed steps are now due."""
+        self.accumulator += dt
+        steps = int(self.accumulator / self.step)
+        if steps > self.max_steps:
+            self.accumulator = 0
+            return self.max_steps
+        self.accumulator -= steps * self.step
+        return steps
+
+
+class Simulation(ABC):
+    level = None  # level number; picks the asset bundle (see bundle.py)
+    # Image whose height the level scales everything against
+    background_path = '../graphics/environment/background.png'
+    obstacle_spacing = 560  # px of distance between obstacle spawns
+
+    def __init__(self, seed=None):
+        """
+        World state of one level, advanced by step() with no drawing, sound or
+        event handling. Levels subclass this and fill in build_world,
+        plan_obstacle, obstacle_bounds, spawn_obstacle and collisions; a Game
+        renders the sprite groups. What spawns where is planned ahead from the
+        seed by a schedule.SpawnSchedule (see make_schedule).
+
+        Args:
+            seed (int or None): Seed for all of the level's randomness; None picks one.
+        """
+        self.seed = random.randrange(2 ** 32) if seed is None else seed
+        self.rng = random.Random(self.seed)
+        self.recorder = None  # set to a replay.ReplayRecorder to log inputs
+        self.profiler = NULL_PROFILER  # set to a FrameProfiler to time step phases
+
+        self.all_sprites = pygame.sprite.Group()
+        self.collision_sprites = pygame.sprite.Group()
+        # Obstacles and crows, moved by one loop over the group
+        self.entities = EntityGroup()
+
+        # Pre-scaled assets, when the level's bundle has been built
+        if self.level is not None:
+            attach_level_bundle(self.level)
+        bg_height = image_size(self.background_path)[1]
+        self.scale_factor = WINDOW_HEIGHT / bg_height
+
+        self.pools = {}  # sprite class -> SpritePool
+        self.broad_phase = BroadPhase()  # collisions() tests masks through it
+        self.player = None
+        self.events = []
+        self.frame = 0
+        self.build_world()
+        self.reset()
+
+    @property
+    def score(self):
+        return int(self.time_elapsed)
+
+    @abstractmethod
+    def build_world(self):
+        """Create the background and ground sprites that persist across resets."""
+
+    @abstractmethod
+    def spawn_player(self):
+        """Create the player sprite and return it."""
+
+    @abstractmethod
+    def plan_obstacle(self, rng):
+        """Draw the params of one obstacle spawn, passed to spawn_obstacle."""
+
+    @abstractmethod
+    def obstacle_bounds(self, params):
+        """(top, bottom) spans the obstacles of a spawn block, for the schedule's checks."""
+
+    @abstractmethod
+    def spawn_obstacle(self, params):
+        """Put the obstacles of one planned spawn into the world."""
+
+    @abstractmethod
+    def collisions(self):
+        """Return the cause of death for this step, or None."""
+
+    def load_draw_assets(self):
+        """Load assets that only drawing needs, so they are ready before the first frame."""
+
+    def pool(self, sprite_class):
+        """Return the SpritePool that spawns (and recycles) sprite_class."""
+        if sprite_class not in self.pools:
+            self.pools[sprite_class] = SpritePool(sprite_class)
+        return self.pools[sprite_class]
+
+    def pool_stats(self):
+        return {cls.__name__: pool.stats() for cls, pool in self.pools.items()}
+
+    def reset(self):
+        if self.recorder is not None:
+            self.recorder.reset(self.frame)
+        if self.player is not None:
+            self.player.kill()
+        self.player = self.spawn_player()
+        self.active = True
+        self.time_elapsed = 0
+        self.distance_traveled = 0
+        self.death_cause = None
+        self.schedule = self.make_schedule()
+        self.schedule.plan_ahead(0)
+
+    def make_schedule(self):
+        """The run's SpawnSchedule, seeded from the level's rng; levels add their tracks."""
+        schedule = SpawnSchedule(random.Random(self.rng.randrange(2 ** 32)),
+                                 clearance=self.player.rect.height * SPAWN_CLEARANCE)
+        schedule.add_track(OBSTACLE, lambda rng: self.obstacle_spacing, self.plan_obstacle, self.obstacle_bounds)
+        return schedule
+
+    def step(self, dt, inputs=()):
+        """Advance the world by dt seconds, applying the given input actions."""
+        if self.active:
+            if JUMP in inputs:
+                if self.recorder is not None:
+                    self.recorder.jump(self.frame)
+                self.player.jump()
+                self.events.append(JUMP)
+            self.run_schedule()
+
+        with self.profiler.phase('update'):
+            self.all_sprites.update(dt)
+            self.entities.update(dt)
+
+        if self.active:
+            self.time_elapsed += dt
+            self.distance_traveled += OBSTACLE_SCROLL_SPEED * dt
+            self.update_level(dt)
+            with self.profiler.phase('collisions'):
+                self.broad_phase.begin_step()
+                cause = self.collisions()
+            if cause:
+                self.die(cause)
+        self.frame += 1
+
+    def run_schedule(self):
+        for spawn in self.schedule.due(self.distance_traveled):
+            self.spawn(spawn)
+
+    def spawn(self, spawn):
+        """Put a due schedule.Spawn into the world."""
+        if spawn.kind == OBSTACLE:
+            self.spawn_obstacle(spawn.params)
+
+    def update_level(self, dt):
+        """Hook for per-step level rules that run while the player is alive."""
+
+    def clear_obstacles(self):
+        for sprite in self.collision_sprites.sprites():
+            if getattr(sprite, 'sprite_type', None) == 'obstacle':
+                sprite.kill()
+
+    def die(self, cause):
+        self.clear_obstacles()
+        self.player.kill()
+        self.active = False
+        self.death_cause = cause
+        self.events.append('death')
+
+    def state_hash(self):
+        """Digest of the simulation state, used to check that a replay matches."""
+        digest = hashlib.sha256()
+        digest.update(struct.pack('<q?d', self.frame, self.active, self.time_elapsed))
+        for sprite in self.all_sprites:
+            digest.update(struct.pack('<4i', *sprite.rect))
+        if self.player is not None:
+            digest.update(struct.pack('<d', self.player.direction))
+        return digest.digest()
+
+    def pop_events(self):
+        """Return and clear the events ('jump', 'death', ...) since the last call."""
+        events, self.events = self.events, []
+        return events
+
+
+def init_headless():
+    """Set up pygame without a window or sound card so simulations can run anywhere."""
+    os.environ.setdefault('SDL_VIDEODRIVER', 'dummy')
+    os.environ.setdefault('SDL_AUDIODRIVER', 'dummy')
+    # Leave SIGINT/SIGTERM alone so worker processes can still be stopped
+    os.environ.setdefault('SDL_NO_SIGNAL_HANDLERS', '1')
+    pygame.init()
+    if pygame.display.get_surface() is None:
+        pygame.display.set_mode((WINDOW_WIDTH, WINDOW_HEIGHT))
+
+
+def hover_policy(sim):
+    """Simple bot: jump whenever the player drifts past the middle of the screen."""
+    player = sim.player
+    if player.gravity > 0:
+        return player.rect.centery > WINDOW_HEIGHT / 2 and player.direction > 0
+    return player.rect.centery < WINDOW_HEIGHT / 2 and player.direction < 0
+
+
+def load_simulation(level, seed=None):
+    if level == 1:
+        from game_level1 import Level1Simulation
+        return Level1Simulation(seed)
+    if level == 2:
+        from game_level2 import Level2Simulation
+        return Level2Simulation(seed)
+    if level == 3:
+        from game_level3 import Level3Simulation
+        return Level3Simulation(seed)
+    raise ValueError(f'Unknown level: {level}')
+
+
+def run_headless(sim, frames, policy=hover_policy, restart=True):
+    """Step sim for a number of frames as fast as possible; return frames per second."""
+    start = time.perf_counter()
+    for _ in range(frames):
+        if not sim.active and restart:
+            sim.reset()
+        sim.step(SIMULATION_STEP, (JUMP,) if policy(sim) else ())
+    return frames / (time.perf_counter() - start)
+
+
+if __name__ == '__main__':
+    # Usage: python simulation.py [level] [frames] [seed]
+    init_headless()
+    level = int(sys.argv[1]) if len(sys.argv) > 1 else 2
+    frames = int(sys.argv[2]) if len(sys.argv) > 2 else 10000
+    seed = int(sys.argv[3]) if len(sys.argv) > 3 else None
+    sim = load_simulation(level, seed)
+    fps = run_headless(sim, frames)
+    print(f'Level {level}: {frames} frames at {fps:.0f} frames/s, score {sim.score}')
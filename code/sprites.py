@@ -3,11 +3,11 @@ import settings
 from settings import (
     WINDOW_HEIGHT, WINDOW_WIDTH,
     BG_SCROLL_SPEED, GROUND_SCROLL_SPEED, OBSTACLE_SCROLL_SPEED,
-    JUMP_FORCE, GRAVITY, PLANE_ANIM_SPEED,
-    PLANE_IMG_PATH, BG_IMG_PATH, GROUND_IMG_PATH, OBSTACLE_IMG_PATH,
-    JUMP_SOUND_PATH
+    JUMP_FORCE, GRAVITY, PLANE_ANIM_SPEED, ROTATION_STEP,
+    PLANE_IMG_PATH, BG_IMG_PATH, GROUND_IMG_PATH, OBSTACLE_IMG_PATH
 )
-from random import choice, randint
+from assets import load_image, load_mask, load_opaque_rows, load_rotations
+from entities import EntityView
 
 
 class BG(pygame.sprite.Sprite):
@@ -15,10 +15,8 @@ class BG(pygame.sprite.Sprite):
         super().__init__(*groups)
         self.sprite_type = 'background'
 
-        bg_image = pygame.image.load(BG_IMG_PATH).convert()
-        full_height = int(bg_image.get_height() * scale_factor)
-        full_width = int(bg_image.get_width() * scale_factor)
-        full_sized_image = pygame.transform.scale(bg_image, (full_width, full_height))
+        full_sized_image = load_image(BG_IMG_PATH, scale_factor, alpha=False)
+        full_width, full_height = full_sized_image.get_size()
 
         self.image = pygame.Surface((full_width * 2, full_height)).convert()
         self.image.blit(full_sized_image, (0, 0))
@@ -39,15 +37,11 @@ class Ground(pygame.sprite.Sprite):
         super().__init__(*groups)
         self.sprite_type = 'ground'
 
-        ground_surf = pygame.image.load(GROUND_IMG_PATH).convert_alpha()
-        self.image = pygame.transform.scale(
-            ground_surf,
-            pygame.math.Vector2(ground_surf.get_size()) * scale_factor
-        )
+        self.image = load_image(GROUND_IMG_PATH, scale_factor)
 
         self.rect = self.image.get_rect(bottomleft=(0, WINDOW_HEIGHT))
         self.pos = pygame.math.Vector2(self.rect.topleft)
-        self.mask = pygame.mask.from_surface(self.image)
+        self.mask = load_mask(GROUND_IMG_PATH, scale_factor)
 
     def update(self, dt):
         self.pos.x -= GROUND_SCROLL_SPEED * dt
@@ -62,6 +56,7 @@ class Plane(pygame.sprite.Sprite):
         self.sprite_type = 'player'
 
         self.frames = []
+        self.rotations = []
         self.import_frames(scale_factor)
         self.frame_index = 0
         self.image = self.frames[self.frame_index]
@@ -69,21 +64,14 @@ class Plane(pygame.sprite.Sprite):
         self.rect = self.image.get_rect(midleft=(WINDOW_WIDTH / 20, WINDOW_HEIGHT / 2))
         self.pos = pygame.math.Vector2(self.rect.topleft)
         self.direction = 0
-        self.mask = pygame.mask.from_surface(self.image)
-
-        self.jump_sound = pygame.mixer.Sound(JUMP_SOUND_PATH)
-        self.jump_sound.set_volume(settings.SFX_VOLUME)
+        self.mask = load_mask(PLANE_IMG_PATH.format(self.frame_index), scale_factor)
 
         self.flip_gravity(False)
 
     def import_frames(self, scale_factor):
         for i in range(3):
-            surf = pygame.image.load(PLANE_IMG_PATH.format(i)).convert_alpha()
-            scaled = pygame.transform.scale(
-                surf,
-                pygame.math.Vector2(surf.get_size()) * scale_factor
-            )
-            self.frames.append(scaled)
+            self.frames.append(load_image(PLANE_IMG_PATH.format(i), scale_factor))
+            self.rotations.append(load_rotations(PLANE_IMG_PATH.format(i), scale_factor, ROTATION_STEP))
 
     def apply_gravity(self, dt):
         self.direction += self.gravity * dt
@@ -91,8 +79,6 @@ class Plane(pygame.sprite.Sprite):
         self.rect.y = int(self.pos.y)
 
     def jump(self):
-        self.jump_sound.set_volume(settings.SFX_VOLUME)
-        self.jump_sound.play()
         self.direction = JUMP_FORCE if self.gravity > 0 else -JUMP_FORCE
 
     def animate(self, dt):
@@ -101,9 +87,12 @@ class Plane(pygame.sprite.Sprite):
         self.image = self.frames[int(self.frame_index)]
 
     def rotate(self):
-        rotated = pygame.transform.rotozoom(self.image, -self.direction * 0.06, 1)
-        self.image = rotated
-        self.mask = pygame.mask.from_surface(self.image)
+        angle = -self.direction * 0.06
+        if settings.EXACT_ROTATION:
+            self.image = pygame.transform.rotozoom(self.image, angle, 1)
+            self.mask = pygame.mask.from_surface(self.image)
+        else:
+            self.image, self.mask = self.rotations[int(self.frame_index)].lookup(angle)
 
     def flip_gravity(self, is_flipped):
         self.gravity = -GRAVITY if is_flipped else GRAVITY
@@ -114,36 +103,49 @@ class Plane(pygame.sprite.Sprite):
         self.rotate()
 
 
-class Obstacle(pygame.sprite.Sprite):
-    def __init__(self, *groups, scale_factor):
-        super().__init__(*groups)
-        self.sprite_type = 'obstacle'
+def plan_obstacle(rng):
+    """Random Obstacle placement: (flipped, sprite index, x, y of its outer end)."""
+    orientation = rng.choice(('up', 'down'))
+    sprite_index = rng.choice((0, 1))
+    x = WINDOW_WIDTH + rng.randint(40, 100)
+    if orientation == 'up':
+        y = WINDOW_HEIGHT + rng.randint(10, 50)
+    else:
+        y = rng.randint(-50, -10)
+    return orientation == 'down', sprite_index, x, y
 
-        orientation = choice(('up', 'down'))
-        sprite_index = choice((0, 1))
-        surf = pygame.image.load(OBSTACLE_IMG_PATH.format(sprite_index)).convert_alpha()
 
-        if orientation == 'down':
-            surf = pygame.transform.flip(surf, False, True)
+def obstacle_rect(image, flipped, x, y):
+    # Standing obstacles rise from below the window, hanging ones come down from above it
+    return image.get_rect(midtop=(x, y)) if flipped else image.get_rect(midbottom=(x, y))
 
-        self.image = pygame.transform.scale(
-            surf,
-            pygame.math.Vector2(surf.get_size()) * scale_factor
-        )
 
-        x = WINDOW_WIDTH + randint(40, 100)
-        if orientation == 'up':
-            y = WINDOW_HEIGHT + randint(10, 50)
-            self.rect = self.image.get_rect(midbottom=(x, y))
-        else:
-            y = randint(-50, -10)
-            self.rect = self.image.get_rect(midtop=(x, y))
+def obstacle_bounds(placement, scale_factor):
+    """(top, bottom) span an Obstacle with this placement blocks."""
+    flipped, sprite_index, x, y = placement
+    path = OBSTACLE_IMG_PATH.format(sprite_index)
+    rect = obstacle_rect(load_image(path, scale_factor, flipped), flipped, x, y)
+    top, bottom = load_opaque_rows(path, scale_factor, flipped)
+    return rect.top + top, rect.top + bottom
 
-        self.pos = pygame.math.Vector2(self.rect.topleft)
-        self.mask = pygame.mask.from_surface(self.image)
 
-    def update(self, dt):
-        self.pos.x -= OBSTACLE_SCROLL_SPEED * dt
-        self.rect.x = int(self.pos.x)
-        if self.rect.right <= -100:
-            self.kill()
+class Obstacle(EntityView):
+    sprite_type = 'obstacle'
+    speed = -OBSTACLE_SCROLL_SPEED
+    kill_right = -100
+
+    def __init__(self, *groups, scale_factor, placement):
+        super().__init__()
+        self.reset(*groups, scale_factor=scale_factor, placement=placement)
+
+    def reset(self, *groups, scale_factor, placement):
+        """placement comes from plan_obstacle."""
+        self.add(*groups)
+
+        flipped, sprite_index, x, y = placement
+        path = OBSTACLE_IMG_PATH.format(sprite_index)
+        self.image = load_image(path, scale_factor, flipped)
+        self.rect = obstacle_rect(self.image, flipped, x, y)
+
+        self.x = self.rect.x
+        self.mask = load_mask(path, scale_factor, flipped)
@@ -1,29 +1,26 @@
 import pygame
+import settings
 from settings import *
-from random import choice, randint
+from assets import load_image, load_mask, load_opaque_rows, load_rotations, load_frames
+from entities import EntityView
 
 class BG(pygame.sprite.Sprite):
     def __init__(self, groups, scale_factor):
         super().__init__(groups)
 
-        # Load all background frames
-        self.frames = [
-            pygame.transform.scale(
-                pygame.image.load(f'../graphics/environment/background{i}.png').convert(),
-                (pygame.image.load(f'../graphics/environment/background{i}.png').get_width() * scale_factor,
-                 pygame.image.load(f'../graphics/environment/background{i}.png').get_height() * scale_factor)
-            )
-            for i in range(20)  # Assuming 5 images: background0.png ... background4.png
-        ]
+        # All background frames, decoded once per process (see assets.FrameSequence)
+        self.frames = load_frames(
+            [f'../graphics/environment/background{i}.png' for i in range(20)],  # background0.png ... background19.png
+            scale_factor
+        )
         self.frame_index = 0
-        self.image = pygame.Surface((self.frames[0].get_width() * 2, self.frames[0].get_height()))
+        self.image = self.frames.get(0)
 
-        # Draw two copies for scrolling
-        self.image.blit(self.frames[self.frame_index], (0, 0))
-        self.image.blit(self.frames[self.frame_index], (self.frames[0].get_width(), 0))
-
-        self.rect = self.image.get_rect(topleft=(0, 0))
+        # The rect spans two copies of the frame side by side; draw() blits both
+        width, height = self.frames.size
+        self.rect = pygame.Rect(0, 0, width * 2, height)
         self.pos = pygame.math.Vector2(self.rect.topleft)
+        self.visible_part = pygame.Rect(0, 0, width, height)
 
         self.animation_speed = 2  # frames per second
 
@@ -32,11 +29,8 @@ class BG(pygame.sprite.Sprite):
         if self.frame_index >= len(self.frames):
             self.frame_index = 0
 
-        # Update image for new frame
-        frame = self.frames[int(self.frame_index)]
-        self.image = pygame.Surface((frame.get_width() * 2, frame.get_height()))
-        self.image.blit(frame, (0, 0))
-        self.image.blit(frame, (frame.get_width(), 0))
+        # Current frame; nothing is composed or allocated
+        self.image = self.frames.get(int(self.frame_index))
 
     def update(self, dt):
         # Animate
@@ -48,20 +42,30 @@ class BG(pygame.sprite.Sprite):
             self.pos.x = 0
         self.rect.x = round(self.pos.x)
 
+    def draw(self, surface):
+        # Visible tail of the first copy, then the head of the second one
+        width = self.frames.size[0]
+        self.visible_part.x = -self.rect.x
+        self.visible_part.width = width + self.rect.x
+        surface.blit(self.image, (0, self.rect.y), self.visible_part)
+        surface.blit(self.image, (width + self.rect.x, self.rect.y))
+
+    def bounds(self):
+        # rect.x is never positive, so everything left of rect.right is covered
+        return pygame.Rect(0, self.rect.y, self.rect.right, self.rect.height)
+
 class Ground(pygame.sprite.Sprite):
     def __init__(self, groups, scale_factor):
         super().__init__(groups)
         self.sprite_type = 'ground'
 
         # Load and scale ground image
-        ground_surf = pygame.image.load('../graphics/environment/ground1.png').convert_alpha()
-        size = pygame.math.Vector2(ground_surf.get_size()) * scale_factor
-        self.image = pygame.transform.scale(ground_surf, size)
+        self.image = load_image('../graphics/environment/ground1.png', scale_factor)
 
         self.rect = self.image.get_rect(bottomleft=(0, WINDOW_HEIGHT))
         self.pos = pygame.math.Vector2(self.rect.topleft)
 
-        self.mask = pygame.mask.from_surface(self.image)
+        self.mask = load_mask('../graphics/environment/ground1.png', scale_factor)
 
     def update(self, dt):
         # Scroll ground left, loop seamlessly
@@ -85,20 +89,14 @@ class Pony(pygame.sprite.Sprite):
         self.gravity = 600
         self.direction = 0
 
-        self.mask = pygame.mask.from_surface(self.image)
-
-        # Load jump sound and set volume
-        self.jump_sound = pygame.mixer.Sound('../sounds/jump.wav')
-        self.jump_sound.set_volume(0.3)
+        self.mask = load_mask(f'../graphics/pony/fly{self.frame_index}.png', scale_factor)
 
     def import_frames(self, scale_factor):
         # Load 3 frames of pony animation scaled appropriately
-        self.frames = [
-            pygame.transform.scale(
-                pygame.image.load(f'../graphics/pony/fly{i}.png').convert_alpha(),
-                pygame.math.Vector2(pygame.image.load(f'../graphics/pony/fly{i}.png').get_size()) * scale_factor
-            ) for i in range(3)
-        ]
+        paths = [f'../graphics/pony/fly{i}.png' for i in range(3)]
+        self.frames = [load_image(path, scale_factor) for path in paths]
+        # Pre-rendered rotations (with masks) of every frame
+        self.rotations = [load_rotations(path, scale_factor, ROTATION_STEP) for path in paths]
 
     def apply_gravity(self, dt):
         # Apply gravity to vertical velocity and update position
@@ -107,8 +105,7 @@ class Pony(pygame.sprite.Sprite):
         self.rect.y = round(self.pos.y)
 
     def jump(self):
-        # Play jump sound and set upward velocity
-        self.jump_sound.play()
+        # Set upward velocity (the level plays the jump sound)
         self.direction = -400
 
     def animate(self, dt):
@@ -120,40 +117,62 @@ class Pony(pygame.sprite.Sprite):
 
     def rotate(self):
         # Rotate pony sprite based on vertical speed
-        rotated = pygame.transform.rotozoom(self.image, -self.direction * 0.06, 1)
-        self.image = rotated
-        self.mask = pygame.mask.from_surface(self.image)
+        angle = -self.direction * 0.06
+        if settings.EXACT_ROTATION:
+            self.image = pygame.transform.rotozoom(self.image, angle, 1)
+            self.mask = pygame.mask.from_surface(self.image)
+        else:
+            self.image, self.mask = self.rotations[int(self.frame_index)].lookup(angle)
 
     def update(self, dt):
         self.apply_gravity(dt)
         self.animate(dt)
         self.rotate()
 
-class Obstacle(pygame.sprite.Sprite):
-    def __init__(self, groups, scale_factor):
-        super().__init__(groups)
-        self.sprite_type = 'obstacle'
-
-        # Randomly choose orientation and image
-        orientation = choice(('up', 'down'))
-        surf = pygame.image.load(f'../graphics/obstacles/{choice((3, 4))}.png').convert_alpha()
-        self.image = pygame.transform.scale(surf, pygame.math.Vector2(surf.get_size()) * scale_factor)
-
-        x = WINDOW_WIDTH + randint(40, 100)
-        if orientation == 'up':
-            y = WINDOW_HEIGHT + randint(10, 50)
-            self.rect = self.image.get_rect(midbottom=(x, y))
-        else:
-            y = randint(-50, -10)
-            self.image = pygame.transform.flip(self.image, False, True)
-            self.rect = self.image.get_rect(midtop=(x, y))
-
-        self.pos = pygame.math.Vector2(self.rect.topleft)
-        self.mask = pygame.mask.from_surface(self.image)
-
-    def update(self, dt):
-        # Move obstacle left, destroy when offscreen
-        self.pos.x -= 400 * dt
-        self.rect.x = round(self.pos.x)
-        if self.rect.right <= -100:
-            self.kill()
+def plan_obstacle(rng):
+    # Randomly choose orientation and image: (flipped, image number, x, y)
+    orientation = rng.choice(('up', 'down'))
+    number = rng.choice((3, 4))
+    x = WINDOW_WIDTH + rng.randint(40, 100)
+    if orientation == 'up':
+        y = WINDOW_HEIGHT + rng.randint(10, 50)
+    else:
+        y = rng.randint(-50, -10)
+    return orientation == 'down', number, x, y
+
+
+def obstacle_rect(image, flipped, x, y):
+    return image.get_rect(midtop=(x, y)) if flipped else image.get_rect(midbottom=(x, y))
+
+
+def obstacle_bounds(placement, scale_factor):
+    """(top, bottom) span an Obstacle with this placement blocks."""
+    flipped, number, x, y = placement
+    path = f'../graphics/obstacles/{number}.png'
+    rect = obstacle_rect(load_image(path, scale_factor, flipped), flipped, x, y)
+    top, bottom = load_opaque_rows(path, scale_factor, flipped)
+    return rect.top + top, rect.top + bottom
+
+
+class Obstacle(EntityView):
+    sprite_type = 'obstacle'
+    # Moves left at 400 px/s and is destroyed offscreen (see entities.EntityGroup)
+    speed = -400
+    snap = round
+    kill_right = -100
+
+    def __init__(self, groups, scale_factor, placement):
+        super().__init__()
+        self.reset(groups, scale_factor, placement)
+
+    def reset(self, groups, scale_factor, placement):
+        # placement comes from plan_obstacle
+        self.add(groups)
+
+        flipped, number, x, y = placement
+        path = f'../graphics/obstacles/{number}.png'
+        self.image = load_image(path, scale_factor, flipped)
+        self.rect = obstacle_rect(self.image, flipped, x, y)
+
+        self.x = self.rect.x
+        self.mask = load_mask(path, scale_factor, flipped)
@@ -0,0 +1,11 @@
+# Run from code/: python -m pytest -q tests (headless, no window or sound needed)
+import os
+import sys
+
+CODE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, CODE_DIR)
+os.chdir(CODE_DIR)  # asset paths are relative to code/
+
+from simulation import init_headless  # noqa: E402
+
+init_headless()
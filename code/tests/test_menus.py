@@ -0,0 +1,70 @@
+import runpy
+import sys
+import time
+from types import SimpleNamespace
+import pygame
+import pytest
+from preload import Preloader
+from scenes import SceneManager
+
+
+@pytest.fixture(scope='module')
+def menus():
+    # The menu module under another name than main, as when run as __main__
+    return SimpleNamespace(**runpy.run_path('main.py', run_name='menus'))
+
+
+def click(button):
+    pygame.event.post(pygame.event.Event(pygame.MOUSEBUTTONDOWN, button=1, pos=button.rect.center))
+
+
+def test_round_trip_keeps_one_preloader(menus, level=2):
+    """
+    Main menu -> level select -> level -> death -> MAIN MENU -> level select:
+    the game comes back to the one preloader, which still hints the level
+    played last, and the menu module is never loaded a second time.
+    """
+    preloader = Preloader()
+    manager = SceneManager(root_factory=lambda: menus.MainMenu(preloader))
+    manager.start(menus.MainMenu(preloader))
+
+    click(manager.top.buttons[0])  # PLAY
+    manager.step()
+    select = manager.top
+    assert isinstance(select, menus.LevelSelect)
+    click(next(button for button, action in select.level_buttons if action == level))
+    manager.step()
+    game = manager.top
+    assert type(game).__module__ == f'game_level{level}'
+
+    game.sim.die('check')
+    click(game.main_menu_button)
+    manager.step()
+    menu = manager.top
+    assert isinstance(menu, menus.MainMenu) and len(manager.stack) == 1
+    assert menu.preloader is preloader
+    assert 'main' not in sys.modules, 'a level imported main'
+
+    click(menu.buttons[0])
+    manager.step()
+    pygame.event.post(pygame.event.Event(pygame.USEREVENT))  # wakes the menu's wait
+    manager.step()
+    assert preloader.last_level == level
+    assert preloader.progress(level) is not None, 'the level played last is not preloaded'
+    manager.quit()
+    manager.step()
+
+
+def test_failed_preload_still_lets_the_level_start():
+    """A preload whose worker raises clears busy and still lets the level start."""
+    preloader = Preloader()
+    preloader.request(9)  # no game_level9 module: the worker's import fails
+    deadline = time.perf_counter() + 5
+    while preloader.busy and time.perf_counter() < deadline:
+        preloader.poll()
+        time.sleep(0.01)
+    assert not preloader.busy and preloader.progress(9) is None
+    preloader.request(9)
+    preloader.job.thread.join(5)
+    preloader.finish(9)
+    assert not preloader.busy and preloader.last_level == 9
@@ -0,0 +1,26 @@
+import pygame
+import pytest
+from rendering import make_renderer
+from settings import SIMULATION_STEP
+from simulation import JUMP, hover_policy, load_simulation
+
+
+@pytest.mark.parametrize('level', [1, 2, 3])
+def test_dirty_renderer_draws_what_the_full_one_does(level):
+    # Two runs from one seed, one per renderer, compared frame by frame
+    display = pygame.display.get_surface()
+    runs = []
+    for mode in ('full', 'dirty'):
+        surface = pygame.Surface(display.get_size()).convert()
+        runs.append((load_simulation(level, seed=3), surface, make_renderer(surface, mode)))
+
+    for frame in range(400):
+        pixels = []
+        for sim, surface, renderer in runs:
+            if not sim.active:
+                sim.reset()
+            sim.step(SIMULATION_STEP, (JUMP,) if hover_policy(sim) else ())
+            renderer.render(sim.all_sprites)
+            renderer.present()
+            pixels.append(pygame.image.tobytes(surface, 'RGB'))
+        assert pixels[0] == pixels[1], f'frame {frame}'
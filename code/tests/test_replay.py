@@ -0,0 +1,34 @@
+from replay import ReplayRecorder, play_replay
+from simulation import load_simulation, run_headless
+import pytest
+
+
+@pytest.mark.parametrize('level', [1, 2, 3])
+def test_same_seed_same_state_hash(level):
+    hashes = []
+    for _ in range(2):
+        sim = load_simulation(level, seed=7)
+        run_headless(sim, 1500)
+        hashes.append(sim.state_hash())
+    assert hashes[0] == hashes[1]
+
+
+def test_other_seed_other_state_hash():
+    hashes = []
+    for seed in (7, 8):
+        sim = load_simulation(2, seed=seed)
+        run_headless(sim, 1500)
+        hashes.append(sim.state_hash())
+    assert hashes[0] != hashes[1]
+
+
+@pytest.mark.parametrize('level', [1, 2, 3])
+def test_recorded_run_replays_to_the_same_hash(level, tmp_path):
+    sim = load_simulation(level, seed=11)
+    ReplayRecorder(level, sim)
+    run_headless(sim, 1500)  # jumps, deaths and restarts
+    path = tmp_path / f'level{level}.fbrp'
+    sim.recorder.save(path)
+
+    matches, _ = play_replay(path)
+    assert matches
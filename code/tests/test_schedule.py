@@ -0,0 +1,53 @@
+import pytest
+from schedule import free_gaps
+from settings import JUMP_FORCE, OBSTACLE_SCROLL_SPEED
+from simulation import load_simulation
+
+
+def columns(schedule, bounds):
+    """(start distance, blocked spans) of each column of the planned spawns."""
+    result = []
+    for spawn in schedule.spawns:
+        track_bounds = bounds[spawn.kind]
+        if track_bounds is None:
+            continue
+        if not result or spawn.distance - result[-1][0] >= schedule.column_width:
+            result.append((spawn.distance, []))
+        result[-1][1].extend(track_bounds(spawn.params))
+    return result
+
+
+@pytest.mark.parametrize('level', [1, 2, 3])
+@pytest.mark.parametrize('seed', [0, 1, 2])
+def test_planned_level_can_be_flown_through(level, seed):
+    sim = load_simulation(level, seed)
+    schedule = sim.schedule
+    schedule.plan_ahead(40000)
+    bounds = {track.kind: track.bounds for track in schedule.tracks}
+    clearance = schedule.clearance
+
+    # Gaps the player fits through in each column, and whether one of them
+    # can be reached at jump speed from a gap reachable in the column before
+    reachable = None
+    previous_start = None
+    planned = columns(schedule, bounds)
+    assert len(planned) > 20
+    for start, blocked in planned:
+        gaps = [gap for gap in free_gaps(blocked) if gap[1] - gap[0] >= clearance]
+        assert gaps, f'no gap at distance {start}'
+        if reachable is not None:
+            reach = -JUMP_FORCE * (start - previous_start) / OBSTACLE_SCROLL_SPEED
+            gaps = [gap for gap in gaps
+                    if any(gap[0] + clearance - bottom <= reach and top + clearance - gap[1] <= reach
+                           for top, bottom in reachable)]
+            assert gaps, f'no reachable gap at distance {start}'
+        reachable, previous_start = gaps, start
+
+
+def test_schedule_is_the_same_for_a_seed():
+    distances = []
+    for _ in range(2):
+        schedule = load_simulation(2, seed=5).schedule
+        schedule.plan_ahead(20000)
+        distances.append([(spawn.distance, spawn.kind, spawn.params) for spawn in schedule.spawns])
+    assert distances[0] == distances[1]
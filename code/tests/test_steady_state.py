@@ -0,0 +1,15 @@
+import assets
+import pytest
+from simulation import load_simulation, run_headless
+
+
+@pytest.mark.parametrize('level', [1, 2, 3])
+def test_steady_play_allocates_no_sprites_or_assets(level):
+    sim = load_simulation(level, seed=4)
+    run_headless(sim, 3000)  # every obstacle kind has spawned and been recycled
+    created = {name: stats['created'] for name, stats in sim.pool_stats().items()}
+    misses = assets.cache.stats()['misses']
+
+    run_headless(sim, 3000)
+    assert {name: stats['created'] for name, stats in sim.pool_stats().items()} == created
+    assert assets.cache.stats()['misses'] == misses
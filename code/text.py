@@ -0,0 +1,94 @@
+import pygame
+from assets import AssetCache
+from settings import TEXT_CACHE_BYTES
+
+# Characters numbers are composed from
+DIGITS = '0123456789.-:'
+
+
+class GlyphAtlas:
+    def __init__(self, font, color, antialias=True, chars=DIGITS):
+        """
+        Pre-rendered glyphs of one font and color, for text that changes often
+        but only uses a few characters (scores, slider values).
+
+        Args:
+            font (pygame.font.Font): Font to render with.
+            color (str or tuple): Text color.
+            antialias (bool): Passed to Font.render.
+            chars (str): Characters rendered up front.
+        """
+        self.height = font.get_height()
+        self.glyphs = {}
+        for char in chars:
+            glyph = font.render(char, antialias, color)
+            metrics = font.metrics(char)[0]
+            advance = metrics[4] if metrics else glyph.get_width()
+            self.glyphs[char] = (glyph, advance)
+
+    def supports(self, text):
+        return all(char in self.glyphs for char in text)
+
+    def size(self, text):
+        width = 0
+        right = 0
+        for char in text:
+            glyph, advance = self.glyphs[char]
+            right = max(right, width + glyph.get_width())
+            width += advance
+        return right, self.height
+
+    def draw(self, surface, text, pos):
+        """Blit text glyph by glyph with its top-left at pos; return the covered rect."""
+        x, y = pos
+        for char in text:
+            glyph, advance = self.glyphs[char]
+            surface.blit(glyph, (x, y))
+            x += advance
+        return pygame.Rect(pos, self.size(text))
+
+    def render(self, text):
+        surf = pygame.Surface(self.size(text), pygame.SRCALPHA)
+        self.draw(surf, text, (0, 0))
+        return surf
+
+
+class TextCache(AssetCache):
+    def __init__(self, max_bytes=TEXT_CACHE_BYTES):
+        """
+        Memoized Font.render results keyed by (font, text, color, antialias).
+
+        Strings made only of DIGITS are composed from a GlyphAtlas instead of
+        going through the font renderer. Like AssetCache, the surfaces are shared
+        and evicted least-recently-used first; so are the atlases, which share
+        the budget, so the fonts of levels that were left do not pile up.
+        """
+        super().__init__(max_bytes)
+
+    def render(self, font, text, color, antialias=True):
+        key = ('text', font, text, color, antialias)
+        return self.fetch(key, lambda: self._render(font, text, color, antialias))
+
+    def atlas(self, font, color, antialias=True):
+        """Return the GlyphAtlas for a font and color, built on first use."""
+        key = ('atlas', font, color, antialias)
+        return self.fetch(key, lambda: GlyphAtlas(font, color, antialias))
+
+    def sizeof(self, value):
+        if isinstance(value, GlyphAtlas):
+            return sum(glyph.get_pitch() * glyph.get_height() for glyph, _ in value.glyphs.values())
+        return super().sizeof(value)
+
+    def _render(self, font, text, color, antialias):
+        atlas = self.atlas(font, color, antialias)
+        if text and atlas.supports(text):
+            return atlas.render(text)
+        return font.render(text, antialias, color)
+
+
+# Shared by every screen, like assets.cache
+cache = TextCache()
+
+
+def render_text(font, text, color, antialias=True):
+    return cache.render(font, text, color, antialias)